@@ -1,7 +1,8 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
 
+from src.utils import show_figure
+
 # Load data from cleaned CSV file
 def load_affordability_data(
     path="data/clean/Average_UK_houseprices_and_salary.csv",
@@ -26,9 +27,11 @@ def compute_affordability_ratio(df):
 
 # Plot affordability ratio over time
 def plot_affordability(df, out_path="outputs/affordability_ratio_over_time.png"):
+    import matplotlib.pyplot as plt
+
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
-    plt.figure(figsize=(10, 5))
+    fig = plt.figure(figsize=(10, 5))
     plt.plot(
         df["Year"],
         df["Affordability_Ratio"],
@@ -44,7 +47,14 @@ def plot_affordability(df, out_path="outputs/affordability_ratio_over_time.png")
 
     plt.tight_layout()
     plt.savefig(out_path)
-    plt.show()
+    show_figure(fig)
+
+# Headless entry point used by src/render.py
+def render_chart(
+    path="data/clean/Average_UK_houseprices_and_salary.csv",
+    out_path="outputs/affordability_ratio_over_time.png",
+):
+    plot_affordability(compute_affordability_ratio(load_affordability_data(path)), out_path)
 
 def main():
     df = load_affordability_data()
@@ -1,7 +1,8 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
 
+from src.utils import show_figure
+
 # Define file paths
 HOUSE_PRICE_PATH = "data/clean/Average_UK_houseprices_and_salary.csv"
 INCOME_PATH = "data/raw/Income_by_age_and_gender.csv"
@@ -33,8 +34,10 @@ def compute_affordability(df, house_price):
 
 # Plot affordability
 def plot_affordability(df, out_path="outputs/affordability_by_age_and_gender.png"):
+    import matplotlib.pyplot as plt
+
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    plt.figure(figsize=(10, 5))
+    fig = plt.figure(figsize=(10, 5))
 
     for gender in df["Gender"].unique():
         subset = df[df["Gender"] == gender]
@@ -52,7 +55,16 @@ def plot_affordability(df, out_path="outputs/affordability_by_age_and_gender.png
     plt.legend()
     plt.tight_layout()
     plt.savefig(out_path)
-    plt.show()
+    show_figure(fig)
+
+# Headless entry point used by src/render.py
+def render_chart(
+    house_price_path=HOUSE_PRICE_PATH,
+    income_path=INCOME_PATH,
+    out_path="outputs/affordability_by_age_and_gender.png",
+):
+    house_price = load_latest_real_house_price(house_price_path)
+    plot_affordability(compute_affordability(load_income_data(income_path), house_price), out_path)
 
 def main():
     house_price = load_latest_real_house_price()
@@ -0,0 +1,261 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.affordability_by_age import HOUSE_PRICE_PATH, INCOME_PATH, load_income_data
+from src.profiling import add_rows, step
+from src.utils import show_figure
+
+BANK_RATE_PATH = "data/raw/bank_rate.csv"
+OUTPUT_PATH = "data/processed/affordability_scenarios.csv"
+DEPOSIT_TERM_PATH = "data/processed/affordability_by_deposit_and_term.csv"
+HEATMAP_PATH = "outputs/affordability_scenarios_heatmap.png"
+DEPOSIT_TERM_CHART_PATH = "outputs/affordability_by_deposit_and_term.png"
+
+# Default scenario axes: deposit as a fraction of the price, term in years, mortgage rate spread over Bank Rate (pp)
+DEPOSITS = np.round(np.arange(0.05, 0.401, 0.05), 2)
+TERMS = np.arange(15, 41, 5)
+SPREADS = np.round(np.arange(0.0, 4.001, 0.25), 2)
+
+# A mortgage is counted as affordable when repayments take at most this share of gross income
+AFFORDABLE_SHARE = 0.30
+
+# Upper bound on cells evaluated at once (float64), so memory stays flat for any grid size
+BLOCK_CELLS = 4_000_000
+
+
+# Monthly repayment of an annuity (repayment) mortgage; broadcasts over all arguments
+def annuity_payment(principal, annual_rate_pct, years) -> np.ndarray:
+    r = np.asarray(annual_rate_pct, dtype=np.float64) / 1200
+    n = np.asarray(years, dtype=np.float64) * 12
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor = np.where(r == 0, 1 / n, r / -np.expm1(-n * np.log1p(r)))
+    return principal * factor
+
+
+# Yearly real house price, Bank Rate and salary by age group and gender on a common set of years
+def load_inputs(house_price_path=HOUSE_PRICE_PATH, income_path=INCOME_PATH, bank_rate_path=BANK_RATE_PATH) -> dict:
+    """
+    The income file is a single cross-section, so each age/gender salary is
+    scaled by the yearly real median salary relative to its latest year.
+    Bank Rate is the yearly mean of the raw observations.
+    """
+    from src.resample import load_bank_rate, resample
+
+    house = pd.read_csv(house_price_path)
+    house = house.apply(pd.to_numeric, errors="coerce").dropna(subset=["Year", "Real_House_Price", "Real_Median_Salary"])
+    rates = resample(*load_bank_rate(bank_rate_path), start_year=None, frequencies={"yearly": 12})["yearly"]
+    df = house.merge(rates[["Year", "Mean"]], on="Year").sort_values("Year")
+
+    income = load_income_data(income_path)
+    ages = list(dict.fromkeys(income["Age_Group"]))
+    genders = list(dict.fromkeys(income["Gender"]))
+    base = income.pivot(index="Age_Group", columns="Gender", values="Median_Salary").loc[ages, genders].to_numpy()
+    growth = (df["Real_Median_Salary"] / df["Real_Median_Salary"].iloc[-1]).to_numpy()
+
+    return {
+        "years": df["Year"].astype(int).to_numpy(),
+        "prices": df["Real_House_Price"].to_numpy(np.float64),
+        "rates": df["Mean"].to_numpy(np.float64),
+        "salaries": growth[:, None, None] * base[None, :, :],
+        "ages": ages,
+        "genders": genders,
+    }
+
+
+# Annual repayment / salary for the full grid: shape (years, ages, genders, deposits, terms, spreads)
+def payment_to_income(prices, rates, salaries, deposits=DEPOSITS, terms=TERMS, spreads=SPREADS) -> np.ndarray:
+    """
+    The repayment does not depend on age or gender, so it is computed on the
+    (year, deposit, term, spread) grid and broadcast against 1 / salary.
+    """
+    prices, rates = np.asarray(prices, dtype=np.float64), np.asarray(rates, dtype=np.float64)
+    deposits, terms, spreads = (np.asarray(a, dtype=np.float64) for a in (deposits, terms, spreads))
+
+    loan = prices[:, None] * (1 - deposits[None, :])
+    rate = rates[:, None] + spreads[None, :]
+    payment = annuity_payment(loan[:, :, None, None], rate[:, None, None, :], terms[None, None, :, None])
+    return 12 * payment[:, None, None] / np.asarray(salaries, dtype=np.float64)[:, :, :, None, None, None]
+
+
+# Reduce the grid block by block to per (year, age, gender) and per (year, deposit, term) summaries
+def scenario_summary(inputs, deposits=DEPOSITS, terms=TERMS, spreads=SPREADS,
+                     threshold=AFFORDABLE_SHARE, block_cells=BLOCK_CELLS):
+    """
+    Years are processed in blocks of at most block_cells grid cells, so the
+    full grid is never held in memory. Returns (summary, deposit_term):
+    the share of scenarios that are affordable and the 10th/50th/90th
+    percentile payment-to-income ratio for each year, age group and gender,
+    and the share affordable for each year, deposit and term across ages,
+    genders and spreads.
+    """
+    years, salaries = inputs["years"], inputs["salaries"]
+    n_years, n_ages, n_genders = salaries.shape
+    per_year = n_ages * n_genders * len(deposits) * len(terms) * len(spreads)
+    years_per_block = max(block_cells // per_year, 1)
+
+    shares, quantiles, deposit_term = [], [], []
+    for lo in range(0, n_years, years_per_block):
+        block = slice(lo, lo + years_per_block)
+        pti = payment_to_income(inputs["prices"][block], inputs["rates"][block], salaries[block],
+                                deposits, terms, spreads)
+        affordable = pti <= threshold
+        flat = pti.reshape(pti.shape[:3] + (-1,))
+        shares.append(affordable.reshape(flat.shape).mean(axis=3))
+        quantiles.append(np.percentile(flat, [10, 50, 90], axis=3))
+        deposit_term.append(affordable.mean(axis=(1, 2, 5)))
+    shares, quantiles, deposit_term = (np.concatenate(parts, axis=axis) for parts, axis in
+                                       ((shares, 0), (quantiles, 1), (deposit_term, 0)))
+
+    y, a, g = np.meshgrid(np.arange(n_years), np.arange(n_ages), np.arange(n_genders), indexing="ij")
+    summary = pd.DataFrame(
+        {
+            "Year": years[y.ravel()],
+            "Age_Group": np.asarray(inputs["ages"])[a.ravel()],
+            "Gender": np.asarray(inputs["genders"])[g.ravel()],
+            "Bank_Rate": inputs["rates"][y.ravel()],
+            "Real_House_Price": inputs["prices"][y.ravel()],
+            "Salary": salaries.ravel(),
+            "Share_Affordable": shares.ravel(),
+            "PTI_P10": quantiles[0].ravel(),
+            "PTI_Median": quantiles[1].ravel(),
+            "PTI_P90": quantiles[2].ravel(),
+        }
+    )
+    y, d, t = np.meshgrid(np.arange(n_years), np.arange(len(deposits)), np.arange(len(terms)), indexing="ij")
+    deposit_term = pd.DataFrame(
+        {
+            "Year": years[y.ravel()],
+            "Deposit": np.asarray(deposits)[d.ravel()],
+            "Term": np.asarray(terms)[t.ravel()],
+            "Share_Affordable": deposit_term.ravel(),
+        }
+    )
+    return summary, deposit_term
+
+
+# Evaluate the default grid and save both summary tables
+def build_affordability_scenarios(
+    house_price_path=HOUSE_PRICE_PATH,
+    income_path=INCOME_PATH,
+    bank_rate_path=BANK_RATE_PATH,
+    output_path=OUTPUT_PATH,
+    deposit_term_path=DEPOSIT_TERM_PATH,
+    deposits=DEPOSITS,
+    terms=TERMS,
+    spreads=SPREADS,
+    threshold=AFFORDABLE_SHARE,
+    block_cells=BLOCK_CELLS,
+):
+    with step("read"):
+        inputs = load_inputs(house_price_path, income_path, bank_rate_path)
+    n_scenarios = inputs["salaries"].size * len(deposits) * len(terms) * len(spreads)
+
+    start = time.perf_counter()
+    with step("grid") as record:
+        summary, deposit_term = scenario_summary(inputs, deposits, terms, spreads, threshold, block_cells)
+        add_rows(record, rows_in=n_scenarios)
+    print(f"{n_scenarios:,} scenarios in {time.perf_counter() - start:.2f}s")
+
+    with step("write", rows_out=len(summary) + len(deposit_term)):
+        for df, path in ((summary, output_path), (deposit_term, deposit_term_path)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.round(6).to_csv(path, index=False)
+            print("Saved:", path)
+    return summary, deposit_term
+
+
+# Share of affordable scenarios by age group and year, one heatmap per gender
+def plot_heatmap(summary, out_path=HEATMAP_PATH):
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    genders = list(dict.fromkeys(summary["Gender"]))
+    fig, axes = plt.subplots(1, len(genders), figsize=(14, 5), sharey=True, layout="constrained")
+
+    for ax, gender in zip(np.atleast_1d(axes), genders):
+        subset = summary[summary["Gender"] == gender]
+        grid = subset.pivot(index="Age_Group", columns="Year", values="Share_Affordable")
+        grid = grid.loc[list(dict.fromkeys(subset["Age_Group"]))]
+        image = ax.imshow(grid.to_numpy(), aspect="auto", cmap="RdYlGn", vmin=0, vmax=1, origin="lower")
+        ax.set_yticks(range(len(grid.index)))
+        ax.set_yticklabels(grid.index)
+        tick_every = max(len(grid.columns) // 10, 1)
+        ax.set_xticks(range(0, len(grid.columns), tick_every))
+        ax.set_xticklabels(grid.columns[::tick_every], rotation=45, ha="right")
+        ax.set_xlabel("Year")
+        ax.set_title(gender)
+    np.atleast_1d(axes)[0].set_ylabel("Age Group")
+    fig.suptitle(f"Share of Mortgage Scenarios with Repayments <= {AFFORDABLE_SHARE:.0%} of Income")
+    fig.colorbar(image, ax=axes, label="Share affordable")
+    fig.savefig(out_path)
+    show_figure(fig)
+
+
+# Share affordable against term, one line per deposit, for the latest year
+def plot_deposit_term(deposit_term, out_path=DEPOSIT_TERM_CHART_PATH):
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    year = deposit_term["Year"].max()
+    latest = deposit_term[deposit_term["Year"] == year]
+
+    fig = plt.figure(figsize=(10, 5))
+    for deposit, subset in latest.groupby("Deposit"):
+        plt.plot(subset["Term"], subset["Share_Affordable"], marker="o", label=f"{deposit:.0%} deposit")
+
+    plt.xlabel("Mortgage Term (years)")
+    plt.ylabel("Share of Scenarios Affordable")
+    plt.title(f"Affordability by Deposit and Term ({year}, all ages, genders and rate spreads)")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(out_path)
+    show_figure(fig)
+
+
+# Headless entry points used by src/render.py
+def render_heatmap(path=OUTPUT_PATH, out_path=HEATMAP_PATH):
+    plot_heatmap(pd.read_csv(path), out_path)
+
+
+def render_deposit_term(path=DEPOSIT_TERM_PATH, out_path=DEPOSIT_TERM_CHART_PATH):
+    plot_deposit_term(pd.read_csv(path), out_path)
+
+
+def _floats(text):
+    return np.array([float(x) for x in text.split(",")])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mortgage payment-to-income ratios over a scenario grid")
+    parser.add_argument("--deposits", type=_floats, default=DEPOSITS, help="Comma separated deposit fractions")
+    parser.add_argument("--terms", type=_floats, default=TERMS, help="Comma separated terms in years")
+    parser.add_argument("--spreads", type=_floats, default=SPREADS, help="Comma separated spreads over Bank Rate (pp)")
+    parser.add_argument("--threshold", type=float, default=AFFORDABLE_SHARE)
+    parser.add_argument("--block-cells", type=int, default=BLOCK_CELLS)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--deposit-term-output", default=DEPOSIT_TERM_PATH)
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    summary, deposit_term = build_affordability_scenarios(
+        output_path=args.output,
+        deposit_term_path=args.deposit_term_output,
+        deposits=args.deposits,
+        terms=args.terms,
+        spreads=args.spreads,
+        threshold=args.threshold,
+        block_cells=args.block_cells,
+    )
+    print(summary[summary["Year"] == summary["Year"].max()].to_string(index=False))
+    if not args.no_plot:
+        plot_heatmap(summary)
+        plot_deposit_term(deposit_term)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,35 @@
-import pandas as pd
 import os
 
-# Aggregate quarterly bank rate data into yearly averages
+from src.profiling import add_rows, step
+from src.resample import START_YEAR, resample_bank_rate
+
+# Yearly average Bank Rate, taken directly over the raw observations of each year
+# (averaging the quarterly averages would weight a short final quarter too heavily)
 def aggregate_bank_rate_yearly(
-    input_path="data/clean/bank_rate_quarterly.csv",
+    input_path="data/raw/bank_rate.csv",
     output_path="data/processed/bank_rate_yearly_avg.csv",
+    start_year=START_YEAR,
 ):
-    df = pd.read_csv(input_path)
-
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce") # Convert Year to numeric
-    df["Bank_Rate_Quarterly_Avg"] = pd.to_numeric(
-        df["Bank_Rate_Quarterly_Avg"], errors="coerce"
-    )
+    # Shares one read of the raw file with the quarterly stage when both run in this process
+    with step("resample") as record:
+        years = resample_bank_rate(input_path, start_year)["yearly"]
+        add_rows(record, rows_in=int(years["Count"].sum()))
 
-    df = df.dropna(subset=["Year", "Bank_Rate_Quarterly_Avg"]) # Ensure no NaN values
-    
     yearly = (
-        df.groupby("Year")["Bank_Rate_Quarterly_Avg"] # Aggregate to yearly average
-        .mean()
-        .reset_index()
-        .rename(columns={"Bank_Rate_Quarterly_Avg": "Bank_Rate_Yearly_Avg"})
+        years[["Year", "Mean"]]
+        .round({"Mean": 6})
+        .rename(columns={"Mean": "Bank_Rate_Yearly_Avg"})
+        .reset_index(drop=True)
     )
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    yearly.to_csv(output_path, index=False)
+    with step("write", rows_out=len(yearly)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        yearly.to_csv(output_path, index=False)
 
     print("Saved:", output_path)
     print(yearly.head())
+    return yearly
 
 
 if __name__ == "__main__":
-    aggregate_bank_rate_yearly()
\ No newline at end of file
+    aggregate_bank_rate_yearly()
@@ -1,36 +1,45 @@
 # Aggregate yearly price volatility from UK housing price paid dataset
+import argparse
 import os
-print(os.listdir("/Users/joshuajoji/.cache/kagglehub/datasets/hm-land-registry/uk-housing-prices-paid/versions/2"))
 
-# Ensure kagglehub is installed in your environment
-import kagglehub
+import numpy as np
+import pandas as pd
 
-# Download the dataset if not already present
-base_path = kagglehub.dataset_download("hm-land-registry/uk-housing-prices-paid")
-INPUT_PATH = os.path.join(base_path, "price_paid_records.csv")
+from src.columnar_store import STORE_PATH, days_to_months, open_store, year_row_ranges
+from src.dataset_source import resolve_dataset
+from src.incremental_update import STATE_PATH, apply_update
+from src.ingest import JOB_COLUMNS, auto_chunksize, clean_chunk, parser_dtypes, read_price_paid
+from src.parallel_ingest import reduce_csv_parallel
+from src.price_histogram import histogram_chunk, merge_histograms, month_index, save_histogram
+from src.profiling import add_rows, step, timed_iter
+from src.quantile_sketch import merge_sketches, sketch_chunk, sketch_summary, sketch_values
+from src.streaming_moments import (
+    MOMENT_COLUMNS,
+    chunk_moments,
+    empty_moments,
+    finalize_moments,
+    merge_moments,
+)
 
-# Read and process the dataset in chunks to compute yearly price volatility
-import pandas as pd
+OUTPUT_PATH = "data/processed/yearly_price_volatility.csv"
+# Monthly log-binned price histogram written next to the output (see src/price_histogram.py)
+HISTOGRAM_FILE = "monthly_price_histogram.npz"
 
-# Function to aggregate yearly price volatility
-def aggregate_yearly_volatility():
-    base_path = kagglehub.dataset_download(
-        "hm-land-registry/uk-housing-prices-paid"
-    )
 
-    input_path = os.path.join(base_path, "price_paid_records.csv")
-    output_path = "data/processed/yearly_price_volatility.csv"
+# Typed prices and dates (dropping rows without a valid one) and years for one chunk of the raw file
+def _prepare_chunk(chunk):
+    chunk = clean_chunk(chunk)
+
+    chunk["Year"] = chunk["Date of Transfer"].dt.year
+    return chunk
 
-    chunksize = 1_000_000
+
+# Original approach: keep every price per year, then call .std()
+def _aggregate_exact(input_path, chunksize, memory_mb=None, engine="c"):
     yearly_prices = {}
 # Read the dataset in chunks
-    for chunk in pd.read_csv(input_path, chunksize=chunksize):
-        chunk["Date of Transfer"] = pd.to_datetime(
-            chunk["Date of Transfer"], errors="coerce"
-        )
-        chunk = chunk.dropna(subset=["Date of Transfer", "Price"])
-
-        chunk["Year"] = chunk["Date of Transfer"].dt.year
+    for chunk in read_price_paid(input_path, JOB_COLUMNS["volatility"], chunksize, memory_mb, engine):
+        chunk = _prepare_chunk(chunk)
 
         for year, prices in chunk.groupby("Year")["Price"]:
             yearly_prices.setdefault(year, []).extend(prices.values)
@@ -45,14 +54,177 @@ def aggregate_yearly_volatility():
             }
         )
 
-    df = pd.DataFrame(rows).sort_values("Year")
+    return pd.DataFrame(rows).sort_values("Year"), None
+
+
+# Reduce one raw chunk to per-year moments and quantile sketches, plus the monthly price histogram
+def _chunk_year_stats(chunk):
+    with step("parse_dates"):
+        chunk = _prepare_chunk(chunk)
+    with step("groupby"):
+        return (
+            chunk_moments(chunk["Year"], chunk["Price"]),
+            sketch_chunk(chunk["Year"], chunk["Price"]),
+            histogram_chunk(month_index(chunk["Date of Transfer"]), chunk["Price"]),
+        )
+
+
+def _merge_year_stats(a, b):
+    return merge_moments(a[0], b[0]), merge_sketches(a[1], b[1]), merge_histograms(a[2], b[2])
+
+
+# Yearly table: moment columns plus the robust quantile columns; and the monthly histogram
+def _finalize_year_stats(stats):
+    moments, sketches, histogram = stats if stats is not None else (empty_moments(), {}, None)
+    df = finalize_moments(moments)
+    return df.merge(sketch_summary(sketches), on="Year", how="left"), histogram
+
+
+# One pass keeping only per-year moments and sketches and per-month histograms, so memory is O(months)
+def _aggregate_streaming(input_path, chunksize, memory_mb=None, engine="c"):
+    stats = (empty_moments(), {}, None)
+    for chunk in timed_iter(read_price_paid(input_path, JOB_COLUMNS["volatility"], chunksize, memory_mb, engine)):
+        stats = _merge_year_stats(stats, _chunk_year_stats(chunk))
+
+    return _finalize_year_stats(stats)
+
+
+# Same statistics, with byte ranges of the file parsed across a process pool
+def _aggregate_parallel(input_path, chunksize, workers, memory_mb=None):
+    usecols = JOB_COLUMNS["volatility"]
+    stats = reduce_csv_parallel(
+        input_path,
+        _chunk_year_stats,
+        _merge_year_stats,
+        workers=workers,
+        chunksize=chunksize or auto_chunksize(input_path, usecols, memory_mb),
+        usecols=usecols,
+        dtype=parser_dtypes(usecols),
+    )
+    return _finalize_year_stats(stats)
+
+
+# Statistics straight from the memory-mapped store: each year is one contiguous slice
+def _aggregate_store(store_path):
+    store = open_store(store_path)
+    price, day = store["columns"]["price"], store["columns"]["day"]
+
+    rows, sketches, histogram = {}, {}, None
+    for year, (lo, hi) in year_row_ranges(store).items():
+        prices = np.asarray(price[lo:hi], dtype=np.float64)
+        histogram = merge_histograms(histogram, histogram_chunk(days_to_months(day[lo:hi]), prices))
+        mean = prices.mean()
+        deviation = prices - mean
+        rows[year] = [
+            len(prices),
+            mean,
+            deviation @ deviation,
+            prices.min(),
+            prices.max(),
+            np.log(prices).sum(),
+        ]
+        sketches[year] = sketch_values(prices)
+
+    moments = pd.DataFrame.from_dict(rows, orient="index", columns=MOMENT_COLUMNS)
+    moments.index.name = "Year"
+    return _finalize_year_stats((moments, sketches, histogram))
 
-    os.makedirs("data/processed", exist_ok=True)
-    df.to_csv(output_path, index=False)
+
+# Function to aggregate yearly price volatility
+def aggregate_yearly_volatility(
+    input_path=None,
+    output_path=OUTPUT_PATH,
+    mode="streaming",
+    chunksize=None,
+    workers=None,
+    store_path=STORE_PATH,
+    source=None,
+    engine="c",
+    memory_mb=None,
+    histogram_path=None,
+):
+    # chunksize=None sizes chunks from the memory budget (src/ingest.py); engine="pyarrow" is optional
+    # The monthly histogram goes to histogram_path (default: next to output_path); "exact" mode does not build it
+    # Without an explicit file, the dataset source (see src/dataset_source.py) provides it
+    if input_path is None and mode != "store":
+        input_path = resolve_dataset(source)
+
+    with step(mode) as record:
+        if mode == "streaming":
+            df, histogram = _aggregate_streaming(input_path, chunksize, memory_mb, engine)
+        elif mode == "parallel":
+            df, histogram = _aggregate_parallel(input_path, chunksize, workers, memory_mb)
+        elif mode == "store":
+            df, histogram = _aggregate_store(store_path)
+        elif mode == "exact":
+            df, histogram = _aggregate_exact(input_path, chunksize, memory_mb, engine)
+        else:
+            raise ValueError(f"Unknown aggregation mode: {mode!r}")
+        add_rows(record, rows_in=int(df["Transaction_Count"].sum()))
+
+    with step("write", rows_out=len(df)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        df.to_csv(output_path, index=False)
+        if histogram is not None:
+            save_histogram(histogram, histogram_path or os.path.join(os.path.dirname(output_path), HISTOGRAM_FILE))
 
     print("Saved:", output_path)
     print(df.head())
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate yearly price volatility")
+    parser.add_argument("--input", default=None, help="Path to price_paid_records.csv")
+    parser.add_argument(
+        "--source", default=None,
+        help="Dataset source spec when --input is not given, e.g. synthetic:rows=1000000 or local:path=...",
+    )
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument(
+        "--histogram", default=None,
+        help=f"Monthly price histogram output (default: {HISTOGRAM_FILE} next to --output)",
+    )
+    parser.add_argument("--mode", choices=["streaming", "parallel", "store", "exact"], default=None)
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of worker processes (implies --mode parallel)",
+    )
+    parser.add_argument("--chunksize", type=int, default=None, help="Rows per chunk (default: from --memory-mb)")
+    parser.add_argument(
+        "--memory-mb", type=float, default=None,
+        help="Memory budget per chunk in MB (default: $PRICE_PAID_MEMORY_MB or 256)",
+    )
+    parser.add_argument("--engine", choices=["c", "pyarrow"], default="c", help="CSV parser (pyarrow is optional)")
+    parser.add_argument(
+        "--store", default=STORE_PATH,
+        help="Columnar store built by src/columnar_store.py (used by --mode store)",
+    )
+    parser.add_argument(
+        "--update", metavar="CSV", default=None,
+        help="Apply a monthly Land Registry update file to the saved state instead of a full run",
+    )
+    parser.add_argument("--state", default=STATE_PATH, help="State built by src/incremental_update.py --init")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        apply_update(args.update, args.state, args.output)
+        return
+
+    mode = args.mode or ("parallel" if args.workers else "streaming")
+    aggregate_yearly_volatility(
+        input_path=args.input,
+        output_path=args.output,
+        mode=mode,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        store_path=args.store,
+        source=args.source,
+        engine=args.engine,
+        memory_mb=args.memory_mb,
+        histogram_path=args.histogram,
+    )
 
 
 if __name__ == "__main__":
-    aggregate_yearly_volatility()
\ No newline at end of file
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.dataset_source import synthetic_dataset
+
+# Synthetic inputs, built stores and results live here (not committed)
+BENCHMARK_DIR = "data/benchmarks"
+RESULTS_PATH = os.path.join(BENCHMARK_DIR, "results.json")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+SIZES = [1_000_000, 10_000_000, 30_000_000]
+MODES = ["streaming", "parallel", "store", "exact"]
+
+# Allowed relative slowdown in rows/sec (and growth in peak RSS) before a run counts as a regression
+THRESHOLD = 0.2
+
+# Synthetic file for one size, generated on first use
+def synthetic_path(n_rows, seed=0, directory=BENCHMARK_DIR):
+    return synthetic_dataset(n_rows, seed, directory)
+
+
+# Columnar store for one synthetic file, built on first use (not part of the timing)
+def synthetic_store(input_path):
+    from src.columnar_store import build_store
+
+    store_path = input_path[: -len(".csv")] + "_store"
+    if not os.path.exists(os.path.join(store_path, "meta.json")):
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_store(input_path, store_path)
+    return store_path
+
+
+# One kB field (VmRSS, VmHWM) from /proc/<pid>/status, 0 if the process has exited
+def _status_kb(pid, field):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+# Current RSS in MB of a process plus all of its descendants (Linux only)
+def tree_rss_mb(pid):
+    total, todo = 0, [pid]
+    while todo:
+        pid = todo.pop()
+        total += _status_kb(pid, "VmRSS")
+        try:
+            with open(f"/proc/{pid}/task/{pid}/children") as f:
+                todo.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return total / 1024
+
+
+# Peak memory of this process and its worker processes while the block runs
+class PeakMemory:
+    """
+    ru_maxrss survives fork and exec on Linux, so a freshly spawned process
+    would report its parent's peak; VmHWM and sampling the process tree every
+    `interval` seconds avoid that. Falls back to ru_maxrss without /proc.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, tree_rss_mb(os.getpid()))
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        if os.path.exists("/proc/self/status"):
+            self.peak_mb = max(self.peak_mb, _status_kb("self", "VmHWM") / 1024)
+        else:
+            # ru_maxrss is in bytes on macOS
+            self.peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20
+
+
+# Runs in a fresh interpreter so the peak memory belongs to this aggregation alone
+def _measure(mode, input_path, store_path, workers, chunksize):
+    from src.aggregate_price_paid_volatility import aggregate_yearly_volatility
+
+    output_path = os.path.join(os.path.dirname(input_path), f"output_{os.getpid()}.csv")
+    with PeakMemory() as memory, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        aggregate_yearly_volatility(
+            input_path, output_path, mode=mode, chunksize=chunksize, workers=workers, store_path=store_path
+        )
+        wall = time.perf_counter() - start
+    os.remove(output_path)
+    return {"wall_seconds": wall, "peak_rss_mb": memory.peak_mb}
+
+
+# Time every mode on every size; each measurement runs in its own spawned process
+def run_benchmarks(sizes=SIZES, modes=MODES, seed=0, workers=None, chunksize=None, directory=BENCHMARK_DIR):
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown aggregation modes: {sorted(unknown)}")
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for n_rows in sizes:
+        input_path = synthetic_path(n_rows, seed, directory)
+        store_path = synthetic_store(input_path) if "store" in modes else None
+        for mode in modes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                measured = pool.submit(_measure, mode, input_path, store_path, workers, chunksize).result()
+            measured.update(
+                rows=n_rows,
+                mode=mode,
+                rows_per_second=n_rows / measured["wall_seconds"],
+            )
+            results.append(measured)
+            print(
+                f"{n_rows:>11,} rows  {mode:<9}  {measured['wall_seconds']:8.2f}s  "
+                f"{measured['rows_per_second']:>12,.0f} rows/s  {measured['peak_rss_mb']:8.1f} MB peak RSS"
+            )
+
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {"seed": seed, "workers": workers, "chunksize": chunksize},
+        "results": results,
+    }
+
+
+# Regressions against a baseline: (rows, mode, message) for each result outside the threshold
+def compare_results(current, baseline, threshold=THRESHOLD):
+    base = {(r["rows"], r["mode"]): r for r in baseline["results"]}
+    failures = []
+    for r in current["results"]:
+        ref = base.get((r["rows"], r["mode"]))
+        if ref is None:
+            continue
+        if r["rows_per_second"] < ref["rows_per_second"] * (1 - threshold):
+            change = r["rows_per_second"] / ref["rows_per_second"] - 1
+            failures.append((r["rows"], r["mode"], f"rows/sec {change:+.0%}"))
+        if r["peak_rss_mb"] > ref["peak_rss_mb"] * (1 + threshold):
+            change = r["peak_rss_mb"] / ref["peak_rss_mb"] - 1
+            failures.append((r["rows"], r["mode"], f"peak RSS {change:+.0%}"))
+    return failures
+
+
+def save_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Saved:", path)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the yearly volatility aggregation on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Row counts to generate and time")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for the parallel mode")
+    parser.add_argument("--chunksize", type=int, default=None, help="Rows per chunk (default: from the memory budget)")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=None, help="Compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {BASELINE_PATH}")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.modes, args.seed, args.workers, args.chunksize)
+    save_results(results, args.output)
+    if args.save_baseline:
+        save_results(results, BASELINE_PATH)
+
+    if args.baseline:
+        failures = compare_results(results, load_results(args.baseline), args.threshold)
+        for n_rows, mode, message in failures:
+            print(f"REGRESSION {n_rows:,} rows {mode}: {message}")
+        if failures:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,37 @@
 import os
 import pandas as pd
 
-os.makedirs("data/clean", exist_ok=True)
-
-df = pd.read_csv("data/raw/bank_rate.csv")
-
-df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-df["Bank Rate"] = pd.to_numeric(df["Bank Rate"], errors="coerce")
-
-df = df.dropna(subset=["Date", "Bank Rate"]).sort_values("Date")
-
-df = df[df["Date"].dt.year >= 2011]
-
-df["Year"] = df["Date"].dt.year
-df["Quarter"] = "Q" + df["Date"].dt.quarter.astype(str)
-
-quarterly = (
-    df.groupby(["Year", "Quarter"], as_index=False)["Bank Rate"]
-      .mean()
-      .round(4)
-      .rename(columns={"Bank Rate": "Bank_Rate_Quarterly_Avg"})
-      .sort_values(["Year", "Quarter"])
-)
-output_path = "data/clean/bank_rate_quarterly.csv"
-quarterly.to_csv(output_path, index=False)
-
-print(quarterly.head(8))
-print(f"Rows saved: {len(quarterly)}")
-print(f"Saved: {output_path}")
\ No newline at end of file
+from src.profiling import add_rows, step
+from src.resample import START_YEAR, resample_bank_rate
+
+
+# Quarterly average Bank Rate from the raw Bank of England series
+def clean_bank_rate_quarterly(
+    input_path="data/raw/bank_rate.csv",
+    output_path="data/clean/bank_rate_quarterly.csv",
+    start_year=START_YEAR,
+):
+    # Shares one read of the raw file with the yearly stage when both run in this process
+    with step("resample") as record:
+        quarters = resample_bank_rate(input_path, start_year)["quarterly"]
+        add_rows(record, rows_in=int(quarters["Count"].sum()))
+
+    quarterly = pd.DataFrame(
+        {
+            "Year": quarters["Year"].to_numpy(),
+            "Quarter": "Q" + quarters["Quarter"].astype(str).to_numpy(),
+            "Bank_Rate_Quarterly_Avg": quarters["Mean"].round(4).to_numpy(),
+        }
+    )
+    with step("write", rows_out=len(quarterly)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        quarterly.to_csv(output_path, index=False)
+
+    print(quarterly.head(8))
+    print(f"Rows saved: {len(quarterly)}")
+    print(f"Saved: {output_path}")
+    return quarterly
+
+
+if __name__ == "__main__":
+    clean_bank_rate_quarterly()
@@ -1,12 +1,16 @@
 import pandas as pd
 import os
 
+from src.profiling import add_rows, step
+
 
 def clean_and_average_cpi(
     input_path="data/raw/CPI_quarterly.csv",
     output_path="data/clean/cpi_quarterly_avg.csv",
 ):
-    df = pd.read_csv(input_path)
+    with step("read") as record:
+        df = pd.read_csv(input_path)
+        add_rows(record, rows_in=len(df))
     df = df.iloc[455:].reset_index(drop=True)
 
     df.columns = [c.strip() for c in df.columns]
@@ -14,7 +18,8 @@ def clean_and_average_cpi(
     date_col = df.columns[0]
     value_col = df.columns[1]
 
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    with step("parse_dates"):
+        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
 
     df["Year"] = df[date_col].dt.year
     df["Quarter"] = df[date_col].dt.quarter
@@ -30,15 +35,17 @@ def clean_and_average_cpi(
 
     df = df.dropna().reset_index(drop=True)
 
-    quarterly_avg = (
-        df.groupby(["Year", "Quarter"])["CPI_Index"]
-        .mean()
-        .reset_index()
-        .rename(columns={"CPI_Index": "CPI_Quarterly_Avg"})
-    )
-
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    quarterly_avg.to_csv(output_path, index=False)
+    with step("groupby"):
+        quarterly_avg = (
+            df.groupby(["Year", "Quarter"])["CPI_Index"]
+            .mean()
+            .reset_index()
+            .rename(columns={"CPI_Index": "CPI_Quarterly_Avg"})
+        )
+
+    with step("write", rows_out=len(quarterly_avg)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        quarterly_avg.to_csv(output_path, index=False)
 
     print(quarterly_avg.head())
     print(f"Rows: {len(quarterly_avg)}")
@@ -1,49 +1,39 @@
 import os
 import pandas as pd
 
-os.makedirs("data/clean", exist_ok=True)
-
-df = pd.read_csv(
-    "data/raw/uk_house_price_annual_average_price.csv",
-    skiprows=1,
-    header=None
-)
-df = df.iloc[:, :2]
-df.columns = ["Month", "UK_Average_House_Price"]
-
-df["Date"] = pd.to_datetime(df["Month"], format="%b %Y", errors="coerce")
-
-df["UK_Average_House_Price"] = (
-    df["UK_Average_House_Price"]
-    .astype(str)
-    .str.replace(",", "", regex=False)
-    .str.strip()
-)
-
-df["UK_Average_House_Price"] = pd.to_numeric(
-    df["UK_Average_House_Price"], errors="coerce"
-)
-
-df = df.dropna(subset=["Date", "UK_Average_House_Price"])
-
-df = df[df["Date"].dt.year >= 2011]
-
-df["Year"] = df["Date"].dt.year
-df["Quarter"] = "Q" + df["Date"].dt.quarter.astype(str)
-
-clean_df = (
-    df.groupby(["Year", "Quarter"], as_index=False)["UK_Average_House_Price"]
-      .mean()
-      .round(0)
-      .sort_values(["Year", "Quarter"])
-      .reset_index(drop=True)
-)
-
-clean_df["UK_Average_House_Price"] = clean_df["UK_Average_House_Price"].astype(int)
-
-output_path = "data/clean/uk_house_price_quarterly.csv"
-clean_df.to_csv(output_path, index=False)
-
-print(clean_df.head(8))
-print(f"Rows saved: {len(clean_df)}")
-print(f"Saved: {output_path}")
\ No newline at end of file
+from src.profiling import add_rows, step
+from src.resample import START_YEAR, load_house_price, resample
+
+
+# Quarterly average UK house price from the raw monthly series
+def clean_house_price_quarterly(
+    input_path="data/raw/uk_house_price_annual_average_price.csv",
+    output_path="data/clean/uk_house_price_quarterly.csv",
+    start_year=START_YEAR,
+):
+    with step("read") as record:
+        dates, values = load_house_price(input_path)
+        add_rows(record, rows_in=len(dates))
+    with step("resample"):
+        quarters = resample(dates, values, start_year=start_year, frequencies={"quarterly": 3})["quarterly"]
+
+    clean_df = pd.DataFrame(
+        {
+            "Year": quarters["Year"].to_numpy(),
+            "Quarter": "Q" + quarters["Quarter"].astype(str).to_numpy(),
+            "UK_Average_House_Price": quarters["Mean"].round(0).astype(int).to_numpy(),
+        }
+    )
+
+    with step("write", rows_out=len(clean_df)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        clean_df.to_csv(output_path, index=False)
+
+    print(clean_df.head(8))
+    print(f"Rows saved: {len(clean_df)}")
+    print(f"Saved: {output_path}")
+    return clean_df
+
+
+if __name__ == "__main__":
+    clean_house_price_quarterly()
@@ -1,13 +1,17 @@
 import pandas as pd
 import os
 
+from src.profiling import add_rows, step
+
 
 def clean_real_house_price_salary(
     input_path="data/raw/Average_UK_houseprices_and_salary.csv",
     output_path="data/clean/Average_UK_houseprices_and_salary_clean.csv",
 ):
     # Load raw data
-    df = pd.read_csv(input_path)
+    with step("read") as record:
+        df = pd.read_csv(input_path)
+        add_rows(record, rows_in=len(df))
     df = df.iloc[25:].reset_index(drop=True)
 
 
@@ -33,8 +37,9 @@ def clean_real_house_price_salary(
     df = df.dropna(subset=["Year", "Real_House_Price"]).reset_index(drop=True)
 
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    with step("write", rows_out=len(df)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        df.to_csv(output_path, index=False)
 
     print("✅ Cleaned successfully")
     print(df.head())
@@ -0,0 +1,121 @@
+# Single entry point: python -m src <command> [args]
+# Only argparse/importlib are imported here; each command imports its module on demand.
+import argparse
+import importlib
+import inspect
+import sys
+
+# command -> (module, function, help)
+COMMANDS = {
+    "pipeline": ("src.pipeline", "main", "Run all data stages, skipping ones that are up to date"),
+    "clean-house-prices": (
+        "src.clean_house_price_quarterly", "clean_house_price_quarterly",
+        "Quarterly house prices from the raw monthly series",
+    ),
+    "clean-bank-rate": (
+        "src.clean_bank_rate_quarterly", "clean_bank_rate_quarterly",
+        "Quarterly Bank Rate averages",
+    ),
+    "clean-cpi": ("src.clean_cpi_quarterly", "clean_and_average_cpi", "Quarterly CPI averages"),
+    "clean-real-prices": (
+        "src.clean_real_house_price_salary", "clean_real_house_price_salary",
+        "Clean the real house price + salary dataset",
+    ),
+    "deflate": ("src.deflate_house_prices", "main", "CPI-adjusted quarterly house prices (+ plot)"),
+    "real-volatility": (
+        "src.deflation", "main",
+        "Yearly volatility of CPI-deflated transaction prices (any base quarter)",
+    ),
+    "bank-rate-yearly": (
+        "src.aggregate_bank_rate_yearly", "aggregate_bank_rate_yearly",
+        "Yearly Bank Rate averages",
+    ),
+    "resample": ("src.resample", "main", "Monthly, quarterly and yearly aggregates of the raw series"),
+    "volatility": (
+        "src.aggregate_price_paid_volatility", "main",
+        "Yearly price volatility from the price paid data (see --help)",
+    ),
+    "ingest": ("src.ingest", "main", "Compare the typed price paid reader with the legacy reader"),
+    "refresh": (
+        "src.refresh", "main",
+        "Download changed raw sources concurrently and re-run the affected stages",
+    ),
+    "dataset": ("src.dataset_source", "main", "Resolve and pin the price paid dataset source"),
+    "build-store": ("src.columnar_store", "main", "Convert the price paid CSV to the columnar store"),
+    "incremental": ("src.incremental_update", "main", "Build or update the incremental volatility state"),
+    "cube": ("src.volatility_cube", "main", "Build the multi-dimensional volatility cube"),
+    "affordability": ("src.affordability_analysis", "main", "Affordability ratio over time (+ plot)"),
+    "affordability-by-age": (
+        "src.affordability_by_age", "main",
+        "Affordability by age group and gender (+ plot)",
+    ),
+    "affordability-scenarios": (
+        "src.affordability_scenarios", "main",
+        "Mortgage payment-to-income ratios over a deposit/term/rate scenario grid (+ plots)",
+    ),
+    "quarterly-changes": (
+        "src.quarterly_changes_analysis", "main",
+        "House price growth vs Bank Rate correlation (+ plot)",
+    ),
+    "timeline": (
+        "src.timeline_house_price_vs_bank_rate", "main",
+        "House price vs Bank Rate timeline (plot)",
+    ),
+    "plot-volatility": ("src.plot_price_volatility", "plot_volatility", "Yearly volatility over time (plot)"),
+    "price-density": (
+        "src.price_histogram", "main",
+        "Monthly price quantiles, Gini and entropy from the price histogram (+ heatmap)",
+    ),
+    "volatility-vs-rate": (
+        "src.volatility_vs_interest_rate", "main",
+        "Volatility vs Bank Rate scatter and correlation (+ plot)",
+    ),
+    "benchmark": ("src.benchmark", "main", "Benchmark the volatility aggregation on synthetic data"),
+    "rolling-correlation": (
+        "src.rolling_correlation", "main",
+        "Rolling and lagged Bank Rate vs house price growth correlations (+ heatmap)",
+    ),
+    "validate": ("src.validation", "main", "Check the clean and processed datasets against their rules"),
+    "distributed-lag": (
+        "src.distributed_lag", "main",
+        "Distributed-lag OLS grid of real house price growth on Bank Rate, ranked by AIC/BIC",
+    ),
+    "var": (
+        "src.var_model", "main",
+        "VAR forecasts and bootstrapped responses to a 1pp Bank Rate rise (+ plot)",
+    ),
+    "query-service": (
+        "src.query_service", "main",
+        "Local HTTP/JSON query service over the processed datasets (serve / loadtest)",
+    ),
+    "render": ("src.render", "main", "Render all charts headlessly, skipping unchanged ones"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="UK house price analysis pipeline",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command", required=True)
+    for name, (_, _, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+# Run one command; arguments after the command name go to the command itself
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    parser.parse_args(argv[:1])  # prints help / errors for unknown commands
+
+    module_name, function_name, _ = COMMANDS[argv[0]]
+    target = getattr(importlib.import_module(module_name), function_name)
+    rest = argv[1:]
+
+    if "argv" in inspect.signature(target).parameters:
+        sys.argv = [f"{parser.prog} {argv[0]}"] + rest  # usage lines show the CLI form
+        return target(rest)
+    if rest:
+        parser.error(f"{argv[0]} does not take arguments: {' '.join(rest)}")
+    return target()
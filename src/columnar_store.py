@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.ingest import DATE_COLUMN, JOB_COLUMNS, auto_chunksize, read_price_paid
+
+# Default location of the converted price paid store
+STORE_PATH = "data/price_paid_store"
+STORE_FORMAT = 1
+
+# Raw CSV column -> (store column, dtype, seed dictionary)
+CATEGORY_COLUMNS = {
+    "Property Type": ("property_type", np.int8, ["D", "S", "T", "F", "O"]),
+    "Old/New": ("old_new", np.int8, ["Y", "N"]),
+    "Duration": ("duration", np.int8, ["F", "L", "U"]),
+    "County": ("county", np.int16, []),
+    "District": ("district", np.int16, []),
+}
+STORE_COLUMNS = ["price", "day"] + [name for name, _, _ in CATEGORY_COLUMNS.values()]
+COLUMN_DTYPES = {"price": np.int32, "day": np.int32}
+COLUMN_DTYPES.update({name: dtype for name, dtype, _ in CATEGORY_COLUMNS.values()})
+
+
+# Map a chunk of categorical strings to small ints, growing the dictionary as new values appear
+def _encode(values, dictionary, lookup, dtype):
+    """
+    Only the chunk's categories are looked up (missing values become "");
+    the rows are then mapped by indexing with the category codes.
+    """
+    values = pd.Series(values)
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    labels = list(values.cat.categories.astype(str).str.strip()) + [""]  # code -1 (missing) -> ""
+    for value in labels:
+        if value not in lookup:
+            lookup[value] = len(dictionary)
+            dictionary.append(value)
+    if len(dictionary) > np.iinfo(dtype).max:
+        raise ValueError(f"Too many distinct values for {np.dtype(dtype).name} codes")
+    table = np.array([lookup[value] for value in labels], dtype=dtype)
+    return table[values.cat.codes.to_numpy()]
+
+
+# Day numbers (days since 1970-01-01) -> month numbers (months since 1970-01)
+def days_to_months(days):
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+# Day numbers -> calendar years
+def days_to_years(days):
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+# One-time conversion of the raw CSV into the columnar store
+def build_store(input_path, store_path=STORE_PATH, chunksize=None):
+    """
+    Writes one .npy file per column, sorted by transfer date, plus
+    month_offsets.npy (row offset of each month) and meta.json holding the
+    category dictionaries. Conversion runs in two passes so peak memory is
+    one chunk plus one column, not the whole file. The CSV is read with the
+    typed reader (src/ingest.py); chunksize defaults to the memory budget.
+    """
+    chunksize = chunksize or auto_chunksize(input_path, JOB_COLUMNS["store"])
+    tmp_path = store_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    dictionaries = {name: list(seed) for name, _, seed in CATEGORY_COLUMNS.values()}
+    lookups = {name: {v: i for i, v in enumerate(d)} for name, d in dictionaries.items()}
+    raw_files = {name: open(os.path.join(tmp_path, name + ".raw"), "wb") for name in STORE_COLUMNS}
+
+    n_rows = 0
+    try:
+        for chunk in read_price_paid(input_path, JOB_COLUMNS["store"], chunksize):
+            days = chunk[DATE_COLUMN].to_numpy(dtype="datetime64[D]").astype(np.int32)
+            chunk["Price"].to_numpy(dtype=np.int32).tofile(raw_files["price"])
+            days.tofile(raw_files["day"])
+            for column, (name, dtype, _) in CATEGORY_COLUMNS.items():
+                codes = _encode(chunk[column], dictionaries[name], lookups[name], dtype)
+                codes.tofile(raw_files[name])
+            n_rows += len(chunk)
+    finally:
+        for f in raw_files.values():
+            f.close()
+
+    # Sort every column by transfer date
+    raw_days = np.fromfile(os.path.join(tmp_path, "day.raw"), dtype=np.int32)
+    order = None
+    if n_rows and (np.diff(raw_days) < 0).any():
+        order = np.argsort(raw_days, kind="stable")
+    del raw_days
+
+    for name in STORE_COLUMNS:
+        raw_path = os.path.join(tmp_path, name + ".raw")
+        raw = np.empty(0, dtype=COLUMN_DTYPES[name])
+        if n_rows:
+            raw = np.memmap(raw_path, dtype=COLUMN_DTYPES[name], mode="r", shape=(n_rows,))
+        out = np.lib.format.open_memmap(
+            os.path.join(tmp_path, name + ".npy"), mode="w+", dtype=COLUMN_DTYPES[name], shape=(n_rows,)
+        )
+        for start in range(0, n_rows, chunksize):
+            idx = slice(start, start + chunksize)
+            out[idx] = raw[order[idx]] if order is not None else raw[idx]
+        out.flush()
+        del raw, out
+        os.remove(raw_path)
+
+    # Month offset index: rows of month m are offsets[m - first_month] : offsets[m - first_month + 1]
+    days = np.load(os.path.join(tmp_path, "day.npy"), mmap_mode="r")
+    months = days_to_months(days)
+    first_month = int(months[0]) if n_rows else 0
+    last_month = int(months[-1]) if n_rows else -1
+    offsets = np.searchsorted(months, np.arange(first_month, last_month + 2)).astype(np.int64)
+    np.save(os.path.join(tmp_path, "month_offsets.npy"), offsets)
+    del days, months
+
+    meta = {
+        "format": STORE_FORMAT,
+        "n_rows": n_rows,
+        "first_month": first_month,
+        "columns": {name: np.dtype(COLUMN_DTYPES[name]).name for name in STORE_COLUMNS},
+        "dictionaries": dictionaries,
+        "source": os.path.abspath(input_path),
+    }
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.replace(tmp_path, store_path)
+
+    print("Saved:", store_path)
+    print(f"Rows: {n_rows}")
+    return store_path
+
+
+# Memory-map every column of a store (nothing is read until it is sliced)
+def open_store(store_path=STORE_PATH) -> dict:
+    with open(os.path.join(store_path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != STORE_FORMAT:
+        raise ValueError(f"Unsupported store format: {meta.get('format')!r}")
+
+    columns = {
+        name: np.load(os.path.join(store_path, name + ".npy"), mmap_mode="r")
+        for name in meta["columns"]
+    }
+    return {
+        "meta": meta,
+        "columns": columns,
+        "month_offsets": np.load(os.path.join(store_path, "month_offsets.npy")),
+    }
+
+
+# Row range covering [start, end) given as anything pd.Timestamp understands
+def date_range_rows(store, start=None, end=None):
+    offsets = store["month_offsets"]
+    first_month = store["meta"]["first_month"]
+    n_months = len(offsets) - 1
+    day = store["columns"]["day"]
+
+    def row_of(when, default):
+        if when is None:
+            return default
+        when_day = int(np.datetime64(pd.Timestamp(when).date(), "D").astype(np.int64))
+        month = int(days_to_months(when_day))
+        m = min(max(month - first_month, 0), n_months)
+        lo, hi = int(offsets[m]), int(offsets[min(m + 1, n_months)])
+        # Binary search within the month only
+        return lo + int(np.searchsorted(day[lo:hi], when_day))
+
+    return row_of(start, 0), row_of(end, store["meta"]["n_rows"])
+
+
+# Zero-copy views of the requested columns for transfers in [start, end)
+def slice_dates(store, start=None, end=None, columns=None) -> dict:
+    lo, hi = date_range_rows(store, start, end)
+    names = columns or list(store["columns"])
+    return {name: store["columns"][name][lo:hi] for name in names}
+
+
+# Rows [lo, hi) of each calendar year, using the month index
+def year_row_ranges(store):
+    offsets = store["month_offsets"]
+    first_month = store["meta"]["first_month"]
+    n_months = len(offsets) - 1
+    if n_months <= 0:
+        return {}
+
+    first_year = first_month // 12 + 1970
+    last_year = (first_month + n_months - 1) // 12 + 1970
+    ranges = {}
+    for year in range(first_year, last_year + 1):
+        m0 = min(max((year - 1970) * 12 - first_month, 0), n_months)
+        m1 = min(max((year - 1969) * 12 - first_month, 0), n_months)
+        if offsets[m1] > offsets[m0]:
+            ranges[year] = (int(offsets[m0]), int(offsets[m1]))
+    return ranges
+
+
+# Turn category codes back into their labels
+def decode(store, name, codes):
+    labels = np.asarray(store["meta"]["dictionaries"][name], dtype=object)
+    return labels[np.asarray(codes)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the price paid CSV to a columnar store")
+    parser.add_argument("--input", required=True, help="Path to price_paid_records.csv")
+    parser.add_argument("--output", default=STORE_PATH)
+    parser.add_argument("--chunksize", type=int, default=None, help="Rows per chunk (default: from the memory budget)")
+    args = parser.parse_args(argv)
+    build_store(args.input, args.output, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
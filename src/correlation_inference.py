@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from src.profiling import merge_worker, worker_call
+
+# Defaults for the correlation scripts: the series are a few dozen points, so 10,000 resamples run serially
+# in well under a second; pass workers > 1 to spread larger runs over a process pool
+N_RESAMPLES = 10_000
+BATCH_SIZE = 10_000
+SEED = 0
+
+
+# Pearson r of x[index[i]] against y[index[i]] (or fixed x when x_index is None) for every row i
+def batch_correlations(x, y, x_index=None, y_index=None) -> np.ndarray:
+    xs = x[None, :] if x_index is None else x[x_index]
+    ys = y[None, :] if y_index is None else y[y_index]
+    xs = xs - xs.mean(axis=1, keepdims=True)
+    ys = ys - ys.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (xs * ys).sum(axis=1) / np.sqrt((xs * xs).sum(axis=1) * (ys * ys).sum(axis=1))
+
+
+# Moving-block bootstrap rows: random blocks of consecutive positions, concatenated and cut to n
+def block_bootstrap_indices(rng, n, size, block_length) -> np.ndarray:
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, (size, n_blocks))
+    index = starts[:, :, None] + np.arange(block_length)
+    return index.reshape(size, -1)[:, :n]
+
+
+# Block permutations of range(n), one per row: blocks of consecutive positions in random order, then a random
+# circular shift, so each row keeps the short-run dependence inside its blocks
+def permutation_indices(rng, n, size, block_length=1) -> np.ndarray:
+    n_blocks = -(-n // block_length)
+    order = rng.random((size, n_blocks)).argsort(axis=1)
+    index = (order[:, :, None] * block_length + np.arange(block_length)).reshape(size, -1)
+    index = index[index < n].reshape(size, n)  # the last block may be short
+    return (index + rng.integers(0, n, (size, 1))) % n
+
+
+# Rule-of-thumb block length n^(1/3), at least 2 when there is room
+def default_block_length(n) -> int:
+    return int(min(max(round(n ** (1 / 3)), 2), n))
+
+
+def _bootstrap_batch(size, seed, x, y, block_length):
+    index = block_bootstrap_indices(np.random.default_rng(seed), len(x), size, block_length)
+    return batch_correlations(x, y, index, index)
+
+
+def _permutation_batch(size, seed, x, y, block_length):
+    index = permutation_indices(np.random.default_rng(seed), len(y), size, block_length)
+    return batch_correlations(x, y, y_index=index)
+
+
+# Split n_resamples into fixed batches with their own child seeds, and evaluate them (in a pool)
+def resample_batches(batch, args, n_resamples, batch_size, seed, workers):
+    """
+    batch(size, seed_sequence, *args) returns an array with one row per
+    resample. Batches and seeds depend only on (n_resamples, batch_size,
+    seed), so the result is identical for any number of workers.
+    """
+    sizes = [min(batch_size, n_resamples - start) for start in range(0, n_resamples, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(size, child) + args for size, child in zip(sizes, seeds)]
+
+    if workers == 1 or len(jobs) == 1:
+        parts = [batch(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(map(merge_worker, pool.map(partial(worker_call, batch), *zip(*jobs))))
+    return np.concatenate(parts)
+
+
+def _as_arrays(x, y):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    return x[keep], y[keep]
+
+
+# Percentile confidence interval for Pearson r from a moving-block bootstrap
+def bootstrap_ci(
+    x, y, n_resamples=N_RESAMPLES, confidence=0.95, block_length=None,
+    seed=SEED, workers=1, batch_size=BATCH_SIZE,
+) -> dict:
+    """
+    Blocks of consecutive observations are resampled together, which keeps
+    the short-run autocorrelation of yearly/quarterly series that an i.i.d.
+    bootstrap would destroy.
+    """
+    x, y = _as_arrays(x, y)
+    block_length = block_length or default_block_length(len(x))
+    samples = resample_batches(_bootstrap_batch, (x, y, block_length), n_resamples, batch_size, seed, workers)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(samples, [tail, 100 - tail])
+    return {
+        "r": float(batch_correlations(x, y)[0]),
+        "ci_low": float(low),
+        "ci_high": float(high),
+        "confidence": confidence,
+        "block_length": block_length,
+        "n_resamples": n_resamples,
+    }
+
+
+# Two-sided block-permutation p-value for Pearson r, with the +1 correction so it is never 0
+def permutation_pvalue(
+    x, y, n_resamples=N_RESAMPLES, block_length=None, seed=SEED, workers=1, batch_size=BATCH_SIZE,
+) -> float:
+    """
+    Shuffling single points assumes they are exchangeable, which autocorrelated
+    series are not (two independent trends look correlated far more often than
+    an i.i.d. null allows). Blocks of the same length as the bootstrap's are
+    permuted instead.
+    """
+    x, y = _as_arrays(x, y)
+    block_length = block_length or default_block_length(len(x))
+    observed = abs(batch_correlations(x, y)[0])
+    samples = resample_batches(_permutation_batch, (x, y, block_length), n_resamples, batch_size, seed, workers)
+    return float((np.sum(np.abs(samples) >= observed - 1e-12) + 1) / (n_resamples + 1))
+
+
+# Bootstrap CI and permutation p-value for one pair of series, printed in the scripts' style
+def report_inference(x, y, n_resamples=N_RESAMPLES, seed=SEED, workers=1) -> dict:
+    result = bootstrap_ci(x, y, n_resamples=n_resamples, seed=seed, workers=workers)
+    result["p_permutation"] = permutation_pvalue(
+        x, y, n_resamples=n_resamples, block_length=result["block_length"], seed=seed, workers=workers
+    )
+
+    print(
+        f"Block bootstrap {result['confidence']:.0%} CI (block length {result['block_length']}, "
+        f"{n_resamples:,} resamples): [{result['ci_low']:.3f}, {result['ci_high']:.3f}]"
+    )
+    print(f"Block permutation p-value: {result['p_permutation']:.4f}")
+    return result
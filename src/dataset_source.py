@@ -0,0 +1,221 @@
+# Where the price paid CSV comes from: a local file, a local mirror, kagglehub or a synthetic generator
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utils import file_digest
+
+KAGGLE_DATASET = "hm-land-registry/uk-housing-prices-paid"
+DATASET_FILE = "price_paid_records.csv"
+
+# Resolved sources: spec -> path, size, mtime and sha256 of the file it resolved to
+SOURCE_CACHE_PATH = "data/.dataset_sources.json"
+SYNTHETIC_DIR = "data/synthetic"
+
+# Spec used when none is given; PRICE_PAID_SOURCE overrides it (e.g. "synthetic:rows=100000")
+DEFAULT_SOURCE = "kagglehub"
+SOURCE_ENV = "PRICE_PAID_SOURCE"
+
+BACKENDS = ["local", "mirror", "kagglehub", "synthetic"]
+
+# Column layout of the Kaggle price paid file
+PRICE_PAID_COLUMNS = [
+    "Transaction unique identifier", "Price", "Date of Transfer", "Property Type", "Old/New",
+    "Duration", "Town/City", "District", "County", "PPDCategory Type",
+    "Record Status - monthly file only",
+]
+TOWNS = ["LONDON", "MANCHESTER", "BIRMINGHAM", "LEEDS", "BRISTOL", "YORK", "NORWICH", "CARDIFF"]
+DISTRICTS = ["CAMDEN", "MANCHESTER", "BIRMINGHAM", "LEEDS", "CITY OF BRISTOL", "YORK", "NORWICH", "CARDIFF"]
+COUNTIES = [
+    "GREATER LONDON", "GREATER MANCHESTER", "WEST MIDLANDS", "WEST YORKSHIRE",
+    "CITY OF BRISTOL", "YORK", "NORFOLK", "CARDIFF",
+]
+
+_HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+
+# n random GUIDs formatted like "{81B82214-7FBC-4129-9F6B-4956B4A663AD}"
+def _guids(rng, n) -> np.ndarray:
+    raw = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+    digits = np.empty((n, 32), dtype=np.uint8)
+    digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[raw & 15]
+
+    out = np.empty((n, 38), dtype=np.uint8)
+    out[:, 0], out[:, 37] = ord("{"), ord("}")
+    out[:, [9, 14, 19, 24]] = ord("-")
+    positions = np.r_[1:9, 10:14, 15:19, 20:24, 25:37]
+    out[:, positions] = digits
+    return out.view("S38").ravel().astype(str)
+
+
+# Deterministic synthetic price paid CSV with the real schema, written in blocks
+def write_synthetic_price_paid(path, n_rows, seed=0, block_rows=1_000_000):
+    """
+    Prices are log-normal around £150k, dates uniform over 1995-2017 and the
+    categorical columns drawn from the real code sets, so parsing and grouping
+    cost about what they do on the Kaggle file. The same (n_rows, seed)
+    always produces the same bytes.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    rng = np.random.default_rng(seed)
+    first_day = np.datetime64("1995-01-01")
+    n_days = (np.datetime64("2017-06-30") - first_day).astype(int) + 1
+
+    with open(path + ".tmp", "w", newline="") as f:
+        for start in range(0, n_rows, block_rows):
+            n = min(block_rows, n_rows - start)
+            place = rng.integers(0, len(TOWNS), n)
+            days = first_day + rng.integers(0, n_days, n)
+            block = pd.DataFrame(
+                {
+                    "Transaction unique identifier": _guids(rng, n),
+                    "Price": np.clip(rng.lognormal(11.9, 0.7, n), 1_000, 50_000_000).astype(np.int64),
+                    "Date of Transfer": np.char.add(np.datetime_as_string(days, unit="D"), " 00:00"),
+                    "Property Type": rng.choice(list("DSTFO"), n, p=[0.23, 0.27, 0.3, 0.18, 0.02]),
+                    "Old/New": rng.choice(list("YN"), n, p=[0.1, 0.9]),
+                    "Duration": rng.choice(list("FL"), n, p=[0.75, 0.25]),
+                    "Town/City": np.asarray(TOWNS)[place],
+                    "District": np.asarray(DISTRICTS)[place],
+                    "County": np.asarray(COUNTIES)[place],
+                    "PPDCategory Type": "A",
+                    "Record Status - monthly file only": "A",
+                },
+                columns=PRICE_PAID_COLUMNS,
+            )
+            block.to_csv(f, index=False, header=start == 0)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# "backend:key=value,key=value" -> {"backend": ..., options}
+def parse_source(spec) -> dict:
+    """
+    local:path=/data/price_paid_records.csv
+    mirror:directory=/mnt/kaggle,version=1      (kagglehub cache layout)
+    kagglehub:version=1
+    synthetic:rows=1000000,seed=0
+    Any backend also takes sha256=<hex> to pin the file contents.
+    """
+    if isinstance(spec, dict):
+        return dict(spec)
+    backend, _, options = str(spec).partition(":")
+    source = {"backend": backend.strip()}
+    for option in filter(None, options.split(",")):
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"Dataset source option must be key=value: {option!r}")
+        source[key.strip()] = value.strip()
+    if source["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown dataset source backend {source['backend']!r} (expected one of {BACKENDS})")
+    return source
+
+
+def _local(source):
+    return source["path"]
+
+
+# A copy of kagglehub's cache: <directory>/<owner>/<dataset>/versions/<n>/price_paid_records.csv
+def _mirror(source):
+    versions_dir = os.path.join(source["directory"], *KAGGLE_DATASET.split("/"), "versions")
+    version = source.get("version")
+    if version is None:
+        found = [int(v) for v in os.listdir(versions_dir) if v.isdigit()] if os.path.isdir(versions_dir) else []
+        if not found:
+            raise FileNotFoundError(f"No dataset versions under {versions_dir}")
+        version = max(found)
+    return os.path.join(versions_dir, str(version), DATASET_FILE)
+
+
+def _kagglehub(source):
+    # Ensure kagglehub is installed in your environment
+    import kagglehub
+
+    handle = KAGGLE_DATASET
+    if source.get("version"):
+        handle += f"/versions/{source['version']}"
+    return os.path.join(kagglehub.dataset_download(handle), DATASET_FILE)
+
+
+# Synthetic file for one size and seed, generated on first use
+def synthetic_dataset(rows, seed=0, directory=SYNTHETIC_DIR):
+    path = os.path.join(directory, f"price_paid_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {path} ...")
+        write_synthetic_price_paid(path, rows, seed)
+    return path
+
+
+def _synthetic(source):
+    return synthetic_dataset(
+        int(source.get("rows", 1_000_000)), int(source.get("seed", 0)), source.get("directory", SYNTHETIC_DIR)
+    )
+
+
+RESOLVERS = {"local": _local, "mirror": _mirror, "kagglehub": _kagglehub, "synthetic": _synthetic}
+
+
+def _load_cache(cache_path):
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f)
+    return {}
+
+
+def _save_cache(cache, cache_path):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path + ".tmp", "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(cache_path + ".tmp", cache_path)
+
+
+# Path of the price paid CSV for a source spec, resolved once and then served from the cache
+def resolve_dataset(spec=None, cache_path=SOURCE_CACHE_PATH):
+    """
+    While the cached file keeps its size and mtime, the backend is not called
+    at all (no kagglehub download check). A sha256 pin is checked whenever
+    the file is (re)hashed, and a mismatch raises ValueError.
+    """
+    spec = spec or os.environ.get(SOURCE_ENV) or DEFAULT_SOURCE
+    source = parse_source(spec)
+    key = json.dumps(source, sort_keys=True)
+    cache = _load_cache(cache_path)
+
+    cached = cache.get(key)
+    if cached and os.path.exists(cached["path"]):
+        st = os.stat(cached["path"])
+        if [st.st_size, st.st_mtime_ns] == cached["stat"]:
+            return cached["path"]
+
+    path = RESOLVERS[source["backend"]](source)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset source {spec!r} resolved to a missing file: {path}")
+
+    digests = {}
+    digest = file_digest(path, digests)
+    if source.get("sha256") and digest != source["sha256"].lower():
+        raise ValueError(f"Checksum mismatch for {path}: expected {source['sha256']}, got {digest}")
+
+    size, mtime_ns, _ = digests[path]
+    cache[key] = {"path": path, "stat": [size, mtime_ns], "sha256": digest}
+    _save_cache(cache, cache_path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve (and cache) the price paid dataset")
+    parser.add_argument("source", nargs="?", default=None, help=f"Source spec (default: ${SOURCE_ENV} or {DEFAULT_SOURCE})")
+    parser.add_argument("--cache", default=SOURCE_CACHE_PATH)
+    args = parser.parse_args(argv)
+
+    path = resolve_dataset(args.source, args.cache)
+    record = next(r for r in _load_cache(args.cache).values() if r["path"] == path)
+    print(path)
+    print("sha256:", record["sha256"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,45 @@
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# Helper function to convert quarter representation to integer
-def quarter_to_int(q):
-    if isinstance(q, str):
-        q = q.strip().upper()
-        if q.startswith("Q"):
-            q = q[1:]
-    return int(q)
-
-# Load house prices data
-def load_house_prices(path="data/clean/uk_house_price_quarterly.csv") -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
-    df["Quarter"] = df["Quarter"].apply(quarter_to_int)
-    df["UK_Average_House_Price"] = pd.to_numeric(df["UK_Average_House_Price"], errors="coerce")
-    df = df.dropna(subset=["Year", "Quarter", "UK_Average_House_Price"]).copy()
-    df["Year"] = df["Year"].astype(int)
-    df["Quarter"] = df["Quarter"].astype(int)
-    return df
-
-# Load CPI quarterly average data
-def load_cpi_quarterly_avg(path="data/clean/cpi_quarterly_avg.csv") -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
-    df["Quarter"] = df["Quarter"].apply(quarter_to_int)
-    df["CPI_Quarterly_Avg"] = pd.to_numeric(df["CPI_Quarterly_Avg"], errors="coerce")
-    df = df.dropna(subset=["Year", "Quarter", "CPI_Quarterly_Avg"]).copy()
-    df["Year"] = df["Year"].astype(int)
-    df["Quarter"] = df["Quarter"].astype(int)
-    return df
-
-# Merge house prices with CPI data
-def merge_house_and_cpi(house: pd.DataFrame, cpi: pd.DataFrame) -> pd.DataFrame:
-    df = pd.merge(house, cpi, on=["Year", "Quarter"], how="inner")
-    df["t"] = df["Year"] * 4 + (df["Quarter"] - 1)
-    df = df.sort_values("t").reset_index(drop=True)
-    df["Year_Quarter"] = df["Year"].astype(str) + " Q" + df["Quarter"].astype(str)
-    return df
+
+from src.deflation import cpi_ratio_table, deflate
+from src.profiling import add_rows, step
+from src.quarterly_panel import get_panel
+from src.utils import show_figure
+
+# House prices, CPI inflation and the CPI index for the quarters that have both, from the shared quarterly panel
+def load_house_and_cpi(
+    house_path="data/clean/uk_house_price_quarterly.csv",
+    cpi_path="data/clean/cpi_quarterly_avg.csv",
+) -> pd.DataFrame:
+    panel = get_panel(house_path=house_path, cpi_path=cpi_path)
+    df = panel.dropna(subset=["UK_Average_House_Price", "CPI_Index"]).reset_index()
+    df["UK_Average_House_Price"] = df["UK_Average_House_Price"].astype("int64")
+    return df[["Year", "Quarter", "UK_Average_House_Price", "CPI_Quarterly_Avg", "CPI_Index", "t", "Year_Quarter"]]
 
 # Deflate house prices using CPI
-def deflate_house_prices(df: pd.DataFrame) -> pd.DataFrame:
+def deflate_house_prices(df: pd.DataFrame, base_period=None) -> pd.DataFrame:
     """
-    Convert nominal prices to real prices using CPI.
-    Base period CPI = first row of merged dataset.
+    Convert nominal prices to real prices using the CPI index (chained from
+    the inflation rates, see src/deflation.py).
+    Base period CPI = first row of merged dataset, unless base_period
+    (a period number t or a "2015 Q1" label) is given.
     Real_Price = Nominal_Price * (CPI_base / CPI_t)
     """
     out = df.copy()
-    cpi_base = float(out["CPI_Quarterly_Avg"].iloc[0])
-    out["CPI_Base"] = cpi_base
-    out["Real_House_Price"] = out["UK_Average_House_Price"] * (cpi_base / out["CPI_Quarterly_Avg"])
+    table = cpi_ratio_table(out["t"], out["CPI_Index"], base_period)
+    out["CPI_Base"] = table["cpi_base"]
+    out["Real_House_Price"] = deflate(table, out["t"], out["UK_Average_House_Price"])
     return out
 
 
-from matplotlib.ticker import FuncFormatter
 # Plot nominal vs real house prices
 def plot_nominal_vs_real(
     df: pd.DataFrame,
     out_path="outputs/nominal_vs_real_house_prices.png",
 ) -> None:
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter
+
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
     fig, ax = plt.subplots(figsize=(12, 5))
@@ -93,19 +73,39 @@ def plot_nominal_vs_real(
 
     fig.tight_layout()
     fig.savefig(out_path)
-    plt.show()
+    show_figure(fig)
+
+
+# Headless entry point used by src/render.py (plots the saved real price dataset)
+def render_chart(
+    path="data/processed/house_prices_with_cpi_real.csv",
+    out_path="outputs/nominal_vs_real_house_prices.png",
+):
+    plot_nominal_vs_real(pd.read_csv(path), out_path)
+
+
+# Load, merge, deflate and save the real house price dataset
+def build_real_house_prices(
+    house_path="data/clean/uk_house_price_quarterly.csv",
+    cpi_path="data/clean/cpi_quarterly_avg.csv",
+    output_path="data/processed/house_prices_with_cpi_real.csv",
+) -> pd.DataFrame:
+    with step("read") as record:
+        df = load_house_and_cpi(house_path, cpi_path)
+        add_rows(record, rows_in=len(df))
+    with step("deflate"):
+        merged = deflate_house_prices(df)
+    with step("write", rows_out=len(merged)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        merged.to_csv(output_path, index=False)
+    return merged
 
 
 def main():
-    house = load_house_prices()
-    cpi = load_cpi_quarterly_avg()
-    merged = merge_house_and_cpi(house, cpi)
-    merged = deflate_house_prices(merged)
-    os.makedirs("data/processed", exist_ok=True)
-    merged.to_csv("data/processed/house_prices_with_cpi_real.csv", index=False)
+    merged = build_real_house_prices()
     plot_nominal_vs_real(merged)
 
-    print(merged[["Year", "Quarter", "UK_Average_House_Price", "CPI_Quarterly_Avg", "Real_House_Price"]].head())
+    print(merged[["Year", "Quarter", "UK_Average_House_Price", "CPI_Index", "Real_House_Price"]].head())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,212 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.columnar_store import days_to_months, days_to_years, open_store
+from src.ingest import JOB_COLUMNS, read_price_paid
+from src.quantile_sketch import merge_sketches, sketch_chunk, sketch_summary
+from src.quarterly_panel import load_quarterly_series, parse_quarter, period_index
+from src.streaming_moments import chunk_moments, empty_moments, finalize_moments, merge_moments
+
+CPI_PATH = "data/clean/cpi_quarterly_avg.csv"
+# The clean CPI file holds the quarterly average of the 12-month CPIH inflation rate (%), not a price level
+RATE_COLUMN = "CPI_Quarterly_Avg"
+INDEX_BASE = 100.0
+REAL_VOLATILITY_PATH = "data/processed/yearly_real_price_volatility.csv"
+
+
+# Quarterly period t from an int t or a "2015 Q1" label
+def parse_period(period) -> int:
+    if isinstance(period, str):
+        year, _, quarter = period.strip().partition(" ")
+        return int(period_index(int(year), parse_quarter([quarter]).iloc[0]))
+    return int(period)
+
+
+# Price index chained from annual inflation rates (%): each quarter grows by (1 + rate / 100) ** (1 / 4)
+def cpi_index_from_rates(periods, rates, base=INDEX_BASE) -> pd.Series:
+    """
+    Returns a Series indexed by period, equal to base in the first quarter.
+    The rates must cover consecutive quarters: a missing quarter would leave
+    every later level unknown.
+    """
+    rates = pd.Series(np.asarray(rates, dtype=np.float64), index=np.asarray(periods, dtype=np.int64))
+    rates = rates.dropna().sort_index()
+    if not len(rates):
+        raise ValueError("No CPI inflation rates to build an index from")
+    if not rates.index.is_unique or (np.diff(rates.index) != 1).any():
+        raise ValueError("CPI inflation rates must cover consecutive, unique quarters")
+    if (rates <= -100).any():
+        raise ValueError("CPI inflation rates must be above -100%")
+
+    growth = (1 + rates.to_numpy() / 100) ** 0.25
+    growth[0] = 1.0
+    return pd.Series(base * np.cumprod(growth), index=pd.Index(rates.index, name="t"), name="CPI_Index")
+
+
+# CPI index by period from the clean quarterly CPI (inflation rate) file
+def load_cpi_index(cpi_path=CPI_PATH) -> pd.Series:
+    rates = load_quarterly_series(cpi_path, RATE_COLUMN)
+    return cpi_index_from_rates(rates.index, rates.to_numpy())
+
+
+# Dense lookup: ratio[t - first_period] = CPI(base) / CPI(t), NaN for quarters without CPI
+def cpi_ratio_table(periods, cpi, base_period=None) -> dict:
+    """
+    cpi is a price index level (see cpi_index_from_rates), never an
+    inflation rate. base_period is a period number or a "2015 Q1" label;
+    by default it is the first period with a CPI value.
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    cpi = np.asarray(cpi, dtype=np.float64)
+    keep = ~np.isnan(cpi)
+    periods, cpi = periods[keep], cpi[keep]
+    if len(np.unique(periods)) != len(periods):
+        raise ValueError("CPI periods must be unique")
+    if not len(periods):
+        raise ValueError("No CPI values to deflate with")
+    if not (np.isfinite(cpi) & (cpi > 0)).all():
+        raise ValueError("CPI values must be a positive, finite price index (not inflation rates)")
+
+    first = int(periods.min())
+    dense = np.full(int(periods.max()) - first + 1, np.nan)
+    dense[periods - first] = cpi
+
+    base = first if base_period is None else parse_period(base_period)
+    if not (first <= base < first + len(dense)) or np.isnan(dense[base - first]):
+        raise ValueError(f"No CPI value for base period {base_period!r}")
+    cpi_base = dense[base - first]
+    return {"first_period": first, "ratio": cpi_base / dense, "base_period": base, "cpi_base": cpi_base}
+
+
+# CPI table from the clean quarterly CPI file
+def load_cpi_table(cpi_path=CPI_PATH, base_period=None) -> dict:
+    cpi = load_cpi_index(cpi_path)
+    return cpi_ratio_table(cpi.index, cpi.to_numpy(), base_period)
+
+
+# CPI ratio for each period by array indexing (NaN outside the table)
+def ratios_for(table, periods) -> np.ndarray:
+    ratio = table["ratio"]
+    index = np.asarray(periods, dtype=np.int64) - table["first_period"]
+    inside = (index >= 0) & (index < len(ratio))
+    return np.where(inside, ratio[np.clip(index, 0, len(ratio) - 1)], np.nan)
+
+
+# Real values for one or many nominal series: nominal has shape (n,) or (n, k), periods shape (n,)
+def deflate(table, periods, nominal) -> np.ndarray:
+    ratio = ratios_for(table, periods)
+    nominal = np.asarray(nominal, dtype=np.float64)
+    return nominal * (ratio if nominal.ndim == 1 else ratio[:, None])
+
+
+# Add Real_<column> for several nominal columns of a frame keyed by quarterly period
+def deflate_frame(df, columns, table, period_column="t", prefix="Real_") -> pd.DataFrame:
+    out = df.copy()
+    real = deflate(table, out[period_column], out[list(columns)].to_numpy())
+    for i, column in enumerate(columns):
+        out[prefix + column] = real[:, i]
+    return out
+
+
+# Quarterly period of each transfer date given as days since 1970
+def days_to_periods(days) -> np.ndarray:
+    return (days_to_months(days) + 1970 * 12) // 3
+
+
+# Real price of each transaction (NaN when its quarter has no CPI)
+def deflate_transactions(table, prices, days) -> np.ndarray:
+    return deflate(table, days_to_periods(days), prices)
+
+
+# Per-year moments and sketches of real prices for one block of transactions
+def _real_year_stats(table, prices, days):
+    real = deflate_transactions(table, prices, days)
+    keep = np.isfinite(real)
+    years = days_to_years(np.asarray(days)[keep])
+    return chunk_moments(years, real[keep]), sketch_chunk(years, real[keep])
+
+
+# Yearly volatility of CPI-deflated transaction prices, streamed from the CSV or the columnar store
+def real_price_volatility(
+    input_path=None,
+    output_path=REAL_VOLATILITY_PATH,
+    cpi_path=CPI_PATH,
+    base_period=None,
+    store_path=None,
+    chunksize=None,
+    source=None,
+) -> pd.DataFrame:
+    """
+    Each block is deflated by indexing the CPI ratio table with its quarter
+    numbers (no merge) and reduced to per-year moments and sketches, so
+    memory stays O(years) for any number of transactions. Transactions in
+    quarters without CPI are left out.
+    """
+    table = load_cpi_table(cpi_path, base_period)
+    moments, sketches = empty_moments(), {}
+
+    if store_path:
+        store = open_store(store_path)
+        price, day = store["columns"]["price"], store["columns"]["day"]
+        block_rows = chunksize or 5_000_000
+        blocks = (
+            (price[lo : lo + block_rows], day[lo : lo + block_rows])
+            for lo in range(0, store["meta"]["n_rows"], block_rows)
+        )
+    else:
+        if input_path is None:
+            from src.dataset_source import resolve_dataset
+
+            input_path = resolve_dataset(source)
+        blocks = _csv_blocks(input_path, chunksize)
+
+    for prices, days in blocks:
+        year_moments, year_sketches = _real_year_stats(table, prices, days)
+        moments = merge_moments(moments, year_moments)
+        sketches = merge_sketches(sketches, year_sketches)
+
+    df = finalize_moments(moments).merge(sketch_summary(sketches), on="Year", how="left")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df.to_csv(output_path, index=False)
+    print("Saved:", output_path)
+    print(df.head())
+    return df
+
+
+# (prices, days since 1970) for each chunk of the raw CSV
+def _csv_blocks(input_path, chunksize):
+    for chunk in read_price_paid(input_path, JOB_COLUMNS["volatility"], chunksize):
+        dates = chunk["Date of Transfer"]
+        keep = dates.notna().to_numpy()
+        days = dates[keep].to_numpy(dtype="datetime64[D]").astype(np.int64)
+        yield chunk["Price"].to_numpy(dtype=np.float64)[keep], days
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yearly volatility of CPI-deflated price paid transactions")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--input", default=None, help="Path to price_paid_records.csv")
+    source.add_argument("--store", default=None, help="Columnar store built by src/columnar_store.py")
+    source.add_argument("--source", default=None, help="Dataset source spec (see src/dataset_source.py)")
+    parser.add_argument("--cpi", default=CPI_PATH)
+    parser.add_argument("--base", default=None, help='Base period, e.g. "2015 Q1" (default: first CPI quarter)')
+    parser.add_argument("--output", default=REAL_VOLATILITY_PATH)
+    parser.add_argument("--chunksize", type=int, default=None, help="Rows per chunk (default: from the memory budget)")
+    args = parser.parse_args(argv)
+
+    real_price_volatility(
+        input_path=args.input,
+        output_path=args.output,
+        cpi_path=args.cpi,
+        base_period=args.base,
+        store_path=args.store,
+        chunksize=args.chunksize,
+        source=args.source,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.profiling import add_rows, merge_worker, step, worker_call
+from src.quarterly_panel import get_panel
+
+OUTPUT_PATH = "data/processed/distributed_lag_models.csv"
+
+# Specification grid: Bank Rate lags 0..L, CPI control, and sample window (first year, last year or None for latest)
+LAG_LENGTHS = range(0, 9)
+CPI_CONTROLS = ("none", "level", "lags")
+START_YEARS = range(2011, 2017)
+END_YEARS = (2019, None)
+
+# Specifications with fewer residual degrees of freedom are not fitted
+MIN_DOF = 10
+# Specifications sent to a worker at a time
+BATCH_SIZE = 32
+
+# Design matrix shared by the fits of this process (set once per worker by the pool initializer)
+_shared = {}
+
+
+# Quarterly real house price growth (%), Bank Rate and CPI inflation on a gap-free quarter index
+# (Real_House_Price is deflated by the CPI index from src/deflation.py; CPI_Quarterly_Avg stays the inflation rate)
+def load_quarterly_data(
+    house_path="data/clean/uk_house_price_quarterly.csv",
+    cpi_path="data/clean/cpi_quarterly_avg.csv",
+    bank_path="data/clean/bank_rate_quarterly.csv",
+) -> pd.DataFrame:
+    panel = get_panel(house_path=house_path, cpi_path=cpi_path, bank_path=bank_path)
+    panel = panel.reindex(range(panel.index.min(), panel.index.max() + 1))
+    panel["Real_Growth"] = panel["Real_House_Price"].pct_change(fill_method=None) * 100
+    return panel[["Real_Growth", "Bank_Rate_Quarterly_Avg", "CPI_Quarterly_Avg"]]
+
+
+# Column k holds x[t - lags[k]] (NaN before the start of the series)
+def lag_matrix(x, lags) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    index = np.arange(len(x))[:, None] - np.asarray(lags)[None, :]
+    return np.where(index >= 0, x[np.clip(index, 0, None)], np.nan)
+
+
+# One design matrix holding every regressor any specification uses, plus y and the rows usable by all of them
+def design_matrix(df, max_lag=max(LAG_LENGTHS)) -> dict:
+    """
+    Columns: const, Bank_Rate_L0..L{max_lag}, CPI_L0..L{max_lag}. A row is
+    usable when y and every column are present, so all specifications in a
+    sample window are estimated on the same observations and their AIC/BIC
+    are comparable.
+    """
+    lags = range(max_lag + 1)
+    X = np.column_stack(
+        [
+            np.ones(len(df)),
+            lag_matrix(df["Bank_Rate_Quarterly_Avg"], lags),
+            lag_matrix(df["CPI_Quarterly_Avg"], lags),
+        ]
+    )
+    y = df["Real_Growth"].to_numpy(dtype=np.float64)
+    columns = ["const"] + [f"Bank_Rate_L{k}" for k in lags] + [f"CPI_L{k}" for k in lags]
+    usable = np.isfinite(y) & np.isfinite(X).all(axis=1)
+    return {"X": X, "y": y, "t": df.index.to_numpy(), "columns": columns, "usable": usable}
+
+
+# Every (lags, CPI control, window) specification as column and row positions into the shared design
+def specifications(design, lag_lengths=LAG_LENGTHS, cpi_controls=CPI_CONTROLS,
+                   start_years=START_YEARS, end_years=END_YEARS) -> list:
+    position = {name: i for i, name in enumerate(design["columns"])}
+    years = design["t"] // 4
+    last_year = int(years[design["usable"]].max())
+
+    specs = []
+    for start in start_years:
+        for end in end_years:
+            end = last_year if end is None else end
+            rows = np.flatnonzero(design["usable"] & (years >= start) & (years <= end))
+            for lags in lag_lengths:
+                bank = [position[f"Bank_Rate_L{k}"] for k in range(lags + 1)]
+                for control in cpi_controls:
+                    if control == "lags" and lags == 0:
+                        continue  # same model as "level"
+                    cpi = {"none": [], "level": [position["CPI_L0"]]}.get(
+                        control, [position[f"CPI_L{k}"] for k in range(lags + 1)]
+                    )
+                    cols = [position["const"]] + bank + cpi
+                    if len(rows) - len(cols) < MIN_DOF:
+                        continue
+                    specs.append(
+                        {"Lags": lags, "CPI_Control": control, "Start": start, "End": end,
+                         "rows": rows, "cols": cols, "n_bank": len(bank)}
+                    )
+    return specs
+
+
+# Newey-West rule of thumb for the HAC truncation lag
+def newey_west_lags(n) -> int:
+    return int(np.floor(4 * (n / 100) ** (2 / 9)))
+
+
+# OLS with HAC standard errors for one specification; Bank Rate's long-run effect is the sum of its lag coefficients
+def fit_specification(X, y, spec, hac_lags=None) -> dict:
+    import statsmodels.api as sm
+    from scipy.stats import norm
+
+    rows, cols = spec["rows"], spec["cols"]
+    maxlags = newey_west_lags(len(rows)) if hac_lags is None else hac_lags
+    fit = sm.OLS(y[rows], X[np.ix_(rows, cols)]).fit(cov_type="HAC", cov_kwds={"maxlags": maxlags})
+
+    weights = np.zeros(len(cols))
+    weights[1 : 1 + spec["n_bank"]] = 1.0
+    long_run = float(weights @ fit.params)
+    long_run_se = float(np.sqrt(weights @ fit.cov_params() @ weights))
+    z = long_run / long_run_se if long_run_se > 0 else np.nan
+    return {
+        "Lags": spec["Lags"],
+        "CPI_Control": spec["CPI_Control"],
+        "Start": spec["Start"],
+        "End": spec["End"],
+        "N": len(rows),
+        "K": len(cols),
+        "HAC_Lags": maxlags,
+        "Bank_Rate_L0": float(fit.params[1]),
+        "Bank_Rate_L0_SE": float(fit.bse[1]),
+        "Long_Run_Effect": long_run,
+        "Long_Run_SE": long_run_se,
+        "Long_Run_P": float(2 * norm.sf(abs(z))),
+        "R2": float(fit.rsquared),
+        "Adj_R2": float(fit.rsquared_adj),
+        "AIC": float(fit.aic),
+        "BIC": float(fit.bic),
+    }
+
+
+def _init_worker(X, y):
+    _shared.update(X=X, y=y)
+
+
+def _fit_batch(specs, hac_lags):
+    return [fit_specification(_shared["X"], _shared["y"], spec, hac_lags) for spec in specs]
+
+
+# Fit every specification, in a process pool when workers != 1; results do not depend on the worker count
+def fit_grid(design, specs, workers=None, hac_lags=None, batch_size=BATCH_SIZE) -> pd.DataFrame:
+    """
+    The design matrix goes to each worker once (pool initializer) and tasks
+    only carry row/column positions, so a batch costs the fits alone.
+    """
+    batches = [specs[i : i + batch_size] for i in range(0, len(specs), batch_size)]
+    if workers == 1 or len(batches) <= 1:
+        _init_worker(design["X"], design["y"])
+        parts = [_fit_batch(batch, hac_lags) for batch in batches]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(design["X"], design["y"])
+        ) as pool:
+            outputs = pool.map(partial(worker_call, _fit_batch), batches, [hac_lags] * len(batches))
+            parts = [merge_worker(output) for output in outputs]
+    return pd.DataFrame([row for part in parts for row in part])
+
+
+# Rank models by AIC and BIC within each sample window (criteria are only comparable on the same observations)
+def rank_models(results) -> pd.DataFrame:
+    window = results.groupby(["Start", "End"])
+    results = results.assign(
+        Rank_AIC=window["AIC"].rank(method="min").astype(int),
+        Rank_BIC=window["BIC"].rank(method="min").astype(int),
+    )
+    return results.sort_values(["Start", "End", "Rank_AIC", "Rank_BIC"], kind="stable").reset_index(drop=True)
+
+
+# Fit and rank the whole distributed-lag grid and save the model table
+def build_distributed_lag_models(
+    house_path="data/clean/uk_house_price_quarterly.csv",
+    cpi_path="data/clean/cpi_quarterly_avg.csv",
+    bank_path="data/clean/bank_rate_quarterly.csv",
+    output_path=OUTPUT_PATH,
+    workers=None,
+    hac_lags=None,
+) -> pd.DataFrame:
+    with step("read") as record:
+        df = load_quarterly_data(house_path, cpi_path, bank_path)
+        add_rows(record, rows_in=len(df))
+    with step("design"):
+        design = design_matrix(df)
+        specs = specifications(design)
+
+    start = time.perf_counter()
+    with step("fit", rows_in=len(specs)):
+        table = rank_models(fit_grid(design, specs, workers, hac_lags))
+    print(f"{len(table)} distributed-lag models in {time.perf_counter() - start:.2f}s")
+
+    with step("write", rows_out=len(table)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        table.to_csv(output_path, index=False)
+    print("Saved:", output_path)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Distributed-lag OLS of real house price growth on Bank Rate over a specification grid"
+    )
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 fits in this process)")
+    parser.add_argument("--hac-lags", type=int, default=None, help="HAC truncation lag (default: Newey-West rule)")
+    parser.add_argument("--top", type=int, default=3, help="Best models by AIC to print per sample window")
+    args = parser.parse_args(argv)
+
+    table = build_distributed_lag_models(output_path=args.output, workers=args.workers, hac_lags=args.hac_lags)
+    columns = ["Start", "End", "Lags", "CPI_Control", "N", "Long_Run_Effect", "Long_Run_SE", "Long_Run_P", "AIC", "BIC"]
+    print(table[table["Rank_AIC"] <= args.top][columns].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
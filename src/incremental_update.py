@@ -0,0 +1,371 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.ingest import DATE_COLUMN, JOB_COLUMNS, parse_transfer_dates, read_price_paid
+from src.quantile_sketch import (
+    N_BUCKETS,
+    merge_sketches,
+    sketch_chunk,
+    sketch_summary,
+    subtract_sketches,
+)
+from src.streaming_moments import (
+    chunk_moments,
+    empty_moments,
+    finalize_moments,
+    merge_moments,
+    subtract_moments,
+)
+
+# Persisted per-year/per-month moments, per-year sketches and the transactions already applied
+STATE_PATH = "data/price_paid_state"
+OUTPUT_PATH = "data/processed/yearly_price_volatility.csv"
+
+# Applied transactions: a sorted base (one .npy per array, memory-mapped) plus one small sorted delta
+# segment per update, listed in manifest.json. Segments are merged into the base (compaction) once they
+# hold more than COMPACT_RATIO of the base's rows or there are more than MAX_SEGMENTS of them.
+BASE_ARRAYS = ["keys", "price", "day"]
+MANIFEST = "manifest.json"
+COMPACT_RATIO = 0.05
+MAX_SEGMENTS = 12
+
+# Land Registry monthly update files have no header row
+MONTHLY_COLUMNS = [
+    "Transaction unique identifier", "Price", "Date of Transfer", "Postcode",
+    "Property Type", "Old/New", "Duration", "PAON", "SAON", "Street", "Locality",
+    "Town/City", "District", "County", "PPDCategory Type", "Record Status",
+]
+ID_COLUMN = "Transaction unique identifier"
+KEY_DTYPE = np.dtype([("hi", "<u8"), ("lo", "<u8")])
+
+# Hex digit lookup for vectorised GUID parsing
+_HEX = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _HEX[_c] = _i
+for _i, _c in enumerate(b"ABCDEF"):
+    _HEX[_c] = 10 + _i
+
+
+# "{81B82214-7FBC-4129-9F6B-4956B4A663AD}" -> 128-bit key as (hi, lo) uint64 pair
+def parse_transaction_ids(ids) -> np.ndarray:
+    digits = pd.Series(ids).astype(str).str.replace(r"[{}\-\s]", "", regex=True)
+    if len(digits) and (digits.str.len() != 32).any():
+        raise ValueError("Transaction IDs must be 32 hex digit GUIDs")
+
+    raw = np.frombuffer("".join(digits).encode("ascii"), dtype=np.uint8).reshape(-1, 32)
+    nibbles = _HEX[raw]
+    if (nibbles == 255).any():
+        raise ValueError("Transaction IDs contain non-hex characters")
+
+    shifts = np.arange(60, -1, -4, dtype=np.uint64)
+    keys = np.empty(len(raw), dtype=KEY_DTYPE)
+    keys["hi"] = (nibbles[:, :16].astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+    keys["lo"] = (nibbles[:, 16:].astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+    return keys
+
+
+# Read an update file (monthly format without header, or the full file with one)
+def _read_transactions(path):
+    """
+    Yields (keys, frame) pairs where keys are the parsed transaction IDs and
+    frame holds price, date and the upper-cased record status for each row.
+    Rows stay strings here: a deletion may have a blank price or date.
+    """
+    with open(path, encoding="utf-8-sig") as f:
+        has_header = f.readline().startswith(ID_COLUMN)
+
+    try:
+        if has_header:
+            chunk = pd.read_csv(path, dtype=str)
+        else:
+            chunk = pd.read_csv(path, header=None, names=MONTHLY_COLUMNS, dtype=str)
+    except pd.errors.EmptyDataError:
+        return  # no rows
+    if chunk.empty:
+        return
+
+    status_column = [c for c in chunk.columns if c.startswith("Record Status")]
+    status = chunk[status_column[0]] if status_column else pd.Series("A", index=chunk.index)
+
+    frame = pd.DataFrame(
+        {
+            "price": pd.to_numeric(chunk["Price"], errors="coerce"),
+            "date": parse_transfer_dates(chunk[DATE_COLUMN]).to_numpy(),
+            "status": status.fillna("A").str.strip().str.upper().to_numpy(),
+        }
+    )
+    # Deletions only need the ID; additions and changes need a valid price and date
+    valid = ((frame["status"] == "D") | (frame["price"].notna() & frame["date"].notna())).to_numpy()
+    yield parse_transaction_ids(chunk[ID_COLUMN])[valid], frame[valid].reset_index(drop=True)
+
+
+# Per-year and per-month moments (and per-year sketches) for arrays of prices and day numbers
+def _moments(prices, days):
+    dates = np.asarray(days).astype("datetime64[D]")
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    year_month = (months // 12 + 1970) * 100 + months % 12 + 1
+    return (
+        chunk_moments(years, prices, index_name="Year"),
+        chunk_moments(year_month, prices, index_name="Month"),
+        sketch_chunk(years, prices),
+    )
+
+
+def _empty_transactions():
+    return {"keys": np.empty(0, KEY_DTYPE), "price": np.empty(0, np.int32), "day": np.empty(0, np.int32)}
+
+
+def _read_manifest(state_path):
+    with open(os.path.join(state_path, MANIFEST)) as f:
+        return json.load(f)
+
+
+# Moments, sketches, the memory-mapped base and the (small) delta segments; the base is not read into memory
+def load_state(state_path=STATE_PATH) -> dict:
+    manifest = _read_manifest(state_path)
+    sketches = np.load(os.path.join(state_path, "yearly_sketches.npz"))
+    segments = []
+    for name in manifest["segments"]:
+        with np.load(os.path.join(state_path, name)) as segment:
+            segments.append({key: segment[key] for key in BASE_ARRAYS + ["live"]})
+    return {
+        "sketches": {int(year): counts for year, counts in zip(sketches["years"], sketches["counts"])},
+        "yearly": pd.read_csv(os.path.join(state_path, "yearly_moments.csv"), index_col="Year"),
+        "monthly": pd.read_csv(os.path.join(state_path, "monthly_moments.csv"), index_col="Month"),
+        "base": {name: np.load(os.path.join(state_path, f"{name}.npy"), mmap_mode="r") for name in BASE_ARRAYS},
+        "segments": segments,
+        "manifest": manifest,
+    }
+
+
+# Write files into the state directory through a temporary name, so a failed write leaves the old file
+def _replace(state_path, name, write):
+    tmp = os.path.join(state_path, name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, os.path.join(state_path, name))
+
+
+# Moments, sketches and the manifest (written last, so a new segment only counts once everything is saved)
+def save_state(state, state_path=STATE_PATH):
+    os.makedirs(state_path, exist_ok=True)
+    _replace(state_path, "yearly_moments.csv", lambda f: state["yearly"].to_csv(f))
+    _replace(state_path, "monthly_moments.csv", lambda f: state["monthly"].to_csv(f))
+    years = sorted(state["sketches"])
+    counts = np.array([state["sketches"][y] for y in years], dtype=np.int64).reshape(-1, N_BUCKETS)
+    _replace(state_path, "yearly_sketches.npz",
+             lambda f: np.savez(f, years=np.array(years, dtype=np.int64), counts=counts))
+    _replace(state_path, MANIFEST, lambda f: f.write(json.dumps(state["manifest"], indent=2).encode()))
+
+
+def _save_base(state_path, transactions):
+    os.makedirs(state_path, exist_ok=True)
+    for name in BASE_ARRAYS:
+        _replace(state_path, f"{name}.npy", lambda f, name=name: np.save(f, transactions[name]))
+
+
+# Positions of `keys` in a sorted key array and whether each key is there
+def _search(sorted_keys, keys):
+    pos = np.searchsorted(sorted_keys, keys)
+    hit = np.zeros(len(keys), dtype=bool)
+    in_range = pos < len(sorted_keys)
+    hit[in_range] = sorted_keys[pos[in_range]] == keys[in_range]
+    return pos, hit
+
+
+# Current price and day of each key: the newest segment holding it wins, then the base
+def _lookup(state, keys):
+    """
+    Returns (found, price, day); a key whose newest version is a deletion
+    is not found. Only the pages of the memory-mapped base that the binary
+    search touches are read.
+    """
+    found = np.zeros(len(keys), dtype=bool)
+    resolved = np.zeros(len(keys), dtype=bool)
+    price, day = np.zeros(len(keys), np.int32), np.zeros(len(keys), np.int32)
+    for layer in state["segments"][::-1] + [state["base"]]:
+        todo = np.flatnonzero(~resolved)
+        if len(todo) == 0:
+            break
+        pos, hit = _search(layer["keys"], keys[todo])
+        rows, at = todo[hit], pos[hit]
+        found[rows] = layer["live"][at] if "live" in layer else True
+        price[rows], day[rows] = layer["price"][at], layer["day"][at]
+        resolved[rows] = True
+    return found, price, day
+
+
+# Fold the delta segments into a new base; O(history), so only run every MAX_SEGMENTS updates or so
+def compact_state(state_path=STATE_PATH):
+    state = load_state(state_path)
+    if state["segments"]:
+        delta = {name: np.concatenate([seg[name] for seg in state["segments"]]) for name in BASE_ARRAYS + ["live"]}
+        age = np.concatenate([np.full(len(seg["keys"]), -i) for i, seg in enumerate(state["segments"])])
+        order = np.lexsort((age, delta["keys"]))  # by key, newest segment first
+        newest = order[np.unique(delta["keys"][order], return_index=True)[1]]
+        delta = {name: values[newest] for name, values in delta.items()}
+
+        base = state["base"]
+        _, replaced = _search(delta["keys"], np.asarray(base["keys"]))
+        live = delta["live"]
+        kept = {name: np.asarray(base[name])[~replaced] for name in BASE_ARRAYS}
+        at = np.searchsorted(kept["keys"], delta["keys"][live])
+        _save_base(state_path, {name: np.insert(kept[name], at, delta[name][live]) for name in BASE_ARRAYS})
+
+    names = state["manifest"]["segments"]
+    state["manifest"]["segments"] = []
+    save_state(state, state_path)
+    for name in names:
+        os.remove(os.path.join(state_path, name))
+    print(f"Compacted {len(names)} update segments into {state_path}")
+
+
+# Write the yearly volatility table from the persisted moments
+def _write_output(state, output_path):
+    df = finalize_moments(state["yearly"]).merge(sketch_summary(state["sketches"]), on="Year", how="left")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df.to_csv(output_path, index=False)
+    print("Saved:", output_path)
+    return df
+
+
+# Full pass over the history that creates the state file
+def init_state(input_path, state_path=STATE_PATH, output_path=OUTPUT_PATH, chunksize=None):
+    """
+    The full history (Kaggle layout, header row) is read with the typed
+    reader of src/ingest.py; every row is a transaction to add.
+    """
+    yearly, monthly, sketches = empty_moments("Year"), empty_moments("Month"), {}
+    keys, prices, days = [], [], []
+
+    for chunk in read_price_paid(input_path, JOB_COLUMNS["incremental"], chunksize):
+        day = chunk[DATE_COLUMN].to_numpy(dtype="datetime64[D]").astype(np.int32)
+        price = chunk["Price"].to_numpy(dtype=np.int32)
+
+        year_part, month_part, sketch_part = _moments(price, day)
+        yearly = merge_moments(yearly, year_part)
+        monthly = merge_moments(monthly, month_part)
+        sketches = merge_sketches(sketches, sketch_part)
+        keys.append(parse_transaction_ids(chunk[ID_COLUMN]))
+        prices.append(price)
+        days.append(day)
+
+    transactions = _empty_transactions()
+    if keys:
+        keys = np.concatenate(keys)
+        order = np.argsort(keys, kind="stable")
+        transactions = {"keys": keys[order], "price": np.concatenate(prices)[order], "day": np.concatenate(days)[order]}
+    if len(transactions["keys"]) > 1 and (transactions["keys"][1:] == transactions["keys"][:-1]).any():
+        raise ValueError("Duplicate transaction IDs in the full history file")
+
+    # Segments of an earlier state in the same directory no longer apply
+    if os.path.exists(os.path.join(state_path, MANIFEST)):
+        for name in _read_manifest(state_path)["segments"]:
+            os.remove(os.path.join(state_path, name))
+    _save_base(state_path, transactions)
+    state = {
+        "yearly": yearly,
+        "monthly": monthly,
+        "sketches": sketches,
+        "manifest": {"segments": [], "next_segment": 1},
+    }
+    save_state(state, state_path)
+    print(f"State saved: {state_path} ({len(transactions['keys'])} transactions)")
+    return _write_output(state, output_path)
+
+
+# Apply one monthly add/change/delete file to the persisted state
+def apply_update(update_path, state_path=STATE_PATH, output_path=OUTPUT_PATH):
+    """
+    Record Status A adds a transaction, C replaces it and D deletes it.
+    Changed and deleted transactions are retracted from the moments using
+    the price and date stored when they were first applied.
+
+    Cost: the update file, the delta segments and the small moment files are
+    read; the base of all applied transactions is memory-mapped and only
+    binary-searched, and the update is saved as one new segment, so I/O and
+    memory grow with the update and the segments, not the history. Every
+    MAX_SEGMENTS updates (or COMPACT_RATIO of the base) a compaction rewrites
+    the base, which is O(history). A file without rows changes nothing.
+    """
+    parts = list(_read_transactions(update_path))
+    if not parts:
+        print(f"{update_path} has no records; nothing to apply")
+        return _write_output(load_state(state_path), output_path)
+
+    state = load_state(state_path)
+    keys = np.concatenate([k for k, _ in parts])
+    update = pd.concat([frame for _, frame in parts], ignore_index=True)
+
+    # Last record per transaction wins within one update file; rows end up sorted by key
+    _, last = np.unique(keys[::-1], return_index=True)
+    keep = len(keys) - 1 - last
+    keys, update = keys[keep], update.iloc[keep].reset_index(drop=True)
+
+    found, old_price, old_day = _lookup(state, keys)
+
+    # Retract the old version of every transaction that is changed, deleted or re-added
+    if found.any():
+        year_part, month_part, sketch_part = _moments(old_price[found], old_day[found])
+        state["yearly"] = subtract_moments(state["yearly"], year_part)
+        state["monthly"] = subtract_moments(state["monthly"], month_part)
+        state["sketches"] = subtract_sketches(state["sketches"], sketch_part)
+
+    # Add the new version of every A/C record
+    adding = (update["status"] != "D").to_numpy()
+    new_price = np.zeros(len(update), dtype=np.int32)
+    new_day = np.zeros(len(update), dtype=np.int32)
+    new_price[adding] = update.loc[adding, "price"].to_numpy(dtype=np.int32)
+    new_day[adding] = update.loc[adding, "date"].to_numpy(dtype="datetime64[D]").astype(np.int32)
+    if adding.any():
+        year_part, month_part, sketch_part = _moments(new_price[adding], new_day[adding])
+        state["yearly"] = merge_moments(state["yearly"], year_part)
+        state["monthly"] = merge_moments(state["monthly"], month_part)
+        state["sketches"] = merge_sketches(state["sketches"], sketch_part)
+
+    # New segment: the new version of added/changed transactions and a tombstone for deleted ones
+    applied = found | adding
+    manifest = state["manifest"]
+    name = f"delta_{manifest['next_segment']:06d}.npz"
+    _replace(state_path, name, lambda f: np.savez(
+        f, keys=keys[applied], price=new_price[applied], day=new_day[applied], live=adding[applied]
+    ))
+    manifest["segments"].append(name)
+    manifest["next_segment"] += 1
+    save_state(state, state_path)
+
+    counts = update.loc[applied, "status"].value_counts().to_dict()
+    ignored = int((~applied).sum())
+    print(f"Applied {update_path}: {counts} ({ignored} deletions of unknown transactions ignored)")
+
+    delta_rows = sum(len(seg["keys"]) for seg in state["segments"]) + int(applied.sum())
+    if len(manifest["segments"]) > MAX_SEGMENTS or delta_rows > COMPACT_RATIO * len(state["base"]["keys"]):
+        compact_state(state_path)
+    return _write_output(state, output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental yearly volatility from monthly updates")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--init", metavar="CSV", help="Build the state from the full history file")
+    group.add_argument("--update", metavar="CSV", help="Apply a monthly update file")
+    group.add_argument("--compact", action="store_true", help="Merge the update segments into the base now")
+    parser.add_argument("--state", default=STATE_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.init:
+        init_state(args.init, args.state, args.output)
+    elif args.compact:
+        compact_state(args.state)
+    else:
+        apply_update(args.update, args.state, args.output)
+
+
+if __name__ == "__main__":
+    main()
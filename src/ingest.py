@@ -0,0 +1,206 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = "Date of Transfer"
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Explicit schema of the price paid CSV: prices fit in int32 and the text columns have few distinct values.
+# Dates stay strings in the parser (cheaper than categories there) and are parsed by parse_transfer_dates.
+# Prices are not typed by the parser (a blank or malformed price would stop the read); clean_chunk converts them.
+SCHEMA = {
+    "Transaction unique identifier": str,
+    "Price": np.int32,
+    DATE_COLUMN: str,
+    "Property Type": "category",
+    "Old/New": "category",
+    "Duration": "category",
+    "Town/City": "category",
+    "District": "category",
+    "County": "category",
+    "PPDCategory Type": "category",
+    "Record Status - monthly file only": "category",
+}
+
+# Columns each job reads
+JOB_COLUMNS = {
+    "volatility": ["Price", DATE_COLUMN],
+    "incremental": ["Transaction unique identifier", "Price", DATE_COLUMN],
+    "cube": ["Price", DATE_COLUMN, "Property Type", "Old/New", "Duration", "County"],
+    "store": ["Price", DATE_COLUMN, "Property Type", "Old/New", "Duration", "County", "District"],
+}
+
+# Memory budget for one chunk (per process), overridable with $PRICE_PAID_MEMORY_MB
+MEMORY_MB = 256
+MEMORY_ENV = "PRICE_PAID_MEMORY_MB"
+
+# Parser working memory per byte of raw text (tokenised fields are held for the whole chunk)
+PARSE_OVERHEAD = 2.0
+PARSED_BYTES = {str: 70, np.int32: 4, "category": 2}
+MIN_CHUNK, MAX_CHUNK = 10_000, 5_000_000
+
+
+# dtype= for the CSV parser: the schema without Price, which is left to inference
+def parser_dtypes(usecols) -> dict:
+    return {c: SCHEMA[c] for c in usecols if c in SCHEMA and c != "Price"}
+
+
+def memory_budget_mb(memory_mb=None) -> float:
+    return float(memory_mb or os.environ.get(MEMORY_ENV) or MEMORY_MB)
+
+
+# Rows per chunk that fit the memory budget, from the average line length at the top of the file
+def auto_chunksize(path, usecols=None, memory_mb=None, sample_bytes=1 << 16) -> int:
+    """
+    Each row costs its raw text times PARSE_OVERHEAD while being tokenised,
+    plus the parsed size of the columns kept.
+    """
+    with open(path, "rb") as f:
+        f.readline()
+        sample = f.read(sample_bytes)
+    lines = max(sample.count(b"\n"), 1)
+    line_bytes = len(sample) / lines if sample else 100
+
+    columns = usecols or list(SCHEMA)
+    row_bytes = line_bytes * PARSE_OVERHEAD + sum(PARSED_BYTES[SCHEMA.get(c, str)] for c in columns)
+    rows = int(memory_budget_mb(memory_mb) * 1024 * 1024 / row_bytes)
+    return int(np.clip(rows, MIN_CHUNK, MAX_CHUNK))
+
+
+# Transfer dates as datetime64, parsing each distinct value once
+def parse_transfer_dates(values) -> pd.Series:
+    """
+    A year of transfers has only a few hundred distinct date strings, so the
+    values are factorised and only the uniques are parsed, with the fixed
+    format. Values in another format fall back to ISO 8601 and anything
+    unparseable becomes NaT.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    uniques = _parse_fixed(pd.Series(uniques, dtype=object)).to_numpy("datetime64[ns]")
+    parsed = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[ns]")
+    parsed[codes >= 0] = uniques[codes[codes >= 0]]
+    return pd.Series(parsed, index=values.index, name=values.name)
+
+
+# Typed Price (int32) and transfer date columns; rows whose price or date is blank or malformed are dropped
+def clean_chunk(chunk) -> pd.DataFrame:
+    if DATE_COLUMN in chunk:
+        chunk[DATE_COLUMN] = parse_transfer_dates(chunk[DATE_COLUMN])
+    if "Price" in chunk and not pd.api.types.is_numeric_dtype(chunk["Price"]):
+        chunk["Price"] = pd.to_numeric(chunk["Price"], errors="coerce")
+
+    valid = chunk[[c for c in ("Price", DATE_COLUMN) if c in chunk]].notna().all(axis=1)
+    if not valid.all():
+        chunk = chunk[valid].copy()
+    if "Price" in chunk:
+        if len(chunk) and chunk["Price"].max() > np.iinfo(np.int32).max:
+            raise ValueError("Price exceeds int32 range")
+        chunk["Price"] = chunk["Price"].astype(np.int32)
+    return chunk
+
+
+def _parse_fixed(values):
+    parsed = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format="ISO8601", errors="coerce")
+    return parsed
+
+
+# Typed chunks of the price paid CSV with only the columns a job needs
+def read_price_paid(path, usecols=None, chunksize=None, memory_mb=None, engine="c"):
+    """
+    Prices are int32, text columns categorical and the transfer date a
+    datetime64 column parsed with a fixed format; rows with a missing or
+    malformed price or date are dropped. chunksize defaults to
+    auto_chunksize() for the memory budget. engine="pyarrow" uses the
+    multithreaded pyarrow CSV reader (optional dependency) instead.
+    """
+    usecols = list(usecols or SCHEMA)
+    if engine == "pyarrow":
+        yield from _read_pyarrow(path, usecols, memory_mb)
+        return
+    if engine != "c":
+        raise ValueError(f"Unknown CSV engine: {engine!r}")
+
+    chunksize = chunksize or auto_chunksize(path, usecols, memory_mb)
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=parser_dtypes(usecols), chunksize=chunksize):
+        yield clean_chunk(chunk)
+
+
+def _read_pyarrow(path, usecols, memory_mb):
+    try:
+        import pyarrow as pa
+        from pyarrow import csv
+    except ImportError as e:
+        raise ImportError("engine='pyarrow' needs the pyarrow package (pip install pyarrow)") from e
+
+    types = {c: pa.dictionary(pa.int32(), pa.string()) for c in usecols if SCHEMA.get(c) == "category"}
+    # pyarrow raises on a value it cannot convert, so price and date arrive as strings for clean_chunk
+    types.update({"Price": pa.string(), DATE_COLUMN: pa.string()})
+    block_size = int(memory_budget_mb(memory_mb) * 1024 * 1024 / PARSE_OVERHEAD)
+    reader = csv.open_csv(
+        path,
+        read_options=csv.ReadOptions(block_size=block_size),
+        convert_options=csv.ConvertOptions(
+            include_columns=usecols,
+            column_types={c: t for c, t in types.items() if c in usecols},
+        ),
+    )
+    for batch in reader:
+        yield clean_chunk(batch.to_pandas())
+
+
+# The reader aggregate_yearly_volatility used before: every column as object strings, inferred date format
+def _read_legacy(path, usecols=None, chunksize=None, memory_mb=None, engine="c"):
+    for chunk in pd.read_csv(path, chunksize=chunksize or 1_000_000):
+        chunk[DATE_COLUMN] = pd.to_datetime(chunk[DATE_COLUMN], errors="coerce")
+        yield chunk
+
+
+# Time one full pass of each reader over a file and report the speedup over the legacy reader
+def compare_readers(path, usecols=None, chunksize=None, memory_mb=None, engines=("c", "pyarrow")) -> pd.DataFrame:
+    usecols = usecols or JOB_COLUMNS["volatility"]
+    readers = [("legacy", _read_legacy, "c")] + [(f"typed ({e})", read_price_paid, e) for e in engines]
+
+    rows = []
+    for name, reader, engine in readers:
+        start = time.perf_counter()
+        try:
+            n_rows = sum(len(chunk) for chunk in reader(path, usecols, chunksize, memory_mb, engine))
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        rows.append({"Reader": name, "Rows": n_rows, "Seconds": time.perf_counter() - start})
+
+    df = pd.DataFrame(rows)
+    df["Rows_per_Second"] = df["Rows"] / df["Seconds"]
+    df["Speedup"] = df["Seconds"].iloc[0] / df["Seconds"]
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the typed price paid reader with the legacy reader")
+    parser.add_argument("--input", default=None, help="Path to price_paid_records.csv")
+    parser.add_argument("--source", default=None, help="Dataset source spec (see src/dataset_source.py)")
+    parser.add_argument("--job", choices=sorted(JOB_COLUMNS), default="volatility", help="Columns to read")
+    parser.add_argument("--memory-mb", type=float, default=None, help=f"Chunk memory budget (default {MEMORY_MB})")
+    args = parser.parse_args(argv)
+
+    path = args.input
+    if path is None:
+        from src.dataset_source import resolve_dataset
+
+        path = resolve_dataset(args.source)
+    print(f"Chunk size for {args.job}: {auto_chunksize(path, JOB_COLUMNS[args.job], args.memory_mb):,} rows")
+    print(compare_readers(path, JOB_COLUMNS[args.job], memory_mb=args.memory_mb).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
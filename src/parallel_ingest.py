@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from src.profiling import merge_worker, worker_call
+
+# Target size of each byte range handed to a worker
+RANGE_BYTES = 64 * 1024 * 1024
+
+
+# Read the header line and split the rest of the file into newline-aligned byte ranges
+def split_byte_ranges(path, range_bytes=RANGE_BYTES):
+    """
+    Returns (columns, [(start, end), ...]). Every range starts at the
+    beginning of a line and ends just after a newline (or at EOF), so each
+    row falls in exactly one range. Ranges depend only on the file and
+    range_bytes, not on the number of workers.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+
+        bounds = [data_start]
+        target = data_start + range_bytes
+        while target < size:
+            f.seek(target)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+            target = pos + range_bytes
+        bounds.append(size)
+
+    columns = next(csv.reader([header.decode("utf-8-sig")]))
+    ranges = [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    return columns, ranges
+
+
+# Parse one byte range and reduce it to a partial result
+def reduce_byte_range(byte_range, path, columns, reduce_chunk, merge, chunksize, usecols=None, dtype=None):
+    start, end = byte_range
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = io.BytesIO(f.read(end - start))
+
+    partial_result = None
+    reader = pd.read_csv(data, header=None, names=columns, usecols=usecols, dtype=dtype, chunksize=chunksize)
+    for chunk in reader:
+        result = reduce_chunk(chunk)
+        partial_result = result if partial_result is None else merge(partial_result, result)
+    return partial_result
+
+
+# Reduce a large CSV across a process pool and merge the partials in file order
+def reduce_csv_parallel(
+    path,
+    reduce_chunk,
+    merge,
+    workers=None,
+    chunksize=1_000_000,
+    usecols=None,
+    range_bytes=RANGE_BYTES,
+    dtype=None,
+):
+    """
+    reduce_chunk(DataFrame) -> partial and merge(partial, partial) -> partial
+    must be picklable top-level functions. Partials are merged in byte-range
+    order, so the result is the same for any number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    columns, ranges = split_byte_ranges(path, range_bytes)
+    task = partial(
+        reduce_byte_range,
+        path=path,
+        columns=columns,
+        reduce_chunk=reduce_chunk,
+        merge=merge,
+        chunksize=chunksize,
+        usecols=usecols,
+        dtype=dtype,
+    )
+
+    if workers == 1:
+        partials = map(task, ranges)
+        return _merge_partials(partials, merge)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge_partials(map(merge_worker, pool.map(partial(worker_call, task), ranges)), merge)
+
+
+# Fold partials left to right, skipping empty ranges
+def _merge_partials(partials, merge):
+    result = None
+    for p in partials:
+        if p is None:
+            continue
+        result = p if result is None else merge(result, p)
+    return result
@@ -0,0 +1,409 @@
+import argparse
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src.profiling import REPORT_DIR, profile_stage, write_profile, write_report
+from src.utils import file_digest
+
+# Fingerprints of the last successful run of each stage
+STATE_PATH = "data/.pipeline_state.json"
+REPORT_PATH = os.path.join(REPORT_DIR, "pipeline_run")
+
+
+# One pipeline stage: target is "module:function", called with inputs and outputs as keyword arguments
+def stage(name, target, inputs, outputs, default=True):
+    return {
+        "name": name,
+        "target": target,
+        "inputs": dict(inputs),
+        "outputs": dict(outputs),
+        "default": default,
+    }
+
+
+# An input path known only when the stage runs (e.g. a downloaded dataset): "module:function" returning the path
+def resolved_input(target):
+    return {"resolve": target}
+
+
+STAGES = [
+    stage(
+        "clean_house_prices",
+        "src.clean_house_price_quarterly:clean_house_price_quarterly",
+        {"input_path": "data/raw/uk_house_price_annual_average_price.csv"},
+        {"output_path": "data/clean/uk_house_price_quarterly.csv"},
+    ),
+    stage(
+        "clean_bank_rate",
+        "src.clean_bank_rate_quarterly:clean_bank_rate_quarterly",
+        {"input_path": "data/raw/bank_rate.csv"},
+        {"output_path": "data/clean/bank_rate_quarterly.csv"},
+    ),
+    stage(
+        "clean_cpi_quarterly",
+        "src.clean_cpi_quarterly:clean_and_average_cpi",
+        {"input_path": "data/raw/CPI_quarterly.csv"},
+        {"output_path": "data/clean/cpi_quarterly_avg.csv"},
+    ),
+    stage(
+        "clean_real_house_price_salary",
+        "src.clean_real_house_price_salary:clean_real_house_price_salary",
+        {"input_path": "data/raw/Average_UK_houseprices_and_salary.csv"},
+        {"output_path": "data/clean/Average_UK_houseprices_and_salary_clean.csv"},
+    ),
+    stage(
+        "deflate_house_prices",
+        "src.deflate_house_prices:build_real_house_prices",
+        {
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+            "cpi_path": "data/clean/cpi_quarterly_avg.csv",
+        },
+        {"output_path": "data/processed/house_prices_with_cpi_real.csv"},
+    ),
+    stage(
+        "rolling_correlation",
+        "src.rolling_correlation:build_rolling_correlations",
+        {
+            "bank_path": "data/clean/bank_rate_quarterly.csv",
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+        },
+        {"output_path": "data/processed/rolling_lagged_correlation.csv"},
+    ),
+    stage(
+        "distributed_lag",
+        "src.distributed_lag:build_distributed_lag_models",
+        {
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+            "cpi_path": "data/clean/cpi_quarterly_avg.csv",
+            "bank_path": "data/clean/bank_rate_quarterly.csv",
+        },
+        {"output_path": "data/processed/distributed_lag_models.csv"},
+    ),
+    stage(
+        "var_impulse_response",
+        "src.var_model:build_var_outputs",
+        {
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+            "cpi_path": "data/clean/cpi_quarterly_avg.csv",
+            "bank_path": "data/clean/bank_rate_quarterly.csv",
+        },
+        {
+            "output_path": "data/processed/var_impulse_response.csv",
+            "forecast_path": "data/processed/var_forecast.csv",
+        },
+    ),
+    stage(
+        "bank_rate_yearly",
+        "src.aggregate_bank_rate_yearly:aggregate_bank_rate_yearly",
+        {"input_path": "data/raw/bank_rate.csv"},
+        {"output_path": "data/processed/bank_rate_yearly_avg.csv"},
+    ),
+    stage(
+        "affordability_scenarios",
+        "src.affordability_scenarios:build_affordability_scenarios",
+        {
+            "house_price_path": "data/clean/Average_UK_houseprices_and_salary.csv",
+            "income_path": "data/raw/Income_by_age_and_gender.csv",
+            "bank_rate_path": "data/raw/bank_rate.csv",
+        },
+        {
+            "output_path": "data/processed/affordability_scenarios.csv",
+            "deposit_term_path": "data/processed/affordability_by_deposit_and_term.csv",
+        },
+    ),
+    # The price paid file is large and external, so this stage only runs when named
+    stage(
+        "price_paid_volatility",
+        "src.aggregate_price_paid_volatility:aggregate_yearly_volatility",
+        {"input_path": resolved_input("src.dataset_source:resolve_dataset")},
+        {
+            "output_path": "data/processed/yearly_price_volatility.csv",
+            "histogram_path": "data/processed/monthly_price_histogram.npz",
+        },
+        default=False,
+    ),
+]
+
+
+# Parsed imports per source file: path -> ((size, mtime), imported module names)
+_IMPORTS = {}
+
+
+# Modules named by any import statement in a source file (including imports inside functions)
+def _imports(path):
+    st = os.stat(path)
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _IMPORTS.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    _IMPORTS[path] = (key, names)
+    return names
+
+
+# Source files of the module behind a stage and every module of its package it imports, transitively
+def code_paths(target):
+    """
+    Found by parsing the sources, not importing them, so this costs no
+    import time; editing a helper module (src.ingest, src.quarterly_panel,
+    ...) changes the fingerprint of every stage that reaches it.
+    """
+    module = target.split(":")[0]
+    package = module.split(".")[0]
+    root = os.path.dirname(importlib.util.find_spec(package).origin)
+
+    paths, seen, todo = set(), set(), [module]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        base = os.path.join(root, *name.split(".")[1:])
+        # `from pkg.module import function` also names pkg.module.function, which has no file
+        for path in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(path):
+                paths.add(path)
+                todo.extend(n for n in _imports(path) if n.split(".")[0] == package and n not in seen)
+    return sorted(paths)
+
+
+# Stages with every resolved_input() replaced by the path it resolves to now
+def resolve_inputs(stages):
+    resolved = []
+    for st in stages:
+        inputs = dict(st["inputs"])
+        for key, value in inputs.items():
+            if isinstance(value, dict):
+                module, function = value["resolve"].split(":")
+                inputs[key] = getattr(importlib.import_module(module), function)()
+        resolved.append({**st, "inputs": inputs})
+    return resolved
+
+
+# Fingerprint of a stage: its target, code (with imported helpers) and input contents
+def stage_fingerprint(st, cache):
+    h = hashlib.sha256(st["target"].encode())
+    for path in code_paths(st["target"]):
+        h.update(file_digest(path, cache).encode())
+    for key, path in sorted(st["inputs"].items()):
+        h.update(f"{key}={path}:{file_digest(path, cache)}".encode())
+    return h.hexdigest()
+
+
+# Up to date when the fingerprint matches and every output is still what the stage wrote
+def is_up_to_date(st, fingerprint, state):
+    record = state["stages"].get(st["name"])
+    if not record or record["fingerprint"] != fingerprint:
+        return False
+    for path in st["outputs"].values():
+        if not os.path.exists(path) or file_digest(path, state["files"]) != record["outputs"].get(path):
+            return False
+    return True
+
+
+# Stage name -> names of the stages producing its inputs
+def dependencies(stages):
+    producers = {path: st["name"] for st in stages for path in st["outputs"].values()}
+    return {
+        st["name"]: {producers[p] for p in st["inputs"].values() if isinstance(p, str) and p in producers}
+        - {st["name"]}
+        for st in stages
+    }
+
+
+# Stages to consider: the named ones plus everything upstream (or all default stages)
+def select_stages(stages, names=None):
+    if not names:
+        return [st for st in stages if st["default"]]
+
+    by_name = {st["name"]: st for st in stages}
+    unknown = set(names) - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+    deps = dependencies(stages)
+    wanted, todo = set(), list(names)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [st for st in stages if st["name"] in wanted]
+
+
+# Names of the stages reading any of `paths`, plus everything downstream of them
+def downstream_stages(stages, paths):
+    paths = {os.path.normpath(p) for p in paths}
+    deps = dependencies(stages)
+    affected = {
+        st["name"] for st in stages
+        if paths & {os.path.normpath(p) for p in st["inputs"].values() if isinstance(p, str)}
+    }
+    grown = True
+    while grown:
+        more = {name for name, upstream in deps.items() if upstream & affected} - affected
+        affected |= more
+        grown = bool(more)
+    return [st["name"] for st in stages if st["name"] in affected]
+
+
+# Worker entry point: import the target lazily and run it as a profiled stage
+def _run_target(target, kwargs, name=None, cprofile=False):
+    module, function = target.split(":")
+    fn = getattr(importlib.import_module(module), function)
+    return profile_stage(name or target, fn, kwargs, cprofile)
+
+
+def load_state(state_path=STATE_PATH):
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            return json.load(f)
+    return {"stages": {}, "files": {}}
+
+
+def save_state(state, state_path=STATE_PATH):
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(state_path + ".tmp", state_path)
+
+
+# Stage names to run under cProfile: True means all of them
+def _profiled_names(profile, stages):
+    if profile is True:
+        return [st["name"] for st in stages]
+    return [profile] if isinstance(profile, str) else list(profile)
+
+
+# Validation results live next to the pipeline state
+def _validation_cache_path(state_path):
+    return os.path.join(os.path.dirname(state_path), ".validation_cache.json")
+
+
+# Run stages in dependency order, skipping up-to-date ones and running independent ones concurrently
+def run_pipeline(stages=STAGES, names=None, force=False, workers=None, state_path=STATE_PATH,
+                 report_path=None, profile=None, title="Pipeline run", validate=True):
+    """
+    A stage is fingerprinted once all of its upstream stages have finished,
+    so it re-runs only when its code or the actual contents of its inputs
+    changed (an upstream stage that rewrote an identical file does not
+    trigger it). Returns {stage name: "ran" | "skipped"}.
+
+    Every stage that runs is measured (src/profiling.py); report_path writes
+    <report_path>.json/.md at the end. profile=True runs every stage under
+    cProfile (a stage name or list of names: only those) and saves the stats
+    of the slowest one next to the report.
+
+    With validate=True every finished stage is gated by src/validation.py:
+    outputs that have rules are checked and a failure raises
+    ValidationError before the stage is recorded as up to date.
+    """
+    selected = resolve_inputs(select_stages(stages, names))
+    deps = dependencies(selected)
+    state = load_state(state_path)
+    by_name = {st["name"]: st for st in selected}
+    profiled = set(_profiled_names(profile, stages)) if profile else set()
+    records, start = [], time.perf_counter()
+
+    results, running, pool = {}, {}, None
+    try:
+        while len(results) < len(selected):
+            # Skip or submit every stage whose upstream stages are finished
+            progressed = True
+            while progressed:
+                progressed = False
+                busy = {name for name, _ in running.values()}
+                for name, st in by_name.items():
+                    if name in results or name in busy or not deps[name] <= set(results):
+                        continue
+                    fingerprint = stage_fingerprint(st, state["files"])
+                    if not force and is_up_to_date(st, fingerprint, state):
+                        results[name] = "skipped"
+                        print(f"[skip] {name}")
+                        progressed = True
+                        continue
+
+                    pool = pool or ProcessPoolExecutor(max_workers=workers)
+                    future = pool.submit(
+                        _run_target, st["target"], {**st["inputs"], **st["outputs"]}, name, name in profiled
+                    )
+                    running[future] = (name, fingerprint)
+                    busy.add(name)
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, fingerprint = running.pop(future)
+                record = future.result()
+                records.append(record)
+                if validate:
+                    from src.validation import check_outputs
+
+                    check_outputs(by_name[name]["outputs"].values(), _validation_cache_path(state_path))
+                state["stages"][name] = {
+                    "fingerprint": fingerprint,
+                    "outputs": {p: file_digest(p, state["files"]) for p in by_name[name]["outputs"].values()},
+                }
+                save_state(state, state_path)
+                results[name] = "ran"
+                print(f"[ran]  {name} ({record['wall_seconds']:.2f}s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        save_state(state, state_path)
+
+    profile_path = None
+    hot = max((r for r in records if "cprofile" in r), key=lambda r: r["wall_seconds"], default=None)
+    if hot is not None:
+        directory = os.path.dirname(report_path) if report_path else REPORT_DIR
+        profile_path = write_profile(hot.pop("cprofile"), os.path.join(directory, f"{hot['name']}.prof"))
+        print(f"cProfile of the hot stage {hot['name']}: {profile_path} (top functions in .txt)")
+    if report_path:
+        write_report(records, results, report_path, time.perf_counter() - start, title, profile_path)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the data pipeline, skipping up-to-date stages")
+    parser.add_argument("stages", nargs="*", help="Stages to run (plus their upstream stages)")
+    parser.add_argument("--force", action="store_true", help="Re-run stages even if up to date")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--list", action="store_true", help="List stages and exit")
+    parser.add_argument("--report", default=REPORT_PATH, help="Run report path without extension (.json and .md)")
+    parser.add_argument(
+        "--profile", nargs="?", const=True, default=None, metavar="STAGE",
+        help="Run stages under cProfile (or only STAGE) and save the hot stage's stats",
+    )
+    parser.add_argument("--no-validate", action="store_true", help="Skip the validation gate after each stage")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for st in STAGES:
+            flag = "" if st["default"] else " (on request)"
+            inputs = ", ".join(p if isinstance(p, str) else f"<{p['resolve']}>" for p in st["inputs"].values()) or "-"
+            print(f"{st['name']}{flag}: {inputs} -> {', '.join(st['outputs'].values())}")
+        return
+
+    run_pipeline(names=args.stages or None, force=args.force, workers=args.workers,
+                 report_path=args.report, profile=args.profile, validate=not args.no_validate)
+
+
+if __name__ == "__main__":
+    main()
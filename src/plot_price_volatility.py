@@ -1,15 +1,18 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
 
+from src.utils import show_figure
+
 # Function to plot house price volatility over time
 def plot_volatility(
     path="data/processed/yearly_price_volatility.csv",
     out_path="outputs/house_price_volatility_over_time.png",
 ):
+    import matplotlib.pyplot as plt
+
     df = pd.read_csv(path)
 
-    plt.figure(figsize=(10, 5))
+    fig = plt.figure(figsize=(10, 5))
     plt.plot(df["Year"], df["Price_STD"], color="black")
 
     plt.xlabel("Year")
@@ -20,7 +23,7 @@ def plot_volatility(
 
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     plt.savefig(out_path)
-    plt.show()
+    show_figure(fig)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Fixed log-spaced price bins from £1,000 to £100m, BINS_PER_DECADE per factor of 10 (about 4.7% wide).
+# Prices below/above the range are counted in the first/last bin. Because the bins never change, a
+# histogram is a months x bins count matrix and merging two of them is addition.
+MIN_PRICE = 1e3
+MAX_PRICE = 1e8
+BINS_PER_DECADE = 50
+N_BINS = int(round(np.log10(MAX_PRICE / MIN_PRICE) * BINS_PER_DECADE))
+BIN_EDGES = MIN_PRICE * 10 ** (np.arange(N_BINS + 1) / BINS_PER_DECADE)
+
+HISTOGRAM_PATH = "data/processed/monthly_price_histogram.npz"
+SUMMARY_PATH = "data/processed/monthly_price_distribution.csv"
+HEATMAP_PATH = "outputs/price_density_heatmap.png"
+
+SUMMARY_COLUMNS = ["Month", "Transaction_Count", "Price_P10", "Price_Median", "Price_P90", "Gini", "Entropy_Bits"]
+
+
+# Bin of each price on the fixed grid
+def bin_index(prices) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        index = np.floor(np.log10(prices / MIN_PRICE) * BINS_PER_DECADE)
+    index = np.nan_to_num(index, nan=0.0, neginf=0.0, posinf=N_BINS - 1)
+    return np.clip(index, 0, N_BINS - 1).astype(np.int64)
+
+
+# Transfer dates (datetime64) -> month numbers (months since 1970-01, as in src/columnar_store.py)
+def month_index(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+
+
+# Histogram of one block: {"first_month": m0, "counts": (months, N_BINS)}, one bincount over flat cell ids
+def histogram_chunk(months, prices):
+    months = np.asarray(months, dtype=np.int64)
+    if len(months) == 0:
+        return None
+    first, last = int(months.min()), int(months.max())
+    flat = (months - first) * N_BINS + bin_index(prices)
+    counts = np.bincount(flat, minlength=(last - first + 1) * N_BINS).reshape(-1, N_BINS)
+    return {"first_month": first, "counts": counts}
+
+
+# Sum two histograms over the union of their month ranges (None is the empty histogram)
+def merge_histograms(a, b):
+    if a is None or b is None:
+        return a if b is None else b
+    first = min(a["first_month"], b["first_month"])
+    last = max(a["first_month"] + len(a["counts"]), b["first_month"] + len(b["counts"]))
+    counts = np.zeros((last - first, N_BINS), dtype=np.int64)
+    for part in (a, b):
+        start = part["first_month"] - first
+        counts[start : start + len(part["counts"])] += part["counts"]
+    return {"first_month": first, "counts": counts}
+
+
+def save_histogram(histogram, path=HISTOGRAM_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if histogram is None:
+        histogram = {"first_month": 0, "counts": np.zeros((0, N_BINS), dtype=np.int64)}
+    np.savez_compressed(
+        path, first_month=histogram["first_month"], counts=histogram["counts"], bin_edges=BIN_EDGES
+    )
+    print("Saved:", path)
+
+
+def load_histogram(path=HISTOGRAM_PATH) -> dict:
+    with np.load(path) as data:
+        if not np.allclose(data["bin_edges"], BIN_EDGES):
+            raise ValueError(f"{path} was built with different price bins; rebuild it")
+        return {"first_month": int(data["first_month"]), "counts": data["counts"].astype(np.int64)}
+
+
+# Month labels ("2005-03") of the histogram rows
+def month_labels(histogram) -> np.ndarray:
+    months = histogram["first_month"] + np.arange(len(histogram["counts"]))
+    return months.astype("datetime64[M]").astype(str)
+
+
+# Approximate quantiles per month, interpolating log-linearly inside the bin holding rank floor(q * (n - 1))
+def histogram_quantiles(counts, quantiles) -> np.ndarray:
+    """
+    Returns an array of shape (months, len(quantiles)). Each value lies in
+    the same bin as the exact lower quantile, so its relative error is below
+    one bin width (10 ** (1 / BINS_PER_DECADE) - 1) inside [MIN_PRICE, MAX_PRICE].
+    """
+    counts = np.atleast_2d(counts)
+    cumulative = np.cumsum(counts, axis=1)
+    n = cumulative[:, -1:]
+    ranks = np.floor(np.asarray(quantiles, dtype=np.float64)[None, :] * np.maximum(n - 1, 0))
+    bins = np.minimum((cumulative[:, None, :] <= ranks[:, :, None]).sum(axis=2), N_BINS - 1)
+    below = np.take_along_axis(cumulative, bins, axis=1) - np.take_along_axis(counts, bins, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        within = (ranks - below + 0.5) / np.take_along_axis(counts, bins, axis=1)
+    log_edges = np.log(BIN_EDGES)
+    values = np.exp(log_edges[bins] + within * (log_edges[bins + 1] - log_edges[bins]))
+    return np.where(n > 0, values, np.nan)
+
+
+# Gini coefficient per month from the Lorenz curve of the binned prices (each price at its bin's geometric midpoint)
+def histogram_gini(counts) -> np.ndarray:
+    counts = np.atleast_2d(counts).astype(np.float64)
+    midpoints = np.sqrt(BIN_EDGES[:-1] * BIN_EDGES[1:])
+    n = counts.sum(axis=1, keepdims=True)
+    value = counts * midpoints
+    with np.errstate(invalid="ignore", divide="ignore"):
+        people = counts / n
+        lorenz = np.cumsum(value, axis=1) / value.sum(axis=1, keepdims=True)
+    previous = np.hstack([np.zeros((len(counts), 1)), lorenz[:, :-1]])
+    return 1 - (people * (previous + lorenz)).sum(axis=1)
+
+
+# Shannon entropy (bits) of each month's distribution over the price bins
+def histogram_entropy(counts) -> np.ndarray:
+    counts = np.atleast_2d(counts).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = counts / counts.sum(axis=1, keepdims=True)
+        terms = np.where(counts > 0, -p * np.log2(p), 0.0)
+    return terms.sum(axis=1)
+
+
+# One row per month with transactions: count, P10/median/P90, Gini and entropy
+def histogram_summary(histogram) -> pd.DataFrame:
+    counts = histogram["counts"]
+    p10, median, p90 = histogram_quantiles(counts, [0.1, 0.5, 0.9]).T if len(counts) else np.empty((3, 0))
+    df = pd.DataFrame(
+        {
+            "Month": month_labels(histogram),
+            "Transaction_Count": counts.sum(axis=1),
+            "Price_P10": p10,
+            "Price_Median": median,
+            "Price_P90": p90,
+            "Gini": histogram_gini(counts) if len(counts) else [],
+            "Entropy_Bits": histogram_entropy(counts) if len(counts) else [],
+        },
+        columns=SUMMARY_COLUMNS,
+    )
+    return df[df["Transaction_Count"] > 0].reset_index(drop=True)
+
+
+# Months x price bins heatmap: each month's share of transactions per bin on a log colour scale, with quantile lines
+def plot_price_density(histogram, out_path=HEATMAP_PATH):
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    from src.utils import show_figure
+
+    counts = histogram["counts"].astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = counts / counts.sum(axis=1, keepdims=True)
+    share[share <= 0] = np.nan
+
+    months = histogram["first_month"] + np.arange(len(counts) + 1)
+    month_edges = months.astype("datetime64[M]").astype("datetime64[D]")
+    fig, ax = plt.subplots(figsize=(11, 5.5))
+    mesh = ax.pcolormesh(month_edges, BIN_EDGES, share.T, norm=LogNorm(), cmap="magma", shading="flat")
+    fig.colorbar(mesh, ax=ax, label="Share of the month's transactions")
+
+    summary = histogram_summary(histogram)
+    mid_month = pd.to_datetime(summary["Month"]) + pd.Timedelta(days=14)
+    for column, style, label in [("Price_Median", "-", "Median"), ("Price_P10", "--", "P10"), ("Price_P90", ":", "P90")]:
+        ax.plot(mid_month, summary[column], color="cyan", linestyle=style, linewidth=1, label=label)
+
+    ax.set_yscale("log")
+    ax.set_ylim(max(BIN_EDGES[0], np.nanmin(summary["Price_P10"]) / 10), BIN_EDGES[-1])
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Price (£, log scale)")
+    ax.set_title("UK House Price Distribution by Month")
+    ax.legend(loc="upper left", fontsize=8)
+    fig.tight_layout()
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fig.savefig(out_path, dpi=120)
+    print("Saved:", out_path)
+    show_figure(fig)
+
+
+# Headless entry point used by src/render.py
+def render_chart(histogram_path=HISTOGRAM_PATH, out_path=HEATMAP_PATH):
+    plot_price_density(load_histogram(histogram_path), out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Monthly price distribution statistics and density heatmap from the price paid histogram"
+    )
+    parser.add_argument(
+        "--histogram", default=HISTOGRAM_PATH,
+        help="Histogram written by `python -m src volatility` (next to its --output)",
+    )
+    parser.add_argument("--summary", default=SUMMARY_PATH)
+    parser.add_argument("--output", default=HEATMAP_PATH)
+    args = parser.parse_args(argv)
+
+    histogram = load_histogram(args.histogram)
+    summary = histogram_summary(histogram)
+    os.makedirs(os.path.dirname(args.summary) or ".", exist_ok=True)
+    summary.to_csv(args.summary, index=False)
+    print("Saved:", args.summary)
+    print(summary.tail())
+    plot_price_density(histogram, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import contextlib
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import resource
+import threading
+import time
+
+# Run reports (JSON + Markdown) and the cProfile dump of the hot stage (not committed)
+REPORT_DIR = "data/reports"
+
+# Steps recorded in this process for the current stage: qualified name -> record
+_steps = {}
+_active = []
+_stage = {}
+_lock = threading.Lock()
+
+
+# Resident memory of this process in MB (peak RSS so far where /proc is missing)
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20
+
+
+def _record(name):
+    return {"name": name, "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+            "rows_in": None, "rows_out": None, "peak_rss_mb": 0.0, "worker_peak_rss_mb": None}
+
+
+def _add_rows(record, key, rows):
+    if rows is not None:
+        record[key] = (record[key] or 0) + int(rows)
+
+
+def _touch_peaks(rss):
+    with _lock:
+        for record in _active:
+            record["peak_rss_mb"] = max(record["peak_rss_mb"], rss)
+
+
+# Background sampler that raises the peak of every open step and stage every `interval` seconds
+class _Sampler:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            _touch_peaks(rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# Time one sub-step of a stage; repeated steps with the same name accumulate (e.g. once per chunk)
+@contextlib.contextmanager
+def step(name, rows_in=None, rows_out=None):
+    """
+    Records wall and CPU time, peak RSS and optional row counts. Rows that
+    are only known inside the block can be added to the yielded record with
+    add_rows(). Nested steps are named "outer/inner".
+    """
+    with _lock:
+        parents = [r for r in _active if r is not _stage.get("record")]
+        qualified = f"{parents[-1]['name']}/{name}" if parents else name
+        record = _steps.setdefault(qualified, _record(qualified))
+        record["calls"] += 1
+        add_rows(record, rows_in, rows_out)
+        _active.append(record)
+    _touch_peaks(rss_mb())
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        _touch_peaks(rss_mb())
+        with _lock:
+            _active.remove(record)
+            record["wall_seconds"] += time.perf_counter() - wall
+            record["cpu_seconds"] += time.process_time() - cpu
+
+
+# Add row counts to an open step record
+def add_rows(record, rows_in=None, rows_out=None):
+    _add_rows(record, "rows_in", rows_in)
+    _add_rows(record, "rows_out", rows_out)
+
+
+# Iterate while charging the time spent producing each item (e.g. reading a chunk) to one step
+def timed_iter(items, name="read", rows=len):
+    items = iter(items)
+    while True:
+        with step(name) as record:
+            item = next(items, StopIteration)
+            if item is not StopIteration:
+                add_rows(record, rows_in=rows(item))
+        if item is StopIteration:
+            return
+        yield item
+
+
+# Run fn(*args) in a pool worker with its own step records; returns (result, measurements) for merge_worker()
+def worker_call(fn, *args):
+    """
+    A forked worker inherits the parent's open steps, so they are set aside
+    for the call: steps recorded by fn are named as if they were top-level,
+    and merge_worker() nests them under the step open in the parent.
+    """
+    with _lock:
+        saved = dict(_steps), list(_active), dict(_stage)
+        _steps.clear()
+        _active.clear()
+        worker = _stage["record"] = _record("worker")
+        _active.append(worker)
+    cpu = time.process_time()
+    try:
+        with _Sampler():
+            result = fn(*args)
+    finally:
+        with _lock:
+            steps = list(_steps.values())
+            _steps.clear()
+            _steps.update(saved[0])
+            _active[:] = saved[1]
+            _stage.clear()
+            _stage.update(saved[2])
+    measurements = {
+        "steps": steps,
+        "cpu_seconds": time.process_time() - cpu,
+        "peak_rss_mb": max([worker["peak_rss_mb"], rss_mb()] + [s["peak_rss_mb"] for s in steps]),
+    }
+    return result, measurements
+
+
+# Fold one worker_call() output into this process's open steps and stage and return the worker's result
+def merge_worker(output):
+    """
+    The worker's steps are added under the innermost open step (their wall
+    times are summed over workers, like CPU time). Its CPU time is added to
+    every open step and to the stage, and its peak RSS raises their
+    worker_peak_rss_mb (the largest single worker; peak_rss_mb stays this
+    process's own).
+    """
+    result, measurements = output
+    with _lock:
+        parents = [r for r in _active if r is not _stage.get("record")]
+        prefix = f"{parents[-1]['name']}/" if parents else ""
+        for s in measurements["steps"]:
+            record = _steps.setdefault(prefix + s["name"], _record(prefix + s["name"]))
+            record["calls"] += s["calls"]
+            record["wall_seconds"] += s["wall_seconds"]
+            record["cpu_seconds"] += s["cpu_seconds"]
+            record["peak_rss_mb"] = max(record["peak_rss_mb"], s["peak_rss_mb"])
+            add_rows(record, s["rows_in"], s["rows_out"])
+        for record in _active:
+            record["cpu_seconds"] += measurements["cpu_seconds"]
+            record["worker_peak_rss_mb"] = max(record["worker_peak_rss_mb"] or 0.0, measurements["peak_rss_mb"])
+    return result
+
+
+# Run fn(**kwargs) as one profiled stage and return its measurements
+def profile_stage(name, fn, kwargs, cprofile=False) -> dict:
+    """
+    Stage rows in/out come from the steps the stage recorded: rows_in of
+    the first top-level step that counted any, rows_out of the last one.
+    Work done in a process pool is included when the pool runs its tasks
+    through worker_call() and the results through merge_worker().
+    With cprofile=True the raw cProfile stats are returned under "cprofile"
+    (marshal-able, see write_profile()).
+    """
+    _steps.clear()
+    stage_record = _stage["record"] = _record(name)
+    profiler = cProfile.Profile() if cprofile else None
+
+    with _lock:
+        _active.append(stage_record)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        with _Sampler():
+            if profiler:
+                profiler.runcall(fn, **kwargs)
+            else:
+                fn(**kwargs)
+    finally:
+        with _lock:
+            _active.remove(stage_record)
+            _stage.clear()
+
+    steps = list(_steps.values())
+    top = [s for s in steps if "/" not in s["name"]]
+    stage_record.update(
+        calls=1,
+        wall_seconds=time.perf_counter() - wall,
+        cpu_seconds=stage_record["cpu_seconds"] + time.process_time() - cpu,
+        peak_rss_mb=max([stage_record["peak_rss_mb"], rss_mb()] + [s["peak_rss_mb"] for s in steps]),
+        rows_in=next((s["rows_in"] for s in top if s["rows_in"] is not None), None),
+        rows_out=next((s["rows_out"] for s in reversed(top) if s["rows_out"] is not None), None),
+    )
+    stage_record["steps"] = [_with_rate(s) for s in steps]
+    if profiler:
+        profiler.create_stats()
+        stage_record["cprofile"] = profiler.stats
+    return _with_rate(stage_record)
+
+
+def _with_rate(record):
+    rows = record["rows_in"] if record["rows_in"] is not None else record["rows_out"]
+    seconds = record["wall_seconds"]
+    record["rows_per_second"] = rows / seconds if rows is not None and seconds > 0 else None
+    return record
+
+
+# Save raw cProfile stats as a .prof file (readable by pstats/snakeviz) plus the top functions as text
+def write_profile(stats, path, limit=30) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        marshal.dump(stats, f)
+
+    text = io.StringIO()
+    pstats.Stats(path, stream=text).sort_stats("cumulative").print_stats(limit)
+    with open(path[: -len(".prof")] + ".txt", "w") as f:
+        f.write(text.getvalue())
+    return path
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+# Markdown table of stages (or steps)
+def _table(records, first="Stage"):
+    lines = [
+        f"| {first} | Wall (s) | CPU (s) | Rows in | Rows out | Rows/s | Peak RSS (MB) | Worker peak RSS (MB) |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for r in records:
+        lines.append(
+            f"| {r['name']} | {_fmt(r.get('wall_seconds'), '.3f')} | {_fmt(r.get('cpu_seconds'), '.3f')} "
+            f"| {_fmt(r.get('rows_in'), ',')} | {_fmt(r.get('rows_out'), ',')} "
+            f"| {_fmt(r.get('rows_per_second'), ',.0f')} | {_fmt(r.get('peak_rss_mb'), '.1f')} "
+            f"| {_fmt(r.get('worker_peak_rss_mb'), '.1f')} |"
+        )
+    return lines
+
+
+# Write <path>.json and <path>.md for one pipeline or render run
+def write_report(stages, statuses, path, total_seconds, title="Pipeline run", profile_path=None):
+    """
+    stages are profile_stage() records of the stages that ran; statuses is
+    {stage name: "ran" | "skipped"} as returned by run_pipeline.
+    """
+    ran = sorted(stages, key=lambda r: r["wall_seconds"], reverse=True)
+    report = {
+        "title": title,
+        "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "total_seconds": total_seconds,
+        "hot_stage": ran[0]["name"] if ran else None,
+        "profile": profile_path,
+        "stages": [{k: v for k, v in r.items() if k != "cprofile"} for r in stages],
+        "skipped": [name for name, status in statuses.items() if status == "skipped"],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    lines = [f"# {title}", "", f"Finished {report['finished']} in {total_seconds:.2f}s.", ""]
+    if ran:
+        profiled = f" (cProfile: `{profile_path}`)" if profile_path else ""
+        lines += [f"Hot stage: **{report['hot_stage']}**{profiled}", "", *_table(ran)]
+    if report["skipped"]:
+        lines += ["", "Up to date (skipped): " + ", ".join(report["skipped"])]
+    for r in ran:
+        if r["steps"]:
+            lines += ["", f"## {r['name']}", "", *_table(r["steps"], "Step")]
+    with open(path + ".md", "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print("Saved:", path + ".json")
+    print("Saved:", path + ".md")
+    return report
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Log-bucketed quantile sketch (DDSketch style) on a fixed global bucket grid.
+# Bucket i holds values in (GAMMA**(i-1), GAMMA**i] and reports
+# 2 * GAMMA**i / (GAMMA + 1), which is within RELATIVE_ACCURACY of every
+# value in the bucket. Because the grid is fixed, a sketch is just a dense
+# count array: merging is addition and retracting is subtraction.
+RELATIVE_ACCURACY = 0.005
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MAX_VALUE = 1e10
+N_BUCKETS = int(np.ceil(np.log(MAX_VALUE) / np.log(GAMMA))) + 1
+
+QUANTILE_COLUMNS = ["Price_Median", "Price_IQR", "Price_P10", "Price_P90", "Price_MAD"]
+
+
+# Bucket index of each value (values <= 1 share bucket 0, values above MAX_VALUE the last one)
+def bucket_index(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        index = np.ceil(np.log(values) / np.log(GAMMA))
+    index = np.nan_to_num(index, nan=0.0, neginf=0.0)
+    return np.clip(index, 0, N_BUCKETS - 1).astype(np.int64)
+
+
+# Value reported for each bucket
+def bucket_values() -> np.ndarray:
+    return 2 * GAMMA ** np.arange(N_BUCKETS) / (GAMMA + 1)
+
+
+# Sketch of a single group of prices
+def sketch_values(prices) -> np.ndarray:
+    return np.bincount(bucket_index(prices), minlength=N_BUCKETS)
+
+
+# Reduce one chunk of (key, price) pairs to {key: bucket counts}
+def sketch_chunk(keys, prices) -> dict:
+    keys = np.asarray(keys)
+    if len(keys) == 0:
+        return {}
+    uniques, codes = np.unique(keys, return_inverse=True)
+    flat = codes * N_BUCKETS + bucket_index(prices)
+    counts = np.bincount(flat, minlength=len(uniques) * N_BUCKETS).reshape(len(uniques), N_BUCKETS)
+    return {key.item(): counts[i] for i, key in enumerate(uniques)}
+
+
+# Merge two sketch tables (bucket-wise sum)
+def merge_sketches(a: dict, b: dict) -> dict:
+    merged = dict(a)
+    for key, counts in b.items():
+        merged[key] = merged[key] + counts if key in merged else counts.copy()
+    return merged
+
+
+# Remove a part from a sketch table (inverse of merge_sketches)
+def subtract_sketches(total: dict, part: dict) -> dict:
+    out = dict(total)
+    for key, counts in part.items():
+        remaining = out[key] - counts
+        if (remaining < 0).any():
+            raise ValueError(f"Cannot retract more transactions than were added for {key}")
+        if remaining.sum():
+            out[key] = remaining
+        else:
+            del out[key]
+    return out
+
+
+# Quantiles from one sketch, using the lower order statistic x[floor(q * (n - 1))]
+def sketch_quantiles(counts, quantiles) -> np.ndarray:
+    """
+    Each returned value is within RELATIVE_ACCURACY (relative error) of the
+    exact lower quantile np.quantile(prices, q, method="lower"), independent
+    of the number of transactions or the shape of the distribution.
+    """
+    cumulative = np.cumsum(counts)
+    n = cumulative[-1]
+    ranks = np.floor(np.asarray(quantiles, dtype=np.float64) * (n - 1))
+    return bucket_values()[np.searchsorted(cumulative, ranks, side="right")]
+
+
+# Median absolute deviation from bucket values
+def sketch_mad(counts, median=None) -> float:
+    """
+    Approximate: each price is replaced by its bucket value, so the result
+    is within RELATIVE_ACCURACY * (2 * median + MAD) of the exact MAD.
+    """
+    if median is None:
+        median = sketch_quantiles(counts, [0.5])[0]
+    values = bucket_values()
+    present = counts > 0
+    deviation = np.abs(values[present] - median)
+    order = np.argsort(deviation)
+    cumulative = np.cumsum(counts[present][order])
+    rank = np.floor(0.5 * (cumulative[-1] - 1))
+    return float(deviation[order][np.searchsorted(cumulative, rank, side="right")])
+
+
+# Robust dispersion columns per key
+def sketch_summary(sketches: dict, index_name="Year") -> pd.DataFrame:
+    rows = []
+    for key in sorted(sketches):
+        counts = sketches[key]
+        p10, p25, median, p75, p90 = sketch_quantiles(counts, [0.1, 0.25, 0.5, 0.75, 0.9])
+        rows.append(
+            {
+                index_name: key,
+                "Price_Median": median,
+                "Price_IQR": p75 - p25,
+                "Price_P10": p10,
+                "Price_P90": p90,
+                "Price_MAD": sketch_mad(counts, median),
+            }
+        )
+    return pd.DataFrame(rows, columns=[index_name] + QUANTILE_COLUMNS)
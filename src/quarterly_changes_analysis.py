@@ -1,38 +1,19 @@
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
 import os
 
-# Helper function to convert quarter strings to integers
-def quarter_to_int(q):
-    if isinstance(q, str):
-        q = q.strip().upper()
-        if q.startswith("Q"):
-            q = q[1:]
-    return int(q)
+from src.correlation_inference import N_RESAMPLES, report_inference
+from src.quarterly_panel import get_panel
+from src.utils import show_figure
 
-# Load and preprocess data
+# Load quarterly bank rate and house prices from the shared panel
 def load_data(
     bank_path="data/clean/bank_rate_quarterly.csv",
     house_path="data/clean/uk_house_price_quarterly.csv",
 ):
-    bank = pd.read_csv(bank_path)
-    house = pd.read_csv(house_path)
-
-    bank["Year"] = pd.to_numeric(bank["Year"], errors="coerce")
-    bank["Quarter"] = bank["Quarter"].apply(quarter_to_int)
-    bank["Bank_Rate_Quarterly_Avg"] = pd.to_numeric(
-        bank["Bank_Rate_Quarterly_Avg"], errors="coerce"
-    )
-
-    house["Year"] = pd.to_numeric(house["Year"], errors="coerce")
-    house["Quarter"] = house["Quarter"].apply(quarter_to_int)
-    house["UK_Average_House_Price"] = pd.to_numeric(
-        house["UK_Average_House_Price"], errors="coerce"
-    )
-
-    df = pd.merge(bank, house, on=["Year", "Quarter"], how="inner")
-    df = df.sort_values(["Year", "Quarter"]).reset_index(drop=True)
+    panel = get_panel(house_path=house_path, bank_path=bank_path)
+    df = panel.dropna(subset=["Bank_Rate_Quarterly_Avg", "UK_Average_House_Price"]).reset_index(drop=True)
+    df = df[["Year", "Quarter", "Bank_Rate_Quarterly_Avg", "UK_Average_House_Price"]]
 
     # House price growth only
     df["House_Price_Pct_Change"] = (
@@ -43,6 +24,8 @@ def load_data(
 
 # Compute Pearson correlation
 def compute_correlation(df):
+    from scipy.stats import pearsonr
+
     r, p = pearsonr(
         df["Bank_Rate_Quarterly_Avg"],
         df["House_Price_Pct_Change"],
@@ -51,7 +34,9 @@ def compute_correlation(df):
 
 # Plot scatter plot
 def plot_scatter(df, out_path):
-    plt.figure(figsize=(7, 5))
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(7, 5))
     plt.scatter(
         df["Bank_Rate_Quarterly_Avg"],
         df["House_Price_Pct_Change"],
@@ -64,15 +49,33 @@ def plot_scatter(df, out_path):
     plt.grid(True)
     plt.tight_layout()
     plt.savefig(out_path)
-    plt.show()
+    show_figure(fig)
 
 
-def main():
+# Headless entry point used by src/render.py
+def render_chart(
+    bank_path="data/clean/bank_rate_quarterly.csv",
+    house_path="data/clean/uk_house_price_quarterly.csv",
+    out_path="outputs/house_price_growth_vs_bank_rate.png",
+):
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    plot_scatter(load_data(bank_path, house_path), out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="House price growth vs Bank Rate correlation")
+    parser.add_argument("--resamples", type=int, default=N_RESAMPLES, help="Bootstrap and permutation resamples")
+    parser.add_argument("--workers", type=int, default=1, help="Resampling worker processes (1 runs in this process)")
+    args = parser.parse_args(argv)
+
     df = load_data()
     r, p = compute_correlation(df)
 
     print(f"Pearson r: {r:.3f}")
     print(f"p-value: {p:.4f}")
+    report_inference(
+        df["Bank_Rate_Quarterly_Avg"], df["House_Price_Pct_Change"], n_resamples=args.resamples, workers=args.workers
+    )
 
     os.makedirs("outputs", exist_ok=True)
     plot_scatter(
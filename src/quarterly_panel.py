@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+HOUSE_PATH = "data/clean/uk_house_price_quarterly.csv"
+CPI_PATH = "data/clean/cpi_quarterly_avg.csv"
+BANK_PATH = "data/clean/bank_rate_quarterly.csv"
+
+PANEL_COLUMNS = [
+    "Year",
+    "Quarter",
+    "Year_Quarter",
+    "UK_Average_House_Price",
+    "CPI_Quarterly_Avg",
+    "CPI_Index",
+    "Real_House_Price",
+    "Bank_Rate_Quarterly_Avg",
+]
+
+# In-process cache: resolved source paths -> (source mtimes, panel)
+_PANEL_CACHE = {}
+
+
+# Vectorised "Q3" / "3" / 3 -> 3
+def parse_quarter(values) -> pd.Series:
+    quarters = pd.Series(values).astype(str).str.strip().str.upper().str.removeprefix("Q")
+    return pd.to_numeric(quarters, errors="coerce")
+
+
+# Integer period t = Year * 4 + Quarter - 1
+def period_index(year, quarter):
+    return np.asarray(year, dtype=np.int64) * 4 + np.asarray(quarter, dtype=np.int64) - 1
+
+
+# One clean quarterly CSV as a Series indexed by t
+def load_quarterly_series(path, value_column) -> pd.Series:
+    df = pd.read_csv(path)
+    year = pd.to_numeric(df["Year"], errors="coerce")
+    quarter = parse_quarter(df["Quarter"])
+    value = pd.to_numeric(df[value_column], errors="coerce")
+
+    keep = (year.notna() & quarter.notna() & value.notna()).to_numpy()
+    t = period_index(year[keep], quarter[keep])
+    return pd.Series(value[keep].to_numpy(), index=pd.Index(t, name="t"), name=value_column)
+
+
+# Wide quarterly table keyed by t (outer join; each analysis drops what it lacks)
+def build_panel(house_path=HOUSE_PATH, cpi_path=CPI_PATH, bank_path=BANK_PATH) -> pd.DataFrame:
+    """
+    Real_House_Price = UK_Average_House_Price * (CPI_base / CPI_t), deflated
+    by src/deflation.py (CPI_Index chained from the CPI inflation rates) with
+    the base at the first quarter that has both a price and a CPI value.
+    """
+    from src.deflation import cpi_ratio_table, deflate, load_cpi_index
+
+    series = [load_quarterly_series(house_path, "UK_Average_House_Price")]
+    if cpi_path is not None:
+        series.append(load_quarterly_series(cpi_path, "CPI_Quarterly_Avg"))
+    if bank_path is not None:
+        series.append(load_quarterly_series(bank_path, "Bank_Rate_Quarterly_Avg"))
+
+    panel = pd.concat(series, axis=1).sort_index()
+    panel["Year"] = panel.index // 4
+    panel["Quarter"] = panel.index % 4 + 1
+    panel["Year_Quarter"] = panel["Year"].astype(str) + " Q" + panel["Quarter"].astype(str)
+
+    for column in ["CPI_Quarterly_Avg", "Bank_Rate_Quarterly_Avg"]:
+        if column not in panel:
+            panel[column] = np.nan
+    panel["CPI_Index"] = load_cpi_index(cpi_path) if cpi_path is not None else np.nan
+    panel["Real_House_Price"] = np.nan
+    both = panel.index[panel[["UK_Average_House_Price", "CPI_Index"]].notna().all(axis=1)]
+    if len(both):
+        table = cpi_ratio_table(panel.index, panel["CPI_Index"], base_period=both[0])
+        panel["Real_House_Price"] = deflate(table, panel.index, panel["UK_Average_House_Price"])
+
+    return panel[PANEL_COLUMNS]
+
+
+# Cached panel: rebuilt only when a source file's mtime changes
+def get_panel(house_path=HOUSE_PATH, cpi_path=CPI_PATH, bank_path=BANK_PATH) -> pd.DataFrame:
+    """
+    Returns a copy, so callers may modify it. The cache is keyed by the
+    resolved source paths, so the same files reached through different
+    relative paths share an entry and different files never do.
+    """
+    paths = tuple(os.path.realpath(p) if p is not None else None for p in (house_path, cpi_path, bank_path))
+    mtimes = tuple(os.stat(p).st_mtime_ns if p is not None else None for p in paths)
+
+    cached = _PANEL_CACHE.get(paths)
+    if cached is not None and cached[0] == mtimes:
+        return cached[1].copy()
+
+    panel = build_panel(house_path, cpi_path, bank_path)
+    _PANEL_CACHE[paths] = (mtimes, panel)
+    return panel.copy()
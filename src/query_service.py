@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+HOST = "127.0.0.1"
+PORT = 8765
+CUBE_PATH = "data/processed/volatility_cube.npz"
+
+# dataset -> source paths, range column and the columns that take equality filters
+DATASETS = {
+    "affordability": {
+        "paths": {"path": "data/clean/Average_UK_houseprices_and_salary.csv"},
+        "key": "Year",
+    },
+    "volatility": {
+        "paths": {"path": "data/processed/yearly_price_volatility.csv"},
+        "key": "Year",
+    },
+    "bank-rate": {
+        "paths": {"path": "data/processed/bank_rate_yearly_avg.csv"},
+        "key": "Year",
+    },
+    "rates": {
+        "paths": {
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+            "cpi_path": "data/clean/cpi_quarterly_avg.csv",
+            "bank_path": "data/clean/bank_rate_quarterly.csv",
+        },
+        "key": "t",
+    },
+    "affordability-scenarios": {
+        "paths": {"path": "data/processed/affordability_scenarios.csv"},
+        "key": "Year",
+        "filters": ["Age_Group", "Gender"],
+    },
+}
+
+# Filters on /volatility that are answered from the price paid cube instead of the yearly table
+CUBE_FILTERS = ["property_type", "old_new", "duration", "county"]
+PROPERTY_TYPES = {"detached": "D", "semi-detached": "S", "terraced": "T", "flat": "F", "flats": "F", "other": "O"}
+
+# Most distinct queries whose response bodies are kept
+CACHE_SIZE = 4096
+
+# Queries the load test cycles through (the cube query only when a cube is loaded)
+LOADTEST_QUERIES = [
+    "/affordability?from=2005&to=2010",
+    "/volatility?from=2005&to=2010",
+    "/rates?from=2015&to=2020",
+    "/rates?from=2019Q2&to=2021Q1",
+    "/bank-rate?from=2011",
+    "/affordability-scenarios?Gender=Female&Age_Group=30 to 39",
+]
+LOADTEST_CUBE_QUERIES = ["/volatility?from=2005&to=2010&property_type=F&county=GREATER LONDON"]
+
+
+class QueryError(ValueError):
+    status = 400
+
+
+class NotFound(QueryError):
+    status = 404
+
+
+# One dataset as a DataFrame (the affordability table gains its ratio, the quarterly rates come from the panel)
+def read_dataset(name, **paths) -> pd.DataFrame:
+    if name == "rates":
+        from src.quarterly_panel import get_panel
+
+        return get_panel(**paths).reset_index()
+    df = pd.read_csv(paths["path"])
+    if name == "affordability":
+        df["Affordability_Ratio"] = df["Real_House_Price"] / df["Real_Median_Salary"]
+    return df
+
+
+# JSON bytes of every row, in DataFrame order (NaN -> null)
+def encode_rows(df) -> np.ndarray:
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    rows = np.empty(len(records), dtype=object)
+    rows[:] = [json.dumps(record, default=lambda value: value.item()).encode() for record in records]
+    return rows
+
+
+# Rows sorted on the range column, pre-encoded, with one boolean mask per filter value
+def index_table(df, key, filters=()) -> dict:
+    df = df.dropna(subset=[key]).sort_values(key, kind="stable").reset_index(drop=True)
+    masks = {}
+    for column in filters:
+        values = df[column].astype(str).str.casefold()
+        masks[column] = {value: (values == value).to_numpy() for value in values.unique()}
+    return {
+        "key": df[key].to_numpy(dtype=np.int64),
+        "quarterly": key == "t",
+        "columns": list(df.columns),
+        "rows": encode_rows(df),
+        "filters": masks,
+    }
+
+
+# Index every dataset whose sources exist; `paths` overrides DATASETS paths per dataset
+def load_tables(paths=None) -> dict:
+    tables = {}
+    for name, spec in DATASETS.items():
+        source = {**spec["paths"], **(paths or {}).get(name, {})}
+        if not all(os.path.exists(p) for p in source.values()):
+            print(f"Skipping {name}: missing {[p for p in source.values() if not os.path.exists(p)]}")
+            continue
+        tables[name] = index_table(read_dataset(name, **source), spec["key"], spec.get("filters", ()))
+    return tables
+
+
+# "2005" -> year bound, "2005Q2" / "2005 Q2" -> quarter bound; quarterly tables compare on t = Year*4 + Quarter - 1
+def parse_bound(value, quarterly, upper) -> int:
+    year, _, quarter = value.upper().replace(" ", "").partition("Q")
+    try:
+        year = int(year)
+        quarter = int(quarter) if quarter else None
+    except ValueError:
+        raise QueryError(f"Bad period {value!r} (expected YYYY or YYYYQn)") from None
+    if quarter is not None and not 1 <= quarter <= 4:
+        raise QueryError(f"Bad quarter in {value!r}")
+    if not quarterly:
+        return year
+    if quarter is None:
+        quarter = 4 if upper else 1
+    return year * 4 + quarter - 1
+
+
+# Row positions of a table in [from, to] that match every filter (comma-separated values are alternatives)
+def select_rows(table, start=None, end=None, filters=None) -> np.ndarray:
+    key = table["key"]
+    lo = 0 if start is None else int(np.searchsorted(key, start, side="left"))
+    hi = len(key) if end is None else int(np.searchsorted(key, end, side="right"))
+    keep = np.ones(max(hi - lo, 0), dtype=bool)
+    for column, value in (filters or {}).items():
+        masks = table["filters"][column]
+        match = np.zeros(len(key), dtype=bool)
+        for option in value.split(","):
+            mask = masks.get(option.strip().casefold())
+            if mask is not None:
+                match |= mask
+        keep &= match[lo:hi]
+    return lo + np.flatnonzero(keep)
+
+
+def _response(dataset, rows) -> bytes:
+    return b'{"dataset":"%s","count":%d,"rows":[%s]}' % (dataset.encode(), len(rows), b",".join(rows))
+
+
+# Volatility by year (or `by` dimensions) for a slice of the price paid cube
+def query_cube(cube, params) -> list:
+    from src.volatility_cube import DIMENSIONS, rollup
+
+    by = [dim.strip() for dim in params.pop("by", "year").split(",") if dim.strip()]
+    unknown = [dim for dim in by if dim not in DIMENSIONS]
+    if unknown:
+        raise QueryError(f"Unknown cube dimensions: {unknown}")
+    filters = {}
+    for dim in CUBE_FILTERS:
+        if dim in params:
+            values = [v.strip().upper() for v in params.pop(dim).split(",")]
+            if dim == "property_type":
+                values = [PROPERTY_TYPES.get(v.casefold(), v) for v in values]
+            filters[dim] = values
+    start, end = (parse_bound(params.pop(b), False, b == "to") if b in params else None for b in ("from", "to"))
+    if start is not None or end is not None:
+        filters["year"] = [
+            year for year in cube["labels"]["year"]
+            if (start is None or year >= start) and (end is None or year <= end)
+        ]
+    return list(encode_rows(rollup(cube, by, filters)))
+
+
+# Answer one query from the in-memory tables
+def query(tables, cube, path, params) -> bytes:
+    dataset = path.strip("/")
+    params = dict(params)
+    if dataset == "volatility" and ("by" in params or any(dim in params for dim in CUBE_FILTERS)):
+        if cube is None:
+            raise NotFound("No volatility cube loaded (build it with `python -m src cube`)")
+        rows = query_cube(cube, params)
+    elif dataset in tables:
+        table = tables[dataset]
+        start, end = (
+            parse_bound(params.pop(b), table["quarterly"], b == "to") if b in params else None
+            for b in ("from", "to")
+        )
+        filters = {column: params.pop(column) for column in list(params) if column in table["filters"]}
+        rows = list(table["rows"][select_rows(table, start, end, filters)])
+    else:
+        raise NotFound(f"Unknown dataset {dataset!r}; available: {sorted(tables)}")
+    if params:
+        raise QueryError(f"Unknown parameters: {sorted(params)}")
+    return _response(dataset, rows)
+
+
+class QueryService:
+    """
+    Answers GET /<dataset>?from=..&to=..&<column>=<value> from tables indexed
+    once at start-up. Response bodies are kept per normalised query (LRU), so
+    a repeated query costs one dictionary lookup.
+    """
+
+    def __init__(self, tables, cube=None, cache_size=CACHE_SIZE):
+        self.tables = tables
+        self.cube = cube
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index(self) -> bytes:
+        datasets = {
+            name: {"columns": table["columns"], "filters": sorted(table["filters"]), "rows": len(table["rows"])}
+            for name, table in self.tables.items()
+        }
+        return json.dumps({"datasets": datasets, "cube": self.cube is not None}).encode()
+
+    def stats(self) -> bytes:
+        return json.dumps({"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}).encode()
+
+    # (status, JSON body) for one request target
+    def respond(self, target):
+        parts = urlsplit(target)
+        if parts.path in ("", "/"):
+            return 200, self.index()
+        if parts.path == "/stats":
+            return 200, self.stats()
+
+        key = (parts.path.rstrip("/"), tuple(sorted(parse_qsl(parts.query))))
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return 200, body
+            self.misses += 1
+        try:
+            body = query(self.tables, self.cube, key[0], key[1])
+        except QueryError as error:
+            return error.status, json.dumps({"error": str(error)}).encode()
+        with self._lock:
+            self._cache[key] = body
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return 200, body
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        status, body = self.server.service.respond(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# Load the tables (and the cube if it has been built) and bind a server; call serve_forever() on it
+def make_server(host=HOST, port=PORT, paths=None, cube_path=CUBE_PATH, cache_size=CACHE_SIZE):
+    start = time.perf_counter()
+    cube = None
+    if cube_path and os.path.exists(cube_path):
+        from src.volatility_cube import load_cube
+
+        cube = load_cube(cube_path)
+    service = QueryService(load_tables(paths), cube, cache_size)
+    print(f"Loaded {len(service.tables)} datasets{' and the volatility cube' if cube else ''} "
+          f"in {time.perf_counter() - start:.2f}s")
+    httpd = ThreadingHTTPServer((host, port), QueryHandler)
+    httpd.service = service
+    return httpd
+
+
+async def _load(url, targets, n_requests, concurrency):
+    from src.refresh import ConnectionPool
+
+    pool = ConnectionPool(limit=concurrency, timeout=10.0)
+    latencies = np.empty(n_requests)
+    statuses = {}
+    counter = iter(range(n_requests))
+
+    async def client():
+        for i in counter:
+            start = time.perf_counter()
+            async with pool.request("GET", url + targets[i % len(targets)]) as response:
+                await response.read()
+            latencies[i] = time.perf_counter() - start
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    finally:
+        await pool.close()
+    return time.perf_counter() - start, latencies, statuses, pool.opened
+
+
+# Replay the sample queries against a running service and report throughput and latency percentiles
+def load_test(url, queries=None, n_requests=20_000, concurrency=1) -> dict:
+    """
+    Each client keeps one keep-alive connection. The first pass over the
+    queries fills the response cache, so the percentiles describe cached
+    responses; the service's hit/miss counters are included.
+    """
+    if queries is None:
+        has_cube = _get_json(url + "/")["cube"]
+        queries = LOADTEST_QUERIES + (LOADTEST_CUBE_QUERIES if has_cube else [])
+    targets = [quote(q, safe="/?&=,") for q in queries]
+    elapsed, latencies, statuses, connections = asyncio.run(_load(url, targets, n_requests, concurrency))
+    stats = _get_json(url + "/stats")
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "connections": connections,
+        "seconds": elapsed,
+        "requests_per_second": n_requests / elapsed,
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "max_ms": latencies.max() * 1000,
+        "statuses": statuses,
+        "cache": stats,
+    }
+
+
+def _get_json(url):
+    from urllib.request import urlopen
+
+    with urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON query service over the processed datasets")
+    commands = parser.add_subparsers(dest="action", required=True)
+
+    serve = commands.add_parser("serve", help="Serve queries until interrupted")
+    serve.add_argument("--host", default=HOST)
+    serve.add_argument("--port", type=int, default=PORT)
+    serve.add_argument("--cube", default=CUBE_PATH, help="Volatility cube for type/county filters ('' to skip)")
+    serve.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+
+    load = commands.add_parser("loadtest", help="Measure throughput and latency of the service")
+    load.add_argument("--url", help="Running service (default: start one in this process on a free port)")
+    load.add_argument("--requests", type=int, default=20_000)
+    load.add_argument("--concurrency", type=int, default=1, help="Clients, each on one keep-alive connection")
+    load.add_argument("--cube", default=CUBE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.action == "serve":
+        httpd = make_server(args.host, args.port, cube_path=args.cube, cache_size=args.cache_size)
+        print(f"Serving on http://{args.host}:{httpd.server_port}/ (Ctrl+C to stop)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+        return
+
+    httpd = None
+    url = args.url
+    if url is None:
+        httpd = make_server(port=0, cube_path=args.cube)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://{HOST}:{httpd.server_port}"
+    try:
+        result = load_test(url.rstrip("/"), n_requests=args.requests, concurrency=args.concurrency)
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+    print(
+        f"{result['requests']} requests, {result['concurrency']} clients: "
+        f"{result['requests_per_second']:,.0f} req/s, p50 {result['p50_ms']:.3f} ms, "
+        f"p90 {result['p90_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, max {result['max_ms']:.2f} ms"
+    )
+    print(f"Statuses: {result['statuses']}; cache: {result['cache']}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
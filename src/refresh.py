@@ -0,0 +1,411 @@
+# Refresh the raw inputs over HTTP: all sources concurrently, conditional and resumable, then rebuild what changed
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import ssl
+import sys
+from urllib.parse import urljoin, urlsplit
+
+from src.pipeline import STAGES, downstream_stages, run_pipeline
+
+# Where each source is fetched from: {name: {"url": ..., "sha256": optional pin, "path"/"stages": optional}}
+SOURCES_PATH = "data/raw_sources.json"
+# Validators (ETag / Last-Modified), checksums and partial downloads of the last refresh (not committed)
+REFRESH_STATE_PATH = "data/.refresh_state.json"
+
+# Raw file of each known source; sources read by no stage name the stages to run explicitly
+RAW_SOURCES = {
+    "bank_rate": {"path": "data/raw/bank_rate.csv"},
+    "cpi": {"path": "data/raw/CPI_quarterly.csv"},
+    "house_price": {"path": "data/raw/uk_house_price_annual_average_price.csv"},
+    "real_house_price_salary": {"path": "data/raw/Average_UK_houseprices_and_salary.csv"},
+    "income": {"path": "data/raw/Income_by_age_and_gender.csv"},
+    "price_paid": {"path": "data/raw/price_paid_records.csv", "stages": ["price_paid_volatility"]},
+}
+
+CHUNK_BYTES = 1 << 20
+MAX_REDIRECTS = 5
+USER_AGENT = "uk-house-price-analysis-refresh/1.0"
+
+
+class RefreshError(RuntimeError):
+    pass
+
+
+# One HTTP/1.1 response; the body is streamed with iter_chunks()
+class Response:
+    def __init__(self, status, headers, reader, method, timeout):
+        self.status = status
+        self.headers = headers
+        self._reader = reader
+        self._timeout = timeout
+        self.complete = method == "HEAD" or status in (204, 304) or 100 <= status < 200
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+
+    async def _read(self, read):
+        return await asyncio.wait_for(read, self._timeout)
+
+    async def iter_chunks(self, size=CHUNK_BYTES):
+        if self.complete:
+            return
+        if "chunked" in self.headers.get("transfer-encoding", "").lower():
+            while True:
+                line = await self._read(self._reader.readline())
+                length = int(line.split(b";")[0].strip() or b"0", 16)
+                if length == 0:
+                    while (await self._read(self._reader.readline())).strip():
+                        pass  # trailers
+                    break
+                yield await self._read(self._reader.readexactly(length))
+                await self._read(self._reader.readexactly(2))
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining:
+                chunk = await self._read(self._reader.read(min(size, remaining)))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            self.keep_alive = False  # body ends when the server closes the connection
+            while chunk := await self._read(self._reader.read(size)):
+                yield chunk
+        self.complete = True
+
+    async def read(self):
+        return b"".join([chunk async for chunk in self.iter_chunks()])
+
+
+# Minimal asyncio HTTP/1.1 client with keep-alive connections pooled per host
+class ConnectionPool:
+    """
+    At most `limit` requests are in flight at once; a finished response
+    whose body was read completely returns its connection to the pool for
+    the next request to the same host. Only the standard library is used.
+    """
+
+    def __init__(self, limit=8, timeout=60.0):
+        self.timeout = timeout
+        self.opened = 0
+        self._slots = asyncio.Semaphore(limit)
+        self._idle = {}
+        self._ssl = None
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        if scheme == "https" and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl if scheme == "https" else None), self.timeout
+        )
+        self.opened += 1
+        return connection
+
+    async def _send(self, connection, method, url, headers):
+        reader, writer = connection
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", f"User-Agent: {USER_AGENT}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        if not status_line:
+            raise ConnectionResetError("Connection closed before the response")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while (line := await asyncio.wait_for(reader.readline(), self.timeout)).strip():
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        return Response(status, response_headers, reader, method, self.timeout)
+
+    # Send one request; the response is only valid inside the `async with` block
+    @contextlib.asynccontextmanager
+    async def request(self, method, url, headers=None):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        async with self._slots:
+            idle = self._idle.setdefault(key, [])
+            reused = bool(idle)
+            connection = idle.pop() if reused else await self._connect(key)
+            try:
+                try:
+                    response = await self._send(connection, method, url, headers)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused:
+                        raise
+                    connection[1].close()  # the server dropped the idle keep-alive connection: use a new one
+                    connection = await self._connect(key)
+                    response = await self._send(connection, method, url, headers)
+            except BaseException:
+                connection[1].close()
+                raise
+            try:
+                yield response
+            finally:
+                if response.complete and response.keep_alive:
+                    idle.append(connection)
+                else:
+                    connection[1].close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+def load_sources(sources_path=SOURCES_PATH) -> dict:
+    """
+    Entries of the sources file are merged over RAW_SOURCES, so a known
+    source only needs its "url"; new sources also give "path". Sources
+    without a url are not refreshed.
+    """
+    configured = {}
+    if os.path.exists(sources_path):
+        with open(sources_path) as f:
+            configured = json.load(f)
+    sources = {name: dict(source) for name, source in RAW_SOURCES.items()}
+    for name, source in configured.items():
+        sources.setdefault(name, {}).update(source)
+    missing_path = [name for name, source in sources.items() if "path" not in source]
+    if missing_path:
+        raise ValueError(f"Sources without a path: {missing_path}")
+    return sources
+
+
+def load_state(state_path=REFRESH_STATE_PATH):
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            return json.load(f)
+    return {"sources": {}, "partial": {}}
+
+
+def save_state(state, state_path=REFRESH_STATE_PATH):
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def _stat(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            h.update(block)
+    return h
+
+
+# Request headers: conditional on the copy we have, or a range request resuming a partial download
+def _request_headers(source, record, partial, part_path):
+    headers = {"Accept-Encoding": "identity"}
+    if partial and partial.get("url") == source["url"] and os.path.exists(part_path):
+        validator = partial.get("etag") or partial.get("last_modified")
+        offset = os.path.getsize(part_path)
+        if validator and offset:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+            return headers, offset
+    if (
+        record
+        and record.get("url") == source["url"]
+        and os.path.exists(source["path"])
+        and _stat(source["path"]) == record.get("stat")
+    ):
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+    return headers, 0
+
+
+# Download one source into <path>.part and move it into place once complete and verified
+async def fetch_source(pool, name, source, state, save=lambda: None) -> dict:
+    """
+    Returns {"status": "unchanged" | "updated", "bytes": downloaded,
+    "resumed_from": offset}. A 304 answer, or a new download with the same
+    sha256 as the current file, is "unchanged". When the transfer breaks,
+    the partial file and its validator are kept so the next refresh resumes
+    it with a Range request (If-Range makes the server send the whole file
+    instead if it changed in between). A checksum pin that does not match
+    raises RefreshError and leaves the current file untouched.
+    """
+    path, part_path = source["path"], source["path"] + ".part"
+    record = state["sources"].get(name)
+    headers, offset = _request_headers(source, record, state["partial"].get(name), part_path)
+    url = source["url"]
+
+    for _ in range(MAX_REDIRECTS + 1):
+        async with pool.request("GET", url, headers) as response:
+            if response.status in (301, 302, 303, 307, 308) and "location" in response.headers:
+                await response.read()
+                url = urljoin(url, response.headers["location"])
+                continue
+            if response.status == 304:
+                return {"status": "unchanged", "bytes": 0, "resumed_from": None}
+            if response.status == 416 and offset:
+                # The partial file is no longer a prefix of what the server has: start again
+                os.remove(part_path)
+                state["partial"].pop(name, None)
+                return await fetch_source(pool, name, source, state, save)
+            if response.status not in (200, 206):
+                await response.read()
+                raise RefreshError(f"{name}: HTTP {response.status} from {url}")
+
+            resumed = response.status == 206
+            if resumed and not response.headers.get("content-range", "").startswith(f"bytes {offset}-"):
+                raise RefreshError(f"{name}: unexpected Content-Range {response.headers.get('content-range')!r}")
+            start = offset if resumed else 0
+            total = _total_size(response, start)
+
+            validators = {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+            }
+            state["partial"][name] = {"url": source["url"], **validators}
+            save()
+
+            os.makedirs(os.path.dirname(part_path) or ".", exist_ok=True)
+            h = await asyncio.to_thread(_sha256, part_path) if resumed else hashlib.sha256()
+            received = 0
+            with open(part_path, "ab" if resumed else "wb") as f:
+                async for chunk in response.iter_chunks():
+                    f.write(chunk)
+                    h.update(chunk)
+                    received += len(chunk)
+            break
+    else:
+        raise RefreshError(f"{name}: more than {MAX_REDIRECTS} redirects")
+
+    size = os.path.getsize(part_path)
+    if total is not None and size != total:
+        raise RefreshError(f"{name}: downloaded {size} bytes, expected {total}")
+    digest = h.hexdigest()
+    pin = source.get("sha256")
+    if pin and digest != pin.lower():
+        os.remove(part_path)
+        state["partial"].pop(name, None)
+        raise RefreshError(f"{name}: checksum mismatch, expected {pin}, got {digest}")
+
+    unchanged = False
+    if os.path.exists(path):
+        if record and record.get("sha256") and _stat(path) == record.get("stat"):
+            current = record["sha256"]
+        else:
+            current = (await asyncio.to_thread(_sha256, path)).hexdigest()
+        unchanged = current == digest
+    if unchanged:
+        os.remove(part_path)
+    else:
+        os.replace(part_path, path)
+    state["partial"].pop(name, None)
+    state["sources"][name] = {"url": source["url"], "sha256": digest, "stat": _stat(path), **validators}
+    save()
+    return {
+        "status": "unchanged" if unchanged else "updated",
+        "bytes": received,
+        "resumed_from": start if resumed else None,
+    }
+
+
+# Full size of the file being downloaded, from Content-Range or Content-Length
+def _total_size(response, start):
+    content_range = response.headers.get("content-range", "")
+    if "/" in content_range and not content_range.endswith("/*"):
+        return int(content_range.rsplit("/", 1)[1])
+    if "content-length" in response.headers:
+        return start + int(response.headers["content-length"])
+    return None
+
+
+async def _fetch_all(sources, state, state_path, limit, timeout):
+    pool = ConnectionPool(limit, timeout)
+    save = lambda: save_state(state, state_path)  # noqa: E731
+    try:
+        results = await asyncio.gather(
+            *(fetch_source(pool, name, source, state, save) for name, source in sources.items()),
+            return_exceptions=True,
+        )
+    finally:
+        await pool.close()
+    out = {}
+    for name, result in zip(sources, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            result = {"status": "failed", "error": f"{type(result).__name__}: {result}"}
+        out[name] = result
+    return out, pool.opened
+
+
+# Fetch every configured source concurrently, then re-run only the pipeline stages reading what changed
+def refresh(names=None, sources_path=SOURCES_PATH, state_path=REFRESH_STATE_PATH, stages=STAGES,
+            pipeline_state_path=None, run_stages=True, limit=8, timeout=60.0) -> dict:
+    """
+    Returns {"sources": {name: fetch_source() result or {"status": "failed",
+    "error": ...}}, "stages": run_pipeline() result, "connections": number
+    of connections opened}. A failed source does not stop the others;
+    stages are still run for the ones that were updated.
+    """
+    sources = load_sources(sources_path)
+    if names:
+        unknown = set(names) - set(sources)
+        if unknown:
+            raise ValueError(f"Unknown sources: {sorted(unknown)}")
+        sources = {name: sources[name] for name in names}
+    skipped = [name for name, source in sources.items() if not source.get("url")]
+    sources = {name: source for name, source in sources.items() if source.get("url")}
+    if skipped:
+        print("No url configured for:", ", ".join(skipped))
+
+    state = load_state(state_path)
+    results, connections = asyncio.run(_fetch_all(sources, state, state_path, limit, timeout))
+    save_state(state, state_path)
+    for name, result in results.items():
+        detail = result.get("error") or f"{result['bytes']:,} bytes" + (
+            f", resumed at {result['resumed_from']:,}" if result.get("resumed_from") else ""
+        )
+        print(f"[{result['status']}] {name} ({detail})")
+
+    updated = [name for name, result in results.items() if result["status"] == "updated"]
+    to_run = downstream_stages(stages, [sources[name]["path"] for name in updated])
+    to_run += [s for name in updated for s in sources[name].get("stages", []) if s not in to_run]
+    stage_results = {}
+    if run_stages and to_run:
+        if "price_paid" in updated:
+            from src.dataset_source import SOURCE_ENV
+
+            os.environ.setdefault(SOURCE_ENV, f"local:path={sources['price_paid']['path']}")
+        kwargs = {"state_path": pipeline_state_path} if pipeline_state_path else {}
+        stage_results = run_pipeline(stages, names=to_run, **kwargs)
+    elif to_run:
+        print("Stages to re-run:", ", ".join(to_run))
+    return {"sources": results, "stages": stage_results, "connections": connections}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the raw inputs over HTTP and re-run the affected stages")
+    parser.add_argument("sources", nargs="*", help="Sources to refresh (default: every source with a url)")
+    parser.add_argument("--config", default=SOURCES_PATH, help="JSON file of source urls and checksum pins")
+    parser.add_argument("--no-stages", action="store_true", help="Only download; list the stages that would run")
+    parser.add_argument("--connections", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for any read")
+    args = parser.parse_args(argv)
+
+    result = refresh(args.sources or None, sources_path=args.config, run_stages=not args.no_stages,
+                     limit=args.connections, timeout=args.timeout)
+    if any(r["status"] == "failed" for r in result["sources"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
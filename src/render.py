@@ -0,0 +1,154 @@
+import argparse
+import os
+import time
+
+from src.pipeline import run_pipeline, stage
+from src.profiling import REPORT_DIR
+
+# Fingerprints of the last render of each chart (separate from the data pipeline state)
+RENDER_STATE_PATH = "data/.render_state.json"
+RENDER_REPORT_PATH = os.path.join(REPORT_DIR, "render_run")
+
+# One render stage per PNG in outputs/: target(**inputs, out_path=...) loads its data and saves the chart
+CHARTS = [
+    stage(
+        "affordability_ratio_over_time",
+        "src.affordability_analysis:render_chart",
+        {"path": "data/clean/Average_UK_houseprices_and_salary.csv"},
+        {"out_path": "outputs/affordability_ratio_over_time.png"},
+    ),
+    stage(
+        "affordability_by_age_and_gender",
+        "src.affordability_by_age:render_chart",
+        {
+            "house_price_path": "data/clean/Average_UK_houseprices_and_salary.csv",
+            "income_path": "data/raw/Income_by_age_and_gender.csv",
+        },
+        {"out_path": "outputs/affordability_by_age_and_gender.png"},
+    ),
+    stage(
+        "nominal_vs_real_house_prices",
+        "src.deflate_house_prices:render_chart",
+        {"path": "data/processed/house_prices_with_cpi_real.csv"},
+        {"out_path": "outputs/nominal_vs_real_house_prices.png"},
+    ),
+    stage(
+        "house_price_growth_vs_bank_rate",
+        "src.quarterly_changes_analysis:render_chart",
+        {
+            "bank_path": "data/clean/bank_rate_quarterly.csv",
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+        },
+        {"out_path": "outputs/house_price_growth_vs_bank_rate.png"},
+    ),
+    stage(
+        "house_price_vs_bank_rate_timeline",
+        "src.timeline_house_price_vs_bank_rate:render_chart",
+        {
+            "bank_path": "data/clean/bank_rate_quarterly.csv",
+            "house_path": "data/clean/uk_house_price_quarterly.csv",
+        },
+        {"out_path": "outputs/house_price_vs_bank_rate_timeline.png"},
+    ),
+    stage(
+        "house_price_volatility_over_time",
+        "src.plot_price_volatility:plot_volatility",
+        {"path": "data/processed/yearly_price_volatility.csv"},
+        {"out_path": "outputs/house_price_volatility_over_time.png"},
+    ),
+    stage(
+        "volatility_vs_interest_rate",
+        "src.volatility_vs_interest_rate:render_chart",
+        {
+            "volatility_path": "data/processed/yearly_price_volatility.csv",
+            "rates_path": "data/processed/bank_rate_yearly_avg.csv",
+        },
+        {"out_path": "outputs/volatility_vs_interest_rate.png"},
+    ),
+    stage(
+        "rolling_lagged_correlation_heatmap",
+        "src.rolling_correlation:render_chart",
+        {"path": "data/processed/rolling_lagged_correlation.csv"},
+        {"out_path": "outputs/rolling_lagged_correlation_heatmap.png"},
+    ),
+    stage(
+        "var_impulse_response",
+        "src.var_model:render_chart",
+        {"path": "data/processed/var_impulse_response.csv"},
+        {"out_path": "outputs/var_impulse_response.png"},
+    ),
+    stage(
+        "affordability_scenarios_heatmap",
+        "src.affordability_scenarios:render_heatmap",
+        {"path": "data/processed/affordability_scenarios.csv"},
+        {"out_path": "outputs/affordability_scenarios_heatmap.png"},
+    ),
+    stage(
+        "affordability_by_deposit_and_term",
+        "src.affordability_scenarios:render_deposit_term",
+        {"path": "data/processed/affordability_by_deposit_and_term.csv"},
+        {"out_path": "outputs/affordability_by_deposit_and_term.png"},
+    ),
+    # The histogram comes from the price paid pass (an external file), so this chart only renders when named
+    stage(
+        "price_density_heatmap",
+        "src.price_histogram:render_chart",
+        {"histogram_path": "data/processed/monthly_price_histogram.npz"},
+        {"out_path": "outputs/price_density_heatmap.png"},
+        default=False,
+    ),
+]
+
+
+# Render charts headlessly in a process pool, skipping charts whose data and code are unchanged
+def render_all(charts=CHARTS, names=None, force=False, workers=None, state_path=RENDER_STATE_PATH,
+               report_path=None, profile=None):
+    """
+    Each chart is fingerprinted from its input files and the module that
+    draws it (the same scheme as src/pipeline.py), so a re-run only redraws
+    charts whose data or plotting code changed. Workers use the Agg backend;
+    the caller's MPLBACKEND is restored afterwards. Charts are images, so the
+    pipeline's validation gate is off. names=None renders the default charts.
+    Returns {chart name: "ran" | "skipped"}.
+    """
+    previous = os.environ.get("MPLBACKEND")
+    os.environ["MPLBACKEND"] = "Agg"  # inherited by the worker processes started during the run
+    start = time.perf_counter()
+    try:
+        results = run_pipeline(charts, names=names, force=force, workers=workers, state_path=state_path,
+                               report_path=report_path, profile=profile, title="Chart render", validate=False)
+    finally:
+        if previous is None:
+            del os.environ["MPLBACKEND"]
+        else:
+            os.environ["MPLBACKEND"] = previous
+    rendered = sum(status == "ran" for status in results.values())
+    print(f"Rendered {rendered} of {len(results)} charts in {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every chart in outputs/ without opening windows")
+    parser.add_argument("charts", nargs="*", help="Charts to render (default: all but price_density_heatmap)")
+    parser.add_argument("--force", action="store_true", help="Re-render charts even if up to date")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--list", action="store_true", help="List charts and exit")
+    parser.add_argument("--report", default=RENDER_REPORT_PATH, help="Run report path without extension")
+    parser.add_argument(
+        "--profile", nargs="?", const=True, default=None, metavar="CHART",
+        help="Render under cProfile (or only CHART) and save the slowest chart's stats",
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for st in CHARTS:
+            optional = "" if st["default"] else " (only when named)"
+            print(f"{st['name']}: {', '.join(st['inputs'].values())} -> {st['outputs']['out_path']}{optional}")
+        return
+
+    render_all(names=args.charts or None, force=args.force, workers=args.workers,
+               report_path=args.report, profile=args.profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Default first year kept from the raw series (the cleaned files have always started here)
+START_YEAR = 2011
+OUTPUT_DIR = "data/processed/resampled"
+
+# Months per period for each output frequency
+FREQUENCIES = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+# Calendar month index m = Year * 12 + Month - 1 of each date
+def month_index(dates) -> np.ndarray:
+    dates = pd.DatetimeIndex(dates)
+    return dates.year.to_numpy(np.int64) * 12 + dates.month.to_numpy(np.int64) - 1
+
+
+# Bank of England daily/monthly Bank Rate: (dates, values)
+def load_bank_rate(path="data/raw/bank_rate.csv"):
+    df = pd.read_csv(path)
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    values = pd.to_numeric(df["Bank Rate"], errors="coerce")
+    return dates, values
+
+
+# Frequencies the Bank Rate stages write: quarterly (data/clean) and yearly (data/processed)
+BANK_RATE_FREQUENCIES = {"quarterly": 3, "yearly": 12}
+
+# Resampled Bank Rate: (resolved path, start_year) -> (mtime, {frequency: DataFrame})
+_BANK_RATE_CACHE = {}
+
+
+# Quarterly and yearly Bank Rate from one read and parse of the raw file, reused while the file is unchanged
+def resample_bank_rate(path="data/raw/bank_rate.csv", start_year=START_YEAR) -> dict:
+    key = (os.path.realpath(path), start_year)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _BANK_RATE_CACHE.get(key)
+    if cached is None or cached[0] != mtime:
+        resampled = resample(*load_bank_rate(path), start_year=start_year, frequencies=BANK_RATE_FREQUENCIES)
+        cached = _BANK_RATE_CACHE[key] = (mtime, resampled)
+    return {name: df.copy() for name, df in cached[1].items()}
+
+
+# ONS monthly average house price ("Jan 2011", "Aug-2025", "154,000 "): (dates, values)
+def load_house_price(path="data/raw/uk_house_price_annual_average_price.csv"):
+    df = pd.read_csv(path, skiprows=1, header=None).iloc[:, :2]
+    months = df[0].astype(str).str.strip().str.replace("-", " ", regex=False)
+    dates = pd.to_datetime(months, format="%b %Y", errors="coerce")
+    values = pd.to_numeric(df[1].astype(str).str.replace(",", "", regex=False).str.strip(), errors="coerce")
+    return dates, values
+
+
+# Mean, end-of-period, min, max and count per period for every frequency in one pass over sorted observations
+def resample(dates, values, start_year=START_YEAR, frequencies=FREQUENCIES) -> dict:
+    """
+    Observations are put on the integer month index once and sorted by date.
+    Each frequency then groups consecutive runs of m // months_per_period
+    with ufunc.reduceat, so every aggregate comes straight from the raw
+    observations (a yearly mean is not an average of quarterly means).
+    Returns {frequency: DataFrame with Year, Quarter/Month where relevant,
+    Mean, End, Min, Max, Count}, indexed by the period number.
+    """
+    dates, values = pd.DatetimeIndex(dates), np.asarray(values, dtype=np.float64)
+    keep = ~dates.isna() & np.isfinite(values)
+    if start_year is not None:
+        keep &= dates.year >= start_year
+    order = np.argsort(dates[keep].asi8, kind="stable")
+    months, values = month_index(dates[keep])[order], values[keep][order]
+
+    out = {}
+    for name, months_per_period in frequencies.items():
+        periods = months // months_per_period
+        starts = np.flatnonzero(np.diff(periods, prepend=periods[:1] - 1))
+        counts = np.diff(np.append(starts, len(periods)))
+        df = pd.DataFrame(
+            {
+                "Mean": np.add.reduceat(values, starts) / counts,
+                "End": values[starts + counts - 1],
+                "Min": np.minimum.reduceat(values, starts),
+                "Max": np.maximum.reduceat(values, starts),
+                "Count": counts,
+            },
+            index=pd.Index(periods[starts], name="Period"),
+        )
+        first_month = df.index.to_numpy() * months_per_period
+        df.insert(0, "Year", first_month // 12)
+        if name == "quarterly":
+            df.insert(1, "Quarter", first_month % 12 // 3 + 1)
+        elif name == "monthly":
+            df.insert(1, "Month", first_month % 12 + 1)
+        out[name] = df
+    return out
+
+
+# Write every frequency of one series to <output_dir>/<series>_<frequency>.csv
+def write_resampled(series, resampled, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, df in resampled.items():
+        path = os.path.join(output_dir, f"{series}_{name}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+        print("Saved:", path)
+    return paths
+
+
+LOADERS = {"bank_rate": load_bank_rate, "house_price": load_house_price}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monthly, quarterly and yearly aggregates of the raw series")
+    parser.add_argument("--start-year", type=int, default=START_YEAR, help="First year kept (0 for all history)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    for series, load in LOADERS.items():
+        resampled = resample(*load(), start_year=args.start_year or None)
+        write_resampled(series, resampled, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.profiling import add_rows, step
+from src.quarterly_panel import get_panel
+from src.utils import show_figure
+
+OUTPUT_PATH = "data/processed/rolling_lagged_correlation.csv"
+HEATMAP_PATH = "outputs/rolling_lagged_correlation_heatmap.png"
+
+LAGS = range(-12, 13)
+WINDOWS = range(8, 41)
+HEATMAP_WINDOW = 20
+
+
+# Row i holds x shifted forward by lags[i]: column t is x[t - lag], NaN where that falls outside the series
+def _shifted(x, lags) -> np.ndarray:
+    n = len(x)
+    index = np.arange(n)[None, :] - np.asarray(lags)[:, None]
+    inside = (index >= 0) & (index < n)
+    return np.where(inside, x[np.clip(index, 0, n - 1)], np.nan)
+
+
+# Prefix sums of count, x, y, x^2, y^2 and xy over the pairs where both are present
+def _prefix_sums(x, y, lags) -> np.ndarray:
+    """
+    Shape (6, len(lags), n + 1). The series are centred on their means first,
+    which keeps the one-pass variance formula accurate.
+    """
+    xs = _shifted(x - np.nanmean(x), lags)
+    ys = np.broadcast_to(y - np.nanmean(y), xs.shape)
+    present = np.isfinite(xs) & np.isfinite(ys)
+    xs, ys = np.where(present, xs, 0.0), np.where(present, ys, 0.0)
+
+    terms = np.stack([present.astype(np.float64), xs, ys, xs * xs, ys * ys, xs * ys])
+    sums = np.zeros(terms.shape[:2] + (terms.shape[2] + 1,))
+    np.cumsum(terms, axis=2, out=sums[:, :, 1:])
+    return sums
+
+
+# Pearson r from (count, Sx, Sy, Sxx, Syy, Sxy) arrays
+def _pearson(sums) -> np.ndarray:
+    n, sx, sy, sxx, syy, sxy = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    return np.where(n > 2, np.clip(r, -1, 1), np.nan)
+
+
+# Whole-sample correlation of y[t] with x[t - lag] for every lag
+def lagged_correlations(x, y, lags=LAGS) -> pd.DataFrame:
+    """
+    A positive lag compares y with x that many periods earlier (x leads).
+    """
+    lags = np.asarray(lags)
+    sums = _prefix_sums(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), lags)[:, :, -1]
+    return pd.DataFrame({"Lag": lags, "N": sums[0].astype(np.int64), "Correlation": _pearson(sums)})
+
+
+# Rolling correlations for every (lag, window length, window end) at once
+def rolling_correlations(x, y, windows=WINDOWS, lags=LAGS, labels=None) -> pd.DataFrame:
+    """
+    x and y are equally spaced and aligned (missing periods as NaN). Every
+    window is a difference of two prefix sums, so the cost is one cumsum
+    plus one gather for all lags x windows x ends, with no per-window loop.
+    Only windows in which every pair is present are reported. `End` is the
+    label (default: position) of the last y period in the window.
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    lags, windows = np.asarray(lags), np.asarray(windows)
+    n = len(y)
+    sums = _prefix_sums(x, y, lags)
+
+    ends = np.arange(n)
+    starts = ends[None, :] + 1 - windows[:, None]
+    window_sums = sums[:, :, None, ends + 1] - sums[:, :, np.clip(starts, 0, None)]
+    r = np.where(window_sums[0] == windows[None, :, None], _pearson(window_sums), np.nan)
+
+    lag_i, window_i, end_i = np.nonzero(np.isfinite(r))
+    labels = np.arange(n) if labels is None else np.asarray(labels)
+    return pd.DataFrame(
+        {
+            "Lag": lags[lag_i],
+            "Window": windows[window_i],
+            "End": labels[end_i],
+            "Correlation": r[lag_i, window_i, end_i],
+        }
+    )
+
+
+# Quarterly bank rate and house price growth on a gap-free quarter index
+def load_quarterly_series(
+    bank_path="data/clean/bank_rate_quarterly.csv",
+    house_path="data/clean/uk_house_price_quarterly.csv",
+) -> pd.DataFrame:
+    panel = get_panel(house_path=house_path, bank_path=bank_path)
+    panel = panel.reindex(range(panel.index.min(), panel.index.max() + 1))
+    panel["Year_Quarter"] = (panel.index // 4).astype(str) + " Q" + (panel.index % 4 + 1).astype(str)
+    panel["House_Price_Pct_Change"] = panel["UK_Average_House_Price"].pct_change(fill_method=None) * 100
+    return panel[["Year_Quarter", "Bank_Rate_Quarterly_Avg", "House_Price_Pct_Change"]]
+
+
+# Compute and save the tidy rolling correlation table
+def build_rolling_correlations(
+    bank_path="data/clean/bank_rate_quarterly.csv",
+    house_path="data/clean/uk_house_price_quarterly.csv",
+    output_path=OUTPUT_PATH,
+) -> pd.DataFrame:
+    with step("read") as record:
+        df = load_quarterly_series(bank_path, house_path)
+        add_rows(record, rows_in=len(df))
+    x, y = df["Bank_Rate_Quarterly_Avg"].to_numpy(), df["House_Price_Pct_Change"].to_numpy()
+
+    start = time.perf_counter()
+    with step("correlate"):
+        table = rolling_correlations(x, y, labels=df["Year_Quarter"].to_numpy())
+    print(f"{len(table)} rolling correlations in {time.perf_counter() - start:.3f}s")
+
+    with step("write", rows_out=len(table)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        table.to_csv(output_path, index=False)
+    print("Saved:", output_path)
+    return table
+
+
+# Lag x window-end heatmap of rolling correlations for one window length
+def plot_heatmap(table, window=HEATMAP_WINDOW, out_path=HEATMAP_PATH):
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    grid = table[table["Window"] == window].pivot(index="Lag", columns="End", values="Correlation")
+
+    fig, ax = plt.subplots(figsize=(12, 5))
+    image = ax.imshow(grid.to_numpy(), aspect="auto", cmap="RdBu_r", vmin=-1, vmax=1, origin="lower")
+    ax.set_yticks(range(len(grid.index)))
+    ax.set_yticklabels(grid.index)
+    tick_every = max(len(grid.columns) // 15, 1)
+    ax.set_xticks(range(0, len(grid.columns), tick_every))
+    ax.set_xticklabels(grid.columns[::tick_every], rotation=45, ha="right")
+    ax.set_xlabel("End of window")
+    ax.set_ylabel("Lag of Bank Rate (quarters)")
+    ax.set_title(f"Rolling {window}-quarter correlation: Bank Rate vs House Price Growth")
+    fig.colorbar(image, ax=ax, label="Pearson r")
+    fig.tight_layout()
+    fig.savefig(out_path)
+    show_figure(fig)
+
+
+# Headless entry point used by src/render.py
+def render_chart(
+    path=OUTPUT_PATH,
+    out_path=HEATMAP_PATH,
+):
+    plot_heatmap(pd.read_csv(path), HEATMAP_WINDOW, out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling and lagged Bank Rate vs house price growth correlations")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--heatmap", default=HEATMAP_PATH)
+    parser.add_argument("--window", type=int, default=HEATMAP_WINDOW, help="Window length shown in the heatmap")
+    args = parser.parse_args(argv)
+
+    table = build_rolling_correlations(output_path=args.output)
+    df = load_quarterly_series()
+    print(lagged_correlations(df["Bank_Rate_Quarterly_Avg"], df["House_Price_Pct_Change"]).to_string(index=False))
+    plot_heatmap(table, args.window, args.heatmap)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# Per-key sufficient statistics kept instead of raw prices
+MOMENT_COLUMNS = ["Count", "Mean", "M2", "Min", "Max", "Sum_Log"]
+
+
+# Empty moments table (no keys seen yet)
+def empty_moments(index_name="Year") -> pd.DataFrame:
+    df = pd.DataFrame(columns=MOMENT_COLUMNS, dtype=float)
+    df.index.name = index_name
+    return df
+
+
+# Reduce one chunk of (key, price) pairs to per-key moments
+def chunk_moments(keys, prices, index_name="Year") -> pd.DataFrame:
+    """
+    Count, mean and M2 (sum of squared deviations from the mean) per key,
+    plus min, max and the sum of log prices for the geometric mean.
+    M2 is computed around each key's own chunk mean, so it stays accurate
+    even when prices are large relative to their spread.
+    """
+    prices = pd.Series(np.asarray(prices, dtype=np.float64))
+    keys = pd.Series(np.asarray(keys))
+    if prices.empty:
+        return empty_moments(index_name)
+
+    grouped = prices.groupby(keys, sort=True)
+    out = grouped.agg(["count", "mean", "min", "max"])
+    deviation = prices - out["mean"].reindex(keys).to_numpy()
+
+    moments = pd.DataFrame(
+        {
+            "Count": out["count"].astype(float),
+            "Mean": out["mean"],
+            "M2": (deviation * deviation).groupby(keys, sort=True).sum(),
+            "Min": out["min"],
+            "Max": out["max"],
+            "Sum_Log": np.log(prices).groupby(keys, sort=True).sum(),
+        }
+    )
+    moments.index.name = index_name
+    return moments
+
+
+# Merge two moments tables (Chan et al. pairwise update)
+def merge_moments(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    if a.empty:
+        return b.copy()
+    if b.empty:
+        return a.copy()
+
+    index = a.index.union(b.index)
+    a = a.reindex(index)
+    b = b.reindex(index)
+
+    n_a = a["Count"].fillna(0).to_numpy()
+    n_b = b["Count"].fillna(0).to_numpy()
+    mean_a = a["Mean"].fillna(0).to_numpy()
+    mean_b = b["Mean"].fillna(0).to_numpy()
+
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    merged = pd.DataFrame(
+        {
+            "Count": n,
+            "Mean": mean_a + delta * n_b / n,
+            "M2": (
+                a["M2"].fillna(0).to_numpy()
+                + b["M2"].fillna(0).to_numpy()
+                + delta * delta * n_a * n_b / n
+            ),
+            "Min": np.fmin(a["Min"].to_numpy(), b["Min"].to_numpy()),
+            "Max": np.fmax(a["Max"].to_numpy(), b["Max"].to_numpy()),
+            "Sum_Log": a["Sum_Log"].fillna(0).to_numpy() + b["Sum_Log"].fillna(0).to_numpy(),
+        },
+        index=index,
+    )
+    return merged
+
+
+# Turn moments into the yearly volatility table
+def finalize_moments(moments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Price_STD uses ddof=1 to match pd.Series.std() on the raw prices.
+    Years with a single transaction get NaN, as pandas would.
+    """
+    count = moments["Count"]
+    variance = moments["M2"] / (count - 1).where(count > 1)
+
+    out = pd.DataFrame(
+        {
+            "Price_STD": np.sqrt(variance),
+            "Transaction_Count": count.astype("int64"),
+            "Price_Mean": moments["Mean"],
+            "Price_Min": moments["Min"],
+            "Price_Max": moments["Max"],
+            "Price_Geo_Mean": np.exp(moments["Sum_Log"] / count),
+        },
+        index=moments.index,
+    )
+    return out.sort_index().reset_index()
+
+
+# Remove a part from a total (inverse of merge_moments), for retracted transactions
+def subtract_moments(total: pd.DataFrame, part: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count, mean, M2 and the sum of logs are exact to float rounding after
+    retraction. Min and max cannot be retracted from moments alone, so they
+    stay as the bounds seen so far. Keys whose count drops to zero are removed.
+    """
+    if part.empty:
+        return total.copy()
+    missing = part.index.difference(total.index)
+    if len(missing):
+        raise KeyError(f"Cannot retract keys that were never added: {list(missing)}")
+
+    part = part.reindex(total.index)
+    n = total["Count"].to_numpy()
+    n_b = part["Count"].fillna(0).to_numpy()
+    mean_b = part["Mean"].fillna(0).to_numpy()
+    if (n_b > n).any():
+        raise ValueError("Cannot retract more transactions than were added")
+
+    n_a = n - n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_a = np.where(n_a > 0, (n * total["Mean"].to_numpy() - n_b * mean_b) / n_a, 0.0)
+        delta = mean_b - mean_a
+        m2_a = total["M2"].to_numpy() - part["M2"].fillna(0).to_numpy() - delta * delta * n_a * n_b / n
+
+    out = total.copy()
+    out["Count"] = n_a
+    out["Mean"] = mean_a
+    out["M2"] = np.maximum(m2_a, 0.0)
+    out["Sum_Log"] = total["Sum_Log"].to_numpy() - part["Sum_Log"].fillna(0).to_numpy()
+    return out[out["Count"] > 0]
@@ -0,0 +1,30 @@
+import hashlib
+import os
+
+# Backends that cannot open a window, so plt.show() would only warn
+NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+
+# sha256 of a file, reusing the cached digest while size and mtime are unchanged
+def file_digest(path, cache):
+    st = os.stat(path)
+    key = [st.st_size, st.st_mtime_ns]
+    cached = cache.get(path)
+    if cached and cached[:2] == key:
+        return cached[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    cache[path] = key + [h.hexdigest()]
+    return h.hexdigest()
+
+
+# Called by every plotting function after saving: show on interactive backends, then always close
+def show_figure(fig):
+    import matplotlib.pyplot as plt
+
+    if plt.get_backend().lower() not in NON_INTERACTIVE_BACKENDS:
+        plt.show()
+    plt.close(fig)
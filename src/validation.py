@@ -0,0 +1,350 @@
+import argparse
+import hashlib
+import json
+import operator
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.utils import file_digest
+
+# Validation results of the last check of each file, keyed by path (not committed)
+CACHE_PATH = "data/.validation_cache.json"
+
+# Comparisons allowed in bounds, e.g. {"ge": 0, "lt": 20}
+BOUNDS = {"gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le}
+
+# Real house price and median salary by year (the cleaned file and the pipeline's own output)
+HOUSE_PRICE_SALARY_RULES = {
+    "columns": {"Year": "int", "Real_House_Price": "number", "Real_Median_Salary": "number"},
+    "min_rows": 1,
+    "not_null": ["Year", "Real_House_Price", "Real_Median_Salary"],
+    "monotonic": ["Year"],
+    "positive": ["Real_House_Price", "Real_Median_Salary"],
+    "ratios": {"Real_House_Price/Real_Median_Salary": {"gt": 1, "lt": 100}},
+}
+
+QUARTERS = ["Q1", "Q2", "Q3", "Q4"]
+
+# Rules per dataset, matched on the end of the path ("clean/<file>") so copies in other data dirs are checked too
+DATASETS = {
+    "clean/Average_UK_houseprices_and_salary.csv": HOUSE_PRICE_SALARY_RULES,
+    "clean/Average_UK_houseprices_and_salary_clean.csv": HOUSE_PRICE_SALARY_RULES,
+    "clean/uk_house_price_quarterly.csv": {
+        "columns": {"Year": "int", "Quarter": "str", "UK_Average_House_Price": "number"},
+        "min_rows": 40,
+        "not_null": ["Year", "Quarter", "UK_Average_House_Price"],
+        "monotonic": ["Year"],
+        "allowed": {"Quarter": QUARTERS},
+        "positive": ["UK_Average_House_Price"],
+    },
+    "clean/bank_rate_quarterly.csv": {
+        "columns": {"Year": "int", "Quarter": "str", "Bank_Rate_Quarterly_Avg": "number"},
+        "min_rows": 1,
+        "not_null": ["Year", "Quarter", "Bank_Rate_Quarterly_Avg"],
+        "monotonic": ["Year"],
+        "allowed": {"Quarter": QUARTERS},
+        "ranges": {"Bank_Rate_Quarterly_Avg": {"ge": 0, "lt": 20}},
+    },
+    "clean/cpi_quarterly_avg.csv": {
+        "columns": {"Year": "int", "Quarter": "int", "CPI_Quarterly_Avg": "number"},
+        "min_rows": 1,
+        "not_null": ["Year", "Quarter", "CPI_Quarterly_Avg"],
+        "monotonic": ["Year"],
+        "ranges": {"Quarter": {"ge": 1, "le": 4}, "CPI_Quarterly_Avg": {"gt": -10, "lt": 50}},
+    },
+    "processed/house_prices_with_cpi_real.csv": {
+        "columns": {
+            "Year": "int", "t": "int", "UK_Average_House_Price": "number",
+            "CPI_Index": "number", "Real_House_Price": "number",
+        },
+        "min_rows": 1,
+        "not_null": ["Year", "t", "UK_Average_House_Price", "CPI_Index", "Real_House_Price"],
+        "monotonic": ["Year", "t"],
+        "unique": ["t"],
+        "positive": ["UK_Average_House_Price", "CPI_Index", "Real_House_Price"],
+        # Deflating by a price index moves prices by decades of inflation at most, not by multiples
+        "ratios": {"Real_House_Price/UK_Average_House_Price": {"gt": 0.2, "lt": 5}},
+    },
+    "processed/bank_rate_yearly_avg.csv": {
+        "columns": {"Year": "int", "Bank_Rate_Yearly_Avg": "number"},
+        "min_rows": 1,
+        "not_null": ["Year", "Bank_Rate_Yearly_Avg"],
+        "monotonic": ["Year"],
+        "unique": ["Year"],
+        "ranges": {"Bank_Rate_Yearly_Avg": {"ge": 0, "lt": 20}},
+    },
+    "processed/rolling_lagged_correlation.csv": {
+        "columns": {"Lag": "int", "Window": "int", "End": "str", "Correlation": "number"},
+        "min_rows": 1,
+        "positive": ["Window"],
+        "ranges": {"Correlation": {"ge": -1, "le": 1}},
+    },
+    "processed/distributed_lag_models.csv": {
+        "columns": {
+            "Lags": "int", "CPI_Control": "str", "Start": "int", "End": "int", "N": "int", "K": "int",
+            "Long_Run_Effect": "number", "Long_Run_SE": "number", "AIC": "number", "BIC": "number",
+            "Rank_AIC": "int", "Rank_BIC": "int",
+        },
+        "min_rows": 1,
+        "not_null": ["Long_Run_Effect", "AIC", "BIC"],
+        "monotonic": ["Start"],
+        "allowed": {"CPI_Control": ["none", "level", "lags"]},
+        "positive": ["N", "Long_Run_SE", "Rank_AIC", "Rank_BIC"],
+        "ranges": {"Long_Run_P": {"ge": 0, "le": 1}, "R2": {"ge": 0, "le": 1}},
+        "ratios": {"N/K": {"gt": 1}},
+    },
+    "processed/var_impulse_response.csv": {
+        "columns": {
+            "Model": "str", "Lag_Order": "int", "Horizon": "int", "Variable": "str",
+            "Response": "number", "Lower": "number", "Upper": "number",
+        },
+        "min_rows": 1,
+        "not_null": ["Response", "Lower", "Upper"],
+        "positive": ["Lag_Order"],
+        "ranges": {"Horizon": {"ge": 0}},
+    },
+    "processed/var_forecast.csv": {
+        "columns": {
+            "Model": "str", "Lag_Order": "int", "Year_Quarter": "str", "Variable": "str",
+            "Forecast": "number", "Lower": "number", "Upper": "number",
+        },
+        "min_rows": 1,
+        "not_null": ["Forecast", "Lower", "Upper"],
+        "positive": ["Lag_Order"],
+    },
+    "processed/yearly_price_volatility.csv": {
+        "columns": {"Year": "int", "Price_STD": "number", "Transaction_Count": "int"},
+        "min_rows": 5,
+        "not_null": ["Year", "Price_STD", "Transaction_Count"],
+        "monotonic": ["Year"],
+        "unique": ["Year"],
+        "positive": ["Price_STD", "Transaction_Count"],
+    },
+    "processed/affordability_scenarios.csv": {
+        "columns": {
+            "Year": "int", "Age_Group": "str", "Gender": "str", "Share_Affordable": "number",
+            "PTI_P10": "number", "PTI_Median": "number", "PTI_P90": "number",
+        },
+        "min_rows": 1,
+        "monotonic": ["Year"],
+        "positive": ["PTI_P10", "PTI_Median", "PTI_P90"],
+        "ranges": {"Share_Affordable": {"ge": 0, "le": 1}},
+        "ratios": {"PTI_P90/PTI_P10": {"ge": 1}},
+    },
+    "processed/affordability_by_deposit_and_term.csv": {
+        "columns": {"Year": "int", "Deposit": "number", "Term": "int", "Share_Affordable": "number"},
+        "min_rows": 1,
+        "monotonic": ["Year"],
+        "positive": ["Term"],
+        "ranges": {"Deposit": {"gt": 0, "lt": 1}, "Share_Affordable": {"ge": 0, "le": 1}},
+    },
+}
+
+class ValidationError(ValueError):
+    pass
+
+
+# Rules for a path, or None when the dataset has none
+def rules_for(path):
+    path = os.path.normpath(path).replace(os.sep, "/")
+    for suffix, rules in DATASETS.items():
+        if path == suffix or path.endswith("/" + suffix):
+            return rules
+    return None
+
+
+def _rules_digest(rules):
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+
+def _within(values, bounds):
+    ok = np.ones(len(values), dtype=bool)
+    for op, limit in bounds.items():
+        ok &= BOUNDS[op](values, limit)
+    return ok | np.isnan(values)  # missing values are the not_null rule's business
+
+
+# Evaluate every rule against one frame; each check is vectorised over all rows
+def evaluate(df, rules) -> list:
+    """
+    Returns one check per (rule, target): {"rule", "target", "failed",
+    "rows"} with the number of failing rows and the first few of them.
+    Value rules (range, positive, ratio) skip missing values, which only
+    not_null reports. A rule on a missing column fails with failed=-1.
+    """
+    checks = []
+
+    def add(rule, target, ok):
+        ok = np.asarray(ok, dtype=bool)
+        bad = np.flatnonzero(~ok)
+        checks.append({"rule": rule, "target": target, "failed": len(bad), "rows": bad[:5].tolist()})
+
+    def missing(rule, target, *columns):
+        gone = [c for c in columns if c not in df.columns]
+        if gone:
+            checks.append({"rule": rule, "target": target, "failed": -1, "rows": [], "missing": gone})
+        return bool(gone)
+
+    columns = rules.get("columns", {})
+    if not missing("columns", ",".join(columns), *columns):
+        add("columns", ",".join(columns), [True])
+    add("min_rows", str(rules.get("min_rows", 0)), [len(df) >= rules.get("min_rows", 0)])
+
+    # Each numeric column is converted once and shared by every rule on it
+    numeric = {}
+
+    def values(column):
+        if column not in numeric:
+            numeric[column] = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+        return numeric[column]
+
+    for column, kind in columns.items():
+        if kind == "str" or column not in df.columns:
+            continue
+        add("type", column, ~np.isnan(values(column)) | df[column].isna().to_numpy())
+        if kind == "int":
+            add("integer", column, np.isnan(values(column)) | (values(column) % 1 == 0))
+
+    for column in rules.get("not_null", []):
+        if not missing("not_null", column, column):
+            add("not_null", column, df[column].notna())
+
+    for column in rules.get("monotonic", []):
+        if not missing("monotonic", column, column):
+            ordered = df[column].to_numpy() if columns.get(column) == "str" else values(column)
+            add("monotonic", column, np.concatenate([[True], ordered[1:] >= ordered[:-1]]))
+
+    for column in rules.get("unique", []):
+        if not missing("unique", column, column):
+            add("unique", column, ~df[column].duplicated().to_numpy())
+
+    for column in rules.get("positive", []):
+        if not missing("positive", column, column):
+            add("positive", column, _within(values(column), {"gt": 0}))
+
+    for column, bounds in rules.get("ranges", {}).items():
+        if not missing("range", column, column):
+            add("range", column, _within(values(column), bounds))
+
+    for ratio, bounds in rules.get("ratios", {}).items():
+        numerator, denominator = ratio.split("/")
+        if not missing("ratio", ratio, numerator, denominator):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                add("ratio", ratio, _within(values(numerator) / values(denominator), bounds))
+
+    for column, values in rules.get("allowed", {}).items():
+        if not missing("allowed", column, column):
+            add("allowed", column, df[column].isin(values) | df[column].isna())
+
+    return checks
+
+
+def load_cache(cache_path=CACHE_PATH):
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f)
+    return {"results": {}, "files": {}}
+
+
+def save_cache(cache, cache_path=CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path + ".tmp", "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(cache_path + ".tmp", cache_path)
+
+
+# Validate one dataset: read it once, evaluate all of its rules, reuse the result while the file is unchanged
+def validate(path, rules=None, cache=None) -> dict:
+    """
+    Returns {"path", "sha256", "rows", "passed", "checks"} (see evaluate()).
+    Results are cached in cache (a load_cache() dict) when given and reused
+    while the file's sha256 and the rules are unchanged.
+    """
+    rules = rules if rules is not None else rules_for(path)
+    if rules is None:
+        raise ValueError(f"No validation rules for {path}")
+
+    files = cache["files"] if cache is not None else {}
+    digest, rules_digest = file_digest(path, files), _rules_digest(rules)
+    stored = cache["results"].get(path) if cache is not None else None
+    if stored and stored["sha256"] == digest and stored["rules"] == rules_digest:
+        result = stored
+    else:
+        df = pd.read_csv(path, encoding="utf-8-sig")
+        df.columns = [c.strip() for c in df.columns]
+        checks = evaluate(df, rules)
+        result = {
+            "path": path,
+            "sha256": digest,
+            "rules": rules_digest,
+            "rows": len(df),
+            "passed": all(c["failed"] == 0 for c in checks),
+            "checks": checks,
+        }
+    if cache is not None:
+        cache["results"][path] = result
+    return result
+
+
+# The check for one rule and target of a result (KeyError when the rules never checked it)
+def check_result(result, rule, target) -> dict:
+    for check in result["checks"]:
+        if check["rule"] == rule and check["target"] == target:
+            return check
+    raise KeyError(f"{result['path']} has no {rule} check on {target}")
+
+
+# One line per failed check
+def describe_failures(result) -> list:
+    lines = []
+    for c in result["checks"]:
+        if c.get("missing"):
+            lines.append(f"{result['path']}: {c['rule']} {c['target']}: missing columns {c['missing']}")
+        elif c["failed"]:
+            lines.append(f"{result['path']}: {c['rule']} {c['target']}: {c['failed']} rows failed (e.g. {c['rows']})")
+    return lines
+
+
+# Pipeline gate: validate every output that has rules and raise ValidationError if any check failed
+def check_outputs(paths, cache_path=CACHE_PATH) -> list:
+    cache = load_cache(cache_path)
+    results = [validate(p, cache=cache) for p in paths if rules_for(p) is not None]
+    if cache_path:
+        save_cache(cache, cache_path)
+    failures = [line for r in results for line in describe_failures(r)]
+    if failures:
+        raise ValidationError("Validation failed:\n  " + "\n  ".join(failures))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the clean and processed datasets against their rules")
+    parser.add_argument("paths", nargs="*", help="Files to validate (default: every dataset with rules that exists)")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--cache", default=CACHE_PATH, help="Result cache (empty string to disable)")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [
+        os.path.join(args.data_dir, suffix)
+        for suffix in DATASETS
+        if os.path.exists(os.path.join(args.data_dir, suffix))
+    ]
+    cache = load_cache(args.cache)
+    failed = 0
+    for path in paths:
+        result = validate(path, cache=cache)
+        print(f"[{'ok' if result['passed'] else 'FAIL'}] {path} ({result['rows']} rows, {len(result['checks'])} checks)")
+        for line in describe_failures(result):
+            print("      " + line)
+        failed += not result["passed"]
+    if args.cache:
+        save_cache(cache, args.cache)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
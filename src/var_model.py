@@ -0,0 +1,349 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.correlation_inference import resample_batches
+from src.profiling import add_rows, step
+from src.quarterly_panel import BANK_PATH, CPI_PATH, HOUSE_PATH, get_panel
+from src.utils import show_figure
+
+IRF_PATH = "data/processed/var_impulse_response.csv"
+FORECAST_PATH = "data/processed/var_forecast.csv"
+CHART_PATH = "outputs/var_impulse_response.png"
+
+# Fitted models and bootstrap draws keyed by a hash of their data and settings (not committed)
+CACHE_DIR = "data/.var_cache"
+CACHE_VERSION = 1
+
+# Variables of each VAR in Cholesky order: the Bank Rate is last, so the others react to it from the next quarter
+MODELS = {
+    "baseline": ["Real_Growth", "Bank_Rate_Quarterly_Avg"],
+    "with_cpi": ["CPI_Quarterly_Avg", "Real_Growth", "Bank_Rate_Quarterly_Avg"],
+}
+SHOCK = "Bank_Rate_Quarterly_Avg"
+GROWTH = "Real_Growth"
+# Real_Growth responses cumulated into the % change of the real house price level
+LEVEL = "Real_House_Price"
+
+MAX_LAGS = 8
+IC = "aic"
+HORIZON = 8
+N_BOOT = 2000
+BATCH_SIZE = 250
+CONFIDENCE = 0.9
+SEED = 0
+
+
+# Real house price growth (100 x log change), Bank Rate and CPI inflation on a gap-free quarter index
+def load_var_data(house_path=HOUSE_PATH, cpi_path=CPI_PATH, bank_path=BANK_PATH) -> pd.DataFrame:
+    # Real_House_Price is deflated from the clean files by src/deflation.py (via the quarterly panel)
+    panel = get_panel(house_path=house_path, cpi_path=cpi_path, bank_path=bank_path)
+    df = panel[["Real_House_Price", "CPI_Quarterly_Avg", "Bank_Rate_Quarterly_Avg"]]
+    df = df.reindex(range(df.index.min(), df.index.max() + 1))
+    df[GROWTH] = 100 * np.log(df["Real_House_Price"]).diff()
+    df["Year_Quarter"] = (df.index // 4).astype(str) + " Q" + (df.index % 4 + 1).astype(str)
+    return df
+
+
+# The latest run of consecutive quarters in which every variable is present
+def model_sample(df, variables) -> pd.DataFrame:
+    present = df[variables].notna().all(axis=1).to_numpy()
+    if not present.any():
+        raise ValueError(f"No quarter has all of {variables}")
+    end = np.flatnonzero(present)[-1]
+    gaps = np.flatnonzero(~present[:end])
+    return df.iloc[(gaps[-1] + 1 if len(gaps) else 0) : end + 1][variables]
+
+
+# Lag order chosen by an information criterion (at least 1)
+def select_lag_order(y, max_lags=MAX_LAGS, ic=IC) -> int:
+    from statsmodels.tsa.api import VAR
+
+    max_lags = min(max_lags, len(y) // (y.shape[1] + 2))
+    return max(int(VAR(y).select_order(max_lags).selected_orders[ic]), 1)
+
+
+# OLS VAR(p) with a constant
+def fit_var(y, lag_order) -> dict:
+    from statsmodels.tsa.api import VAR
+
+    fit = VAR(y).fit(lag_order, trend="c")
+    return {
+        "lag_order": np.int64(lag_order),
+        "coefs": fit.coefs,
+        "intercept": fit.intercept,
+        "sigma_u": np.asarray(fit.sigma_u),
+        "resid": np.asarray(fit.resid),
+    }
+
+
+# MA(inf) coefficients Phi_0..Phi_horizon of one or a batch of VARs: coefs has shape (..., p, k, k)
+def ma_coefficients(coefs, horizon) -> np.ndarray:
+    coefs = np.asarray(coefs)
+    *batch, p, k, _ = coefs.shape
+    phi = np.zeros((*batch, horizon + 1, k, k))
+    phi[..., 0, :, :] = np.eye(k)
+    for h in range(1, horizon + 1):
+        for i in range(1, min(h, p) + 1):
+            phi[..., h, :, :] += phi[..., h - i, :, :] @ coefs[..., i - 1, :, :]
+    return phi
+
+
+# Responses of every variable to a Cholesky shock that moves variable `shock` by 1 on impact: (..., horizon + 1, k)
+def shock_response(coefs, sigma_u, horizon, shock) -> np.ndarray:
+    impact = np.linalg.cholesky(sigma_u)[..., :, shock]
+    impact = impact / impact[..., shock, None]
+    return np.einsum("...hij,...j->...hi", ma_coefficients(coefs, horizon), impact)
+
+
+# Batched OLS VAR(p) with a constant: Y has shape (size, T, k); returns coefs (size, p, k, k) and sigma_u
+def _ols_var(Y, p):
+    size, T, k = Y.shape
+    Z = np.concatenate([np.ones((size, T - p, 1))] + [Y[:, p - i : T - i] for i in range(1, p + 1)], axis=2)
+    target = Y[:, p:]
+    Zt = Z.transpose(0, 2, 1)
+    B = np.linalg.solve(Zt @ Z, Zt @ target)
+    resid = target - Z @ B
+    sigma_u = resid.transpose(0, 2, 1) @ resid / (T - p - Z.shape[2])
+    return B[:, 1:].reshape(size, p, k, k).transpose(0, 1, 3, 2), sigma_u
+
+
+# Residual (recursive-design) bootstrap: simulate `size` series from the fit, re-estimate, and return their responses
+def _bootstrap_batch(size, seed, y, coefs, intercept, resid, horizon, shock):
+    rng = np.random.default_rng(seed)
+    T, k = y.shape
+    p = len(coefs)
+    u = resid - resid.mean(axis=0)
+    draws = u[rng.integers(0, len(u), (size, T - p))]
+
+    sim = np.empty((size, T, k))
+    sim[:, :p] = y[:p]
+    for t in range(p, T):
+        sim[:, t] = intercept + draws[:, t - p]
+        for i in range(p):
+            sim[:, t] += sim[:, t - 1 - i] @ coefs[i].T
+
+    out = np.full((size, horizon + 1, k), np.nan)
+    ok = np.isfinite(sim).all(axis=(1, 2))
+    if ok.any():
+        boot_coefs, boot_sigma = _ols_var(sim[ok], p)
+        out[ok] = shock_response(boot_coefs, boot_sigma, horizon, shock)
+    return out
+
+
+def _cache_key(*parts) -> str:
+    h = hashlib.sha256(json.dumps([CACHE_VERSION] + [p for p in parts if not isinstance(p, np.ndarray)]).encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+    return h.hexdigest()[:24]
+
+
+# Load <cache_dir>/<name>.npz, or compute it and save it there; returns (arrays, cache hit)
+def _cached(cache_dir, name, compute):
+    path = os.path.join(cache_dir, name + ".npz") if cache_dir else None
+    if path and os.path.exists(path):
+        with np.load(path) as f:
+            return dict(f), True
+    arrays = compute()
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(path[: -len(".npz")] + ".tmp.npz", **arrays)
+        os.replace(path[: -len(".npz")] + ".tmp.npz", path)
+    return arrays, False
+
+
+# Lag selection and fit for one model, reused from the cache while its data and settings are unchanged
+def fit_model(df, variables, max_lags=MAX_LAGS, ic=IC, cache_dir=CACHE_DIR) -> dict:
+    sample = model_sample(df, variables)
+    y = sample.to_numpy(dtype=np.float64)
+    key = _cache_key("fit", variables, max_lags, ic, y, sample.index.to_numpy(np.int64))
+    fit, hit = _cached(cache_dir, f"fit-{key}", lambda: fit_var(y, select_lag_order(y, max_lags, ic)))
+    return {**fit, "y": y, "t": sample.index.to_numpy(), "variables": list(variables), "key": key, "cached": hit}
+
+
+# Bootstrap draws of the responses to a 1-unit shock in SHOCK: (n_boot, horizon + 1, k), cached with the fit
+def bootstrap_responses(model, horizon=HORIZON, n_boot=N_BOOT, seed=SEED, workers=None,
+                        batch_size=BATCH_SIZE, cache_dir=CACHE_DIR):
+    """
+    Replications run in fixed batches with their own child seeds
+    (resample_batches), so the draws are identical for any number of
+    workers and can be cached by (model, horizon, n_boot, seed, batch_size).
+    """
+    shock = model["variables"].index(SHOCK)
+    args = (model["y"], model["coefs"], model["intercept"], model["resid"], horizon, shock)
+    key = _cache_key("irf", model["key"], horizon, n_boot, seed, batch_size)
+    draws, hit = _cached(
+        cache_dir, f"irf-{key}",
+        lambda: {"draws": resample_batches(_bootstrap_batch, args, n_boot, batch_size, seed, workers)},
+    )
+    return draws["draws"], hit
+
+
+# Point responses and percentile bands to a 1pp Bank Rate rise, plus the cumulated growth response (price level)
+def impulse_response_table(model, draws, horizon=HORIZON, confidence=CONFIDENCE) -> pd.DataFrame:
+    point = shock_response(model["coefs"], model["sigma_u"], horizon, model["variables"].index(SHOCK))
+    variables = list(model["variables"])
+    if GROWTH in variables:
+        g = variables.index(GROWTH)
+        level = lambda growth, axis: 100 * np.expm1(np.cumsum(growth, axis=axis) / 100)  # noqa: E731
+        point = np.column_stack([point, level(point[:, g], 0)])
+        draws = np.concatenate([draws, level(draws[:, :, g], 1)[:, :, None]], axis=2)
+        variables.append(LEVEL)
+
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(draws, [tail, 100 - tail], axis=0)
+    rows = []
+    for i, variable in enumerate(variables):
+        for h in range(horizon + 1):
+            rows.append({"Horizon": h, "Variable": variable, "Response": point[h, i],
+                         "Lower": low[h, i], "Upper": high[h, i]})
+    return pd.DataFrame(rows)
+
+
+# Point forecasts and normal intervals for `steps` quarters, plus the real house price level from cumulated growth
+def forecast_table(model, last_price, steps=HORIZON, confidence=CONFIDENCE) -> pd.DataFrame:
+    from scipy.stats import norm
+
+    coefs, p = model["coefs"], int(model["lag_order"])
+    history = list(model["y"][-p:])
+    mean = []
+    for _ in range(steps):
+        value = model["intercept"] + sum(coefs[i] @ history[-1 - i] for i in range(p))
+        history.append(value)
+        mean.append(value)
+    mean = np.array(mean)
+
+    phi = ma_coefficients(coefs, steps - 1)
+    terms = phi @ model["sigma_u"] @ phi.transpose(0, 2, 1)
+    se = np.sqrt(np.diagonal(np.cumsum(terms, axis=0), axis1=1, axis2=2))
+    z = norm.ppf(0.5 + confidence / 2)
+
+    variables = list(model["variables"])
+    lower, upper = mean - z * se, mean + z * se
+    if GROWTH in variables:
+        # The error of cumulated growth after h quarters loads on u_{T+j} with Psi_{h-j} = Phi_0 + ... + Phi_{h-j}
+        g = variables.index(GROWTH)
+        psi = np.cumsum(phi, axis=0)
+        cum_terms = psi @ model["sigma_u"] @ psi.transpose(0, 2, 1)
+        cum_se = np.sqrt(np.cumsum(cum_terms, axis=0)[:, g, g])
+        cum = np.cumsum(mean[:, g])
+        level = last_price * np.exp(np.column_stack([cum, cum - z * cum_se, cum + z * cum_se]) / 100)
+        mean, lower, upper = (np.column_stack([a, level[:, j]]) for j, a in enumerate([mean, lower, upper]))
+        variables.append(LEVEL)
+
+    t = model["t"][-1] + 1 + np.arange(steps)
+    labels = [f"{period // 4} Q{period % 4 + 1}" for period in t]
+    rows = []
+    for i, variable in enumerate(variables):
+        for h in range(steps):
+            rows.append({"Year_Quarter": labels[h], "Variable": variable, "Forecast": mean[h, i],
+                         "Lower": lower[h, i], "Upper": upper[h, i]})
+    return pd.DataFrame(rows)
+
+
+# Fit (or reuse) every model, bootstrap its impulse responses and write the response and forecast tables
+def build_var_outputs(
+    house_path=HOUSE_PATH,
+    cpi_path=CPI_PATH,
+    bank_path=BANK_PATH,
+    output_path=IRF_PATH,
+    forecast_path=FORECAST_PATH,
+    models=MODELS,
+    horizon=HORIZON,
+    n_boot=N_BOOT,
+    seed=SEED,
+    workers=None,
+    confidence=CONFIDENCE,
+    cache_dir=CACHE_DIR,
+):
+    with step("read") as record:
+        df = load_var_data(house_path, cpi_path, bank_path)
+        add_rows(record, rows_in=len(df))
+
+    responses, forecasts = [], []
+    for name, variables in models.items():
+        start = time.perf_counter()
+        with step("fit"):
+            model = fit_model(df, variables, cache_dir=cache_dir)
+        with step("bootstrap", rows_in=n_boot):
+            draws, hit = bootstrap_responses(model, horizon, n_boot, seed, workers, cache_dir=cache_dir)
+        print(
+            f"{name}: VAR({int(model['lag_order'])}) on {len(model['y'])} quarters, "
+            f"fit {'cached' if model['cached'] else 'estimated'}, {n_boot:,} bootstrap draws "
+            f"{'cached' if hit else 'computed'} ({time.perf_counter() - start:.2f}s)"
+        )
+        last_price = df.loc[model["t"][-1], "Real_House_Price"]
+        for table, parts in [
+            (impulse_response_table(model, draws, horizon, confidence), responses),
+            (forecast_table(model, last_price, horizon, confidence), forecasts),
+        ]:
+            table.insert(0, "Model", name)
+            table.insert(1, "Lag_Order", int(model["lag_order"]))
+            parts.append(table)
+
+    with step("write"):
+        irf, forecast = pd.concat(responses, ignore_index=True), pd.concat(forecasts, ignore_index=True)
+        for table, path in [(irf, output_path), (forecast, forecast_path)]:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            table.to_csv(path, index=False)
+            print("Saved:", path)
+    return irf, forecast
+
+
+# Real house price and Bank Rate responses to a 1pp Bank Rate rise, one line and band per model
+def plot_impulse_response(irf, out_path=CHART_PATH):
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fig, axes = plt.subplots(1, 2, figsize=(11, 4.5), layout="constrained")
+    panels = [(LEVEL, "Real house price (% change)"), (SHOCK, "Bank Rate (pp)")]
+    for ax, (variable, label) in zip(axes, panels):
+        for name, part in irf[irf["Variable"] == variable].groupby("Model", sort=False):
+            line, = ax.plot(part["Horizon"], part["Response"], marker="o", label=name)
+            ax.fill_between(part["Horizon"], part["Lower"], part["Upper"], color=line.get_color(), alpha=0.15)
+        ax.axhline(0, color="black", linewidth=0.8)
+        ax.set_xlabel("Quarters after the rise")
+        ax.set_ylabel(label)
+        ax.grid(True, alpha=0.3)
+    axes[0].legend()
+    fig.suptitle("Response to a 1pp Bank Rate rise (VAR, bootstrap bands)")
+    fig.savefig(out_path)
+    show_figure(fig)
+
+
+# Headless entry point used by src/render.py
+def render_chart(path=IRF_PATH, out_path=CHART_PATH):
+    plot_impulse_response(pd.read_csv(path), out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VAR forecasts and bootstrapped responses to a 1pp Bank Rate rise")
+    parser.add_argument("--output", default=IRF_PATH)
+    parser.add_argument("--forecast", default=FORECAST_PATH)
+    parser.add_argument("--chart", default=CHART_PATH)
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="Quarters ahead")
+    parser.add_argument("--n-boot", type=int, default=N_BOOT, help="Bootstrap replications")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 runs in this process)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-fit and re-bootstrap every model")
+    args = parser.parse_args(argv)
+
+    irf, _ = build_var_outputs(
+        output_path=args.output, forecast_path=args.forecast, horizon=args.horizon, n_boot=args.n_boot,
+        seed=args.seed, workers=args.workers, confidence=args.confidence,
+        cache_dir=None if args.no_cache else CACHE_DIR,
+    )
+    level = irf[irf["Variable"] == LEVEL]
+    print(level.pivot(index="Horizon", columns="Model", values="Response").round(2).to_string())
+    plot_impulse_response(irf, args.chart)
+
+
+if __name__ == "__main__":
+    main()
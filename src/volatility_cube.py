@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.columnar_store import CATEGORY_COLUMNS, days_to_years, open_store
+from src.ingest import DATE_COLUMN, JOB_COLUMNS, read_price_paid
+
+# Dense moment cube: year x property type x old/new x duration x county
+CUBE_PATH = "data/processed/volatility_cube.npz"
+DIMENSIONS = ["year", "property_type", "old_new", "duration", "county"]
+RAW_COLUMNS = {name: column for column, (name, _, _) in CATEGORY_COLUMNS.items()}
+SEED_LABELS = {name: list(seed) for name, _, seed in CATEGORY_COLUMNS.values()}
+
+
+# Cube with no cells filled yet
+def empty_cube() -> dict:
+    labels = {dim: list(SEED_LABELS.get(dim, [])) for dim in DIMENSIONS}
+    shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+    return {
+        "labels": labels,
+        "count": np.zeros(shape, dtype=np.int64),
+        "mean": np.zeros(shape),
+        "m2": np.zeros(shape),
+    }
+
+
+# Pad the arrays so every axis has room for its current labels
+def _grow(cube):
+    pad = [(0, len(cube["labels"][dim]) - n) for dim, n in zip(DIMENSIONS, cube["count"].shape)]
+    if any(after for _, after in pad):
+        for name in ["count", "mean", "m2"]:
+            cube[name] = np.pad(cube[name], pad)
+
+
+# Map values to codes on one axis, adding labels for values not seen before
+def _codes(cube, dim, values):
+    labels = cube["labels"][dim]
+    lookup = {label: i for i, label in enumerate(labels)}
+    for value in pd.unique(values):
+        if value not in lookup:
+            lookup[value] = len(labels)
+            labels.append(value)
+    return pd.Series(values).map(lookup).to_numpy(dtype=np.int64)
+
+
+# Codes for a categorical column: only its categories are looked up (missing values become "")
+def _category_codes(cube, dim, values):
+    labels = np.append(values.cat.categories.astype(str).str.strip().to_numpy(dtype=object), "")
+    return _codes(cube, dim, labels)[values.cat.codes.to_numpy()]
+
+
+# Pairwise merge of per-cell (count, mean, M2) arrays
+def _merge_cells(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(n > 0, n_b / n, 0.0)
+    mean = mean_a + delta * weight
+    m2 = m2_a + m2_b + delta * delta * n_a * weight
+    return n, mean, m2
+
+
+# Add one block of coded transactions to the cube (grouped with bincount on flat cell ids)
+def add_codes(cube, codes, prices):
+    """
+    codes is a list of integer arrays, one per dimension in DIMENSIONS order.
+    Within the block, M2 is taken around each cell's own block mean before
+    merging, which keeps the variance accurate for large prices.
+    """
+    _grow(cube)
+    shape = cube["count"].shape
+    prices = np.asarray(prices, dtype=np.float64)
+    flat = np.ravel_multi_index(codes, shape)
+    size = int(np.prod(shape))
+
+    n_b = np.bincount(flat, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_b = np.bincount(flat, weights=prices, minlength=size) / n_b
+    mean_b = np.nan_to_num(mean_b)
+    deviation = prices - mean_b[flat]
+    m2_b = np.bincount(flat, weights=deviation * deviation, minlength=size)
+
+    n, mean, m2 = _merge_cells(
+        cube["count"].ravel(), cube["mean"].ravel(), cube["m2"].ravel(), n_b, mean_b, m2_b
+    )
+    cube["count"], cube["mean"], cube["m2"] = n.reshape(shape), mean.reshape(shape), m2.reshape(shape)
+    return cube
+
+
+# One pass over the raw CSV with the typed reader (chunksize defaults to the memory budget)
+def build_cube(input_path, output_path=CUBE_PATH, chunksize=None):
+    cube = empty_cube()
+    for chunk in read_price_paid(input_path, JOB_COLUMNS["cube"], chunksize):
+        codes = [_codes(cube, "year", chunk[DATE_COLUMN].dt.year.to_numpy())]
+        for dim in DIMENSIONS[1:]:
+            codes.append(_category_codes(cube, dim, chunk[RAW_COLUMNS[dim]]))
+        add_codes(cube, codes, chunk["Price"].to_numpy())
+
+    save_cube(cube, output_path)
+    return cube
+
+
+# Same cube from the columnar store, reusing its dictionary codes
+def build_cube_from_store(store_path, output_path=CUBE_PATH, block_rows=5_000_000):
+    store = open_store(store_path)
+    columns = store["columns"]
+    cube = empty_cube()
+    for dim in DIMENSIONS[1:]:
+        cube["labels"][dim] = list(store["meta"]["dictionaries"][dim])
+
+    for start in range(0, store["meta"]["n_rows"], block_rows):
+        block = slice(start, start + block_rows)
+        codes = [_codes(cube, "year", days_to_years(columns["day"][block]))]
+        codes += [np.asarray(columns[dim][block], dtype=np.int64) for dim in DIMENSIONS[1:]]
+        add_codes(cube, codes, columns["price"][block])
+
+    save_cube(cube, output_path)
+    return cube
+
+
+# Compact binary format: uint32 counts, float64 mean/M2, labels as JSON
+def save_cube(cube, path=CUBE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _grow(cube)
+    labels = {
+        dim: [label if isinstance(label, str) else int(label) for label in cube["labels"][dim]]
+        for dim in DIMENSIONS
+    }
+    np.savez_compressed(
+        path,
+        count=cube["count"].astype(np.uint32),
+        mean=cube["mean"],
+        m2=cube["m2"],
+        labels=np.array(json.dumps(labels)),
+    )
+    print("Saved:", path)
+    print("Cube shape:", dict(zip(DIMENSIONS, cube["count"].shape)))
+
+
+def load_cube(path=CUBE_PATH) -> dict:
+    with np.load(path) as data:
+        return {
+            "labels": json.loads(str(data["labels"])),
+            "count": data["count"].astype(np.int64),
+            "mean": data["mean"],
+            "m2": data["m2"],
+        }
+
+
+# Roll the cube up to any subset of dimensions, optionally filtering labels first
+def rollup(cube, by=("year",), filters=None) -> pd.DataFrame:
+    """
+    filters maps a dimension to one label or a list of labels to keep, e.g.
+    rollup(cube, ["year"], {"property_type": "F", "county": "GREATER LONDON"}).
+    Returns count, mean and sample std (ddof=1) per combination of `by`.
+    """
+    by = list(by)
+    unknown = [dim for dim in by + list(filters or {}) if dim not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown cube dimensions: {unknown}")
+
+    count, mean, m2 = cube["count"], cube["mean"], cube["m2"]
+    labels = {dim: list(cube["labels"][dim]) for dim in DIMENSIONS}
+    for dim, wanted in (filters or {}).items():
+        wanted = wanted if isinstance(wanted, (list, tuple, set, range)) else [wanted]
+        index = [i for i, label in enumerate(labels[dim]) if label in set(wanted)]
+        axis = DIMENSIONS.index(dim)
+        count, mean, m2 = (np.take(a, index, axis=axis) for a in (count, mean, m2))
+        labels[dim] = [labels[dim][i] for i in index]
+
+    # Sum over the dimensions not kept, then reorder the kept axes to match `by`
+    axes = tuple(i for i, dim in enumerate(DIMENSIONS) if dim not in by)
+    total = count.sum(axis=axes, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total_mean = (count * mean).sum(axis=axes, keepdims=True) / total
+    total_m2 = (m2 + count * (mean - np.nan_to_num(total_mean)) ** 2).sum(axis=axes, keepdims=True)
+
+    order = np.argsort(np.argsort([DIMENSIONS.index(dim) for dim in by]))
+    total, total_mean, total_m2 = (
+        np.transpose(np.squeeze(a, axis=axes), order) for a in (total, total_mean, total_m2)
+    )
+
+    grid = np.meshgrid(*[np.arange(len(labels[dim])) for dim in by], indexing="ij")
+    out = pd.DataFrame({dim: np.asarray(labels[dim], dtype=object)[g.ravel()] for dim, g in zip(by, grid)})
+    out["Transaction_Count"] = total.ravel()
+    out["Price_Mean"] = total_mean.ravel()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["Price_STD"] = np.sqrt(total_m2.ravel() / np.where(total.ravel() > 1, total.ravel() - 1, np.nan))
+
+    out = out[out["Transaction_Count"] > 0]
+    return out.sort_values(by).reset_index(drop=True) if by else out.reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the year x type x old/new x duration x county cube")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Path to price_paid_records.csv")
+    source.add_argument("--store", help="Columnar store built by src/columnar_store.py")
+    parser.add_argument("--output", default=CUBE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.store:
+        build_cube_from_store(args.store, args.output)
+    else:
+        build_cube(args.input, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,33 @@
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
 import os
 
+from src.correlation_inference import N_RESAMPLES, report_inference
+from src.utils import show_figure
+
+# Robust dispersion columns written by the price paid aggregation (when available)
+ROBUST_MEASURES = ["Price_IQR", "Price_MAD"]
+
 # Load and merge datasets
-def load_and_merge():
-    volatility = pd.read_csv(
-        "data/processed/yearly_price_volatility.csv"
-    )
-    rates = pd.read_csv(
-        "data/processed/bank_rate_yearly_avg.csv"
-    )
+def load_and_merge(
+    volatility_path="data/processed/yearly_price_volatility.csv",
+    rates_path="data/processed/bank_rate_yearly_avg.csv",
+):
+    volatility = pd.read_csv(volatility_path)
+    rates = pd.read_csv(rates_path)
 
     df = pd.merge(volatility, rates, on="Year", how="inner")
-    df = df.dropna()
+    df = df.dropna(subset=["Bank_Rate_Yearly_Avg", "Price_STD"])
 
     return df
 
-# Plotting and correlation analysis
-def plot_and_correlate(df):
-    os.makedirs("outputs", exist_ok=True)
+# Scatter plot
+def plot_scatter(df, out_path="outputs/volatility_vs_interest_rate.png"):
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
-    # Scatter plot
-    plt.figure(figsize=(7, 5))
+    fig = plt.figure(figsize=(7, 5))
     plt.scatter(
         df["Bank_Rate_Yearly_Avg"],
         df["Price_STD"],
@@ -34,8 +39,14 @@ def plot_and_correlate(df):
     plt.title("House Price Volatility vs Interest Rate")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig("outputs/volatility_vs_interest_rate.png")
-    plt.show()
+    plt.savefig(out_path)
+    show_figure(fig)
+
+# Plotting and correlation analysis
+def plot_and_correlate(df, n_resamples=N_RESAMPLES, workers=1):
+    from scipy.stats import pearsonr
+
+    plot_scatter(df)
 
     # Correlation
     r, p = pearsonr(
@@ -46,9 +57,40 @@ def plot_and_correlate(df):
     print(f"Pearson r: {r:.3f}")
     print(f"p-value: {p:.4f}")
 
-def main():
+    # The pearsonr p-value assumes independent points; these do not
+    report_inference(df["Bank_Rate_Yearly_Avg"], df["Price_STD"], n_resamples=n_resamples, workers=workers)
+
+# Correlation against robust measures, which are not dominated by a few very large sales
+def correlate_robust(df):
+    from scipy.stats import pearsonr
+
+    results = {}
+    for measure in ROBUST_MEASURES:
+        if measure not in df.columns:
+            continue
+        subset = df.dropna(subset=[measure])
+        r, p = pearsonr(subset["Bank_Rate_Yearly_Avg"], subset[measure])
+        results[measure] = (r, p)
+        print(f"{measure}: Pearson r: {r:.3f}, p-value: {p:.4f}")
+    return results
+
+# Headless entry point used by src/render.py
+def render_chart(
+    volatility_path="data/processed/yearly_price_volatility.csv",
+    rates_path="data/processed/bank_rate_yearly_avg.csv",
+    out_path="outputs/volatility_vs_interest_rate.png",
+):
+    plot_scatter(load_and_merge(volatility_path, rates_path), out_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Volatility vs Bank Rate scatter and correlation")
+    parser.add_argument("--resamples", type=int, default=N_RESAMPLES, help="Bootstrap and permutation resamples")
+    parser.add_argument("--workers", type=int, default=1, help="Resampling worker processes (1 runs in this process)")
+    args = parser.parse_args(argv)
+
     df = load_and_merge()
-    plot_and_correlate(df)
+    plot_and_correlate(df, n_resamples=args.resamples, workers=args.workers)
+    correlate_robust(df)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.affordability_analysis import load_affordability_data
+from src.dataset_source import write_synthetic_price_paid
+from src.pipeline import stage
+from src.validation import load_cache, validate
+
+AFFORDABILITY_PATH = "data/clean/Average_UK_houseprices_and_salary.csv"
+
+
+# Validation result of a dataset; the session cache keeps each result by path, so a file is read and checked once
+@pytest.fixture(scope="session")
+def validated():
+    cache = load_cache(None)
+    return lambda path: validate(path, cache=cache)
+
+
+# The affordability dataset as loaded by src/affordability_analysis.py, read once per session
+@pytest.fixture(scope="session")
+def affordability_data():
+    return load_affordability_data(AFFORDABILITY_PATH)
+
+
+# Writes a synthetic price paid CSV and returns its rows with parsed dates and a Year column
+@pytest.fixture(scope="session")
+def price_paid_csv():
+    def write(path, n_rows=5_000, seed=0):
+        write_synthetic_price_paid(str(path), n_rows, seed=seed)
+        df = pd.read_csv(path, parse_dates=["Date of Transfer"])
+        df["Year"] = df["Date of Transfer"].dt.year
+        return df
+
+    return write
+
+
+# Stages on copies of the raw files: bank rate -> quarterly and yearly, and CPI
+@pytest.fixture
+def stages(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    shutil.copy("data/raw/bank_rate.csv", raw / "bank_rate.csv")
+    shutil.copy("data/raw/CPI_quarterly.csv", raw / "CPI_quarterly.csv")
+
+    quarterly = str(tmp_path / "clean" / "bank_rate_quarterly.csv")
+    return [
+        stage(
+            "clean_bank_rate",
+            "src.clean_bank_rate_quarterly:clean_bank_rate_quarterly",
+            {"input_path": str(raw / "bank_rate.csv")},
+            {"output_path": quarterly},
+        ),
+        stage(
+            "bank_rate_yearly",
+            "src.aggregate_bank_rate_yearly:aggregate_bank_rate_yearly",
+            {"input_path": str(raw / "bank_rate.csv")},
+            {"output_path": str(tmp_path / "processed" / "bank_rate_yearly_avg.csv")},
+        ),
+        stage(
+            "clean_cpi_quarterly",
+            "src.clean_cpi_quarterly:clean_and_average_cpi",
+            {"input_path": str(raw / "CPI_quarterly.csv")},
+            {"output_path": str(tmp_path / "clean" / "cpi_quarterly_avg.csv")},
+        ),
+    ]
@@ -1,7 +1,7 @@
 import pandas as pd
 from pathlib import Path
 
-from src.affordability_analysis import load_affordability_data, compute_affordability_ratio
+from src.affordability_analysis import compute_affordability_ratio
 
 DATA_PATH = Path("data/clean/Average_UK_houseprices_and_salary.csv")
 
@@ -10,22 +10,22 @@ def test_input_dataset_exists():
     assert DATA_PATH.exists(), f"Dataset not found at: {DATA_PATH.resolve()}"
 
 # Test loading and cleaning affordability data
-def test_load_affordability_data_schema_and_non_empty():
-    df = load_affordability_data(str(DATA_PATH))
+def test_load_affordability_data_schema_and_non_empty(affordability_data):
+    df = affordability_data
 
     expected = {"Year", "Real_House_Price", "Real_Median_Salary"}
     assert expected.issubset(df.columns), f"Missing required columns. Found: {list(df.columns)}"
     assert len(df) > 0, "Dataset is empty after loading/cleaning"
 
 # Additional tests for data integrity and computations
-def test_load_affordability_data_no_missing_core_values():
-    df = load_affordability_data(str(DATA_PATH))
+def test_load_affordability_data_no_missing_core_values(affordability_data):
+    df = affordability_data
     core = df[["Year", "Real_House_Price", "Real_Median_Salary"]]
     assert core.notna().all().all(), "Core columns contain NaNs after conversion/dropna"
 
 # Test computation of affordability ratio
-def test_compute_affordability_ratio_adds_column_and_valid_values():
-    df = load_affordability_data(str(DATA_PATH))
+def test_compute_affordability_ratio_adds_column_and_valid_values(affordability_data):
+    df = affordability_data
     out = compute_affordability_ratio(df)
 
     assert "Affordability_Ratio" in out.columns, "Affordability_Ratio column was not created"
@@ -36,8 +36,8 @@ def test_compute_affordability_ratio_adds_column_and_valid_values():
     )
 
 # Test that Year column is integer-like and sorted
-def test_year_integer_like_and_sorted():
-    df = load_affordability_data(str(DATA_PATH))
+def test_year_integer_like_and_sorted(affordability_data):
+    df = affordability_data
     years = pd.to_numeric(df["Year"], errors="coerce")
 
     assert years.notna().all(), "Year contains non-numeric values"
@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.affordability_scenarios import annuity_payment, payment_to_income, scenario_summary
+
+
+# Annuity payments match the textbook formula, including the zero-rate limit
+def test_annuity_payment():
+    r = 0.05 / 12
+    assert np.isclose(annuity_payment(200_000, 5.0, 25), 200_000 * r / (1 - (1 + r) ** -300))
+    assert np.isclose(annuity_payment(120_000, 0.0, 10), 1_000.0)
+    np.testing.assert_allclose(annuity_payment(100_000, [0.0, 1e-9], 20), 100_000 / 240)
+
+
+def _inputs():
+    rng = np.random.default_rng(0)
+    return {
+        "years": np.arange(2010, 2017),
+        "prices": rng.uniform(150_000, 300_000, 7),
+        "rates": rng.uniform(0, 5, 7),
+        "salaries": rng.uniform(15_000, 45_000, (7, 3, 2)),
+        "ages": ["18 to 29", "30 to 49", "50 and over"],
+        "genders": ["Male", "Female"],
+    }
+
+
+# The broadcast grid matches a scalar loop over every scenario
+def test_grid_matches_loop():
+    inputs = _inputs()
+    deposits, terms, spreads = [0.1, 0.25], [20, 30], [0.0, 1.5, 3.0]
+    grid = payment_to_income(inputs["prices"], inputs["rates"], inputs["salaries"], deposits, terms, spreads)
+    assert grid.shape == (7, 3, 2, 2, 2, 3)
+
+    for y, a, g, d, t, s in [(0, 0, 0, 0, 0, 0), (6, 2, 1, 1, 1, 2), (3, 1, 0, 1, 0, 1)]:
+        loan = inputs["prices"][y] * (1 - deposits[d])
+        payment = annuity_payment(loan, inputs["rates"][y] + spreads[s], terms[t])
+        assert np.isclose(grid[y, a, g, d, t, s], 12 * payment / inputs["salaries"][y, a, g])
+
+
+# Summaries do not depend on the block size
+def test_summary_is_block_size_independent():
+    inputs = _inputs()
+    full, full_dt = scenario_summary(inputs, block_cells=10**9)
+    small, small_dt = scenario_summary(inputs, block_cells=1)
+
+    assert len(full) == 7 * 3 * 2 and len(full_dt) == 7 * 8 * 6
+    np.testing.assert_allclose(full["Share_Affordable"], small["Share_Affordable"])
+    np.testing.assert_allclose(full["PTI_Median"], small["PTI_Median"])
+    np.testing.assert_allclose(full_dt["Share_Affordable"], small_dt["Share_Affordable"])
+    assert (full["PTI_P10"] <= full["PTI_Median"]).all() and (full["PTI_Median"] <= full["PTI_P90"]).all()
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from src.benchmark import compare_results, run_benchmarks
+from src.dataset_source import PRICE_PAID_COLUMNS, write_synthetic_price_paid
+from src.incremental_update import parse_transaction_ids
+
+
+# Same seed gives the same bytes, with the real header and parseable GUIDs, prices and dates
+def test_synthetic_file_is_deterministic(tmp_path):
+    a = write_synthetic_price_paid(str(tmp_path / "a.csv"), 2_500, seed=1, block_rows=1_000)
+    b = write_synthetic_price_paid(str(tmp_path / "b.csv"), 2_500, seed=1, block_rows=1_000)
+    assert open(a, "rb").read() == open(b, "rb").read()
+
+    df = pd.read_csv(a)
+    assert list(df.columns) == PRICE_PAID_COLUMNS
+    assert len(df) == 2_500
+    assert len(set(parse_transaction_ids(df["Transaction unique identifier"]).tolist())) == 2_500
+    assert (df["Price"] > 0).all()
+    assert pd.to_datetime(df["Date of Transfer"]).dt.year.between(1995, 2017).all()
+
+
+def test_compare_results_flags_slowdowns_and_memory_growth():
+    baseline = {"results": [{"rows": 10, "mode": "streaming", "rows_per_second": 100.0, "peak_rss_mb": 50.0}]}
+    ok = {"results": [{"rows": 10, "mode": "streaming", "rows_per_second": 85.0, "peak_rss_mb": 55.0}]}
+    slow = {"results": [{"rows": 10, "mode": "streaming", "rows_per_second": 70.0, "peak_rss_mb": 70.0}]}
+
+    assert compare_results(ok, baseline, threshold=0.2) == []
+    messages = [message for _, _, message in compare_results(slow, baseline, threshold=0.2)]
+    assert [m.split()[0] for m in messages] == ["rows/sec", "peak"]
+
+
+def test_run_benchmarks_records_every_mode(tmp_path):
+    results = run_benchmarks([3_000], ["streaming", "store"], directory=str(tmp_path))
+    rows = results["results"]
+    assert [(r["rows"], r["mode"]) for r in rows] == [(3_000, "streaming"), (3_000, "store")]
+    for r in rows:
+        assert r["wall_seconds"] > 0 and r["rows_per_second"] > 0 and r["peak_rss_mb"] > 0
@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Modules behind commands that do not plot
+NON_PLOTTING_MODULES = [
+    "src.clean_house_price_quarterly",
+    "src.clean_bank_rate_quarterly",
+    "src.clean_cpi_quarterly",
+    "src.clean_real_house_price_salary",
+    "src.aggregate_bank_rate_yearly",
+    "src.aggregate_price_paid_volatility",
+    "src.columnar_store",
+    "src.incremental_update",
+    "src.volatility_cube",
+    "src.refresh",
+    "src.query_service",
+]
+HEAVY_MODULES = ["matplotlib", "scipy", "kagglehub"]
+
+# Import budgets (seconds) on top of interpreter start-up
+CLI_IMPORT_BUDGET = 0.3
+MODULE_IMPORT_BUDGET = 0.3
+
+
+# Import `module` in a fresh interpreter and report time and heavy modules loaded
+def import_in_subprocess(module, preload=()):
+    code = (
+        "import json, sys, time\n"
+        + "".join(f"import {name}\n" for name in preload)
+        + "start = time.perf_counter()\n"
+        + f"import {module}\n"
+        + "elapsed = time.perf_counter() - start\n"
+        + f"heavy = [m for m in {HEAVY_MODULES + ['pandas']!r} if m in sys.modules]\n"
+        + "print(json.dumps({'seconds': elapsed, 'heavy': heavy}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# Run a fresh interpreter under -X importtime: [(depth, module, cumulative seconds)] in the order reported
+def import_times(args):
+    out = subprocess.run([sys.executable, "-X", "importtime"] + args, capture_output=True, text=True, check=True)
+    times = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.append(((len(name) - len(name.lstrip())) // 2, name.strip(), int(cumulative) / 1e6))
+    return times
+
+
+# A cold `python -m src --help` must not import pandas/numpy or any plotting/statistics library
+def test_cli_cold_start_is_light():
+    times = import_times(["-m", "src", "--help"])
+    modules = [name for _, name, _ in times]
+    assert [m for m in modules if m.split(".")[0] in HEAVY_MODULES + ["pandas", "numpy"]] == []
+
+    # Everything imported from the `src` package on, i.e. interpreter start-up excluded
+    first = modules.index("src")
+    seconds = sum(cumulative for depth, _, cumulative in times[first:] if depth == 0)
+    assert seconds < CLI_IMPORT_BUDGET
+
+
+# Non-plotting modules import no plotting/statistics libraries and run nothing at import time
+@pytest.mark.parametrize("module", NON_PLOTTING_MODULES)
+def test_non_plotting_module_imports_stay_within_budget(module):
+    result = import_in_subprocess(module, preload=["numpy", "pandas"])
+    assert [m for m in result["heavy"] if m != "pandas"] == []
+    assert result["seconds"] < MODULE_IMPORT_BUDGET
+
+
+# Help lists every command without importing any command module
+def test_cli_help_lists_commands():
+    out = subprocess.run(
+        [sys.executable, "-m", "src", "--help"], capture_output=True, text=True, check=True
+    )
+    assert "clean-cpi" in out.stdout
+    assert "volatility" in out.stdout
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src.columnar_store import build_store, decode, open_store, slice_dates, year_row_ranges
+
+
+# Store columns are date sorted and decode back to the original rows
+def test_store_round_trip(tmp_path, price_paid_csv):
+    df = price_paid_csv(tmp_path / "pp.csv")
+    store = open_store(build_store(str(tmp_path / "pp.csv"), str(tmp_path / "store"), chunksize=700))
+    cols = store["columns"]
+
+    assert store["meta"]["n_rows"] == len(df)
+    assert cols["price"].dtype == np.int32 and cols["day"].dtype == np.int32
+    assert (np.diff(cols["day"]) >= 0).all()
+
+    expected = df.sort_values("Date of Transfer", kind="stable")
+    np.testing.assert_array_equal(cols["price"], expected["Price"])
+    np.testing.assert_array_equal(decode(store, "county", cols["county"]), expected["County"])
+
+
+# Date slices are views matching a boolean filter on the raw data
+def test_slice_dates_matches_filter(tmp_path, price_paid_csv):
+    df = price_paid_csv(tmp_path / "pp.csv")
+    store = open_store(build_store(str(tmp_path / "pp.csv"), str(tmp_path / "store")))
+
+    part = slice_dates(store, "2003-02-14", "2005-07-01", columns=["price"])
+    mask = (df["Date of Transfer"] >= "2003-02-14") & (df["Date of Transfer"] < "2005-07-01")
+    assert len(part["price"]) == mask.sum()
+    assert sorted(part["price"]) == sorted(df.loc[mask, "Price"])
+    assert np.shares_memory(part["price"], store["columns"]["price"])
+
+    years = year_row_ranges(store)
+    counts = {year: hi - lo for year, (lo, hi) in years.items()}
+    assert counts == df["Date of Transfer"].dt.year.value_counts().sort_index().to_dict()
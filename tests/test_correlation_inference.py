@@ -0,0 +1,76 @@
+import numpy as np
+
+from src.correlation_inference import (
+    batch_correlations,
+    block_bootstrap_indices,
+    bootstrap_ci,
+    permutation_indices,
+    permutation_pvalue,
+)
+
+
+def test_batch_correlations_match_corrcoef():
+    rng = np.random.default_rng(0)
+    x, y = rng.normal(size=30), rng.normal(size=30)
+    index = rng.integers(0, 30, (5, 30))
+    expected = [np.corrcoef(x[i], y[i])[0, 1] for i in index]
+    assert np.allclose(batch_correlations(x, y, index, index), expected)
+
+
+def test_block_bootstrap_rows_are_runs_of_consecutive_positions():
+    index = block_bootstrap_indices(np.random.default_rng(0), 10, 4, 3)
+    assert index.shape == (4, 10)
+    assert (index.max() < 10) and (index.min() >= 0)
+    blocks = index[:, :9].reshape(4, 3, 3)
+    assert (np.diff(blocks, axis=2) == 1).all()
+
+
+def test_block_permutation_rows_keep_runs_of_consecutive_positions():
+    index = permutation_indices(np.random.default_rng(0), 10, 4, 3)
+    assert index.shape == (4, 10)
+    assert (np.sort(index, axis=1) == np.arange(10)).all()
+    # Blocks 0-2, 3-5, 6-8 and 9, rotated: at least 10 - 4 steps per row are +1 (mod 10)
+    assert ((np.diff(index, axis=1) % 10 == 1).sum(axis=1) >= 6).all()
+
+
+# Same seed gives the same answer in-process and across a pool
+def test_results_do_not_depend_on_workers():
+    rng = np.random.default_rng(1)
+    x = np.cumsum(rng.normal(size=40))
+    y = x + rng.normal(size=40)
+
+    serial = bootstrap_ci(x, y, n_resamples=3_000, batch_size=1_000, seed=7, workers=1)
+    pooled = bootstrap_ci(x, y, n_resamples=3_000, batch_size=1_000, seed=7, workers=2)
+    assert serial == pooled
+    assert serial["ci_low"] < serial["r"] < serial["ci_high"]
+    assert permutation_pvalue(x, y, 2_000, seed=3, batch_size=500, workers=1) == permutation_pvalue(
+        x, y, 2_000, seed=3, batch_size=500, workers=2
+    )
+
+
+def test_permutation_pvalue_separates_signal_from_noise():
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=50)
+    assert permutation_pvalue(x, x + 0.3 * rng.normal(size=50), 2_000, workers=1) < 0.01
+    assert permutation_pvalue(x, rng.normal(size=50), 2_000, workers=1) > 0.05
+
+
+# Two independent random walks: shuffling single points finds a "significant" correlation, blocks do not
+def test_block_permutation_respects_autocorrelation():
+    rng = np.random.default_rng(4)
+    x, y = np.cumsum(rng.normal(size=60)), np.cumsum(rng.normal(size=60))
+    assert permutation_pvalue(x, y, 2_000, block_length=1) < 0.01
+    assert permutation_pvalue(x, y, 2_000) > 0.05
+
+
+# --resamples and --workers reach the inference in both analysis scripts
+def test_cli_flags_reach_report_inference(monkeypatch):
+    import src.quarterly_changes_analysis as quarterly
+    import src.volatility_vs_interest_rate as volatility
+
+    calls = []
+    for module in (quarterly, volatility):
+        monkeypatch.setattr(module, "report_inference", lambda x, y, **kwargs: calls.append(kwargs))
+        monkeypatch.setattr(module, "plot_scatter", lambda *args, **kwargs: None)
+        module.main(["--resamples", "200", "--workers", "2"])
+    assert calls == [{"n_resamples": 200, "workers": 2}] * 2
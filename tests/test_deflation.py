@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.columnar_store import build_store
+from src.deflate_house_prices import build_real_house_prices
+from src.deflation import (
+    cpi_index_from_rates,
+    cpi_ratio_table,
+    days_to_periods,
+    deflate,
+    deflate_frame,
+    deflate_transactions,
+    real_price_volatility,
+)
+from src.quarterly_panel import period_index
+
+
+# Rebasing to any quarter gives price * CPI(base) / CPI(t), with NaN in quarters without CPI
+def test_ratio_table_rebases_and_skips_gaps():
+    periods = [period_index(2015, q) for q in (1, 2, 4)]
+    table = cpi_ratio_table(periods, [2.0, 4.0, 5.0], base_period="2015 Q2")
+
+    assert table["cpi_base"] == 4.0 and table["base_period"] == period_index(2015, 2)
+    real = deflate(table, periods + [period_index(2015, 3), period_index(2016, 1)], [10.0] * 5)
+    np.testing.assert_allclose(real[:3], [20.0, 10.0, 8.0])
+    assert np.isnan(real[3:]).all()
+
+    with pytest.raises(ValueError):
+        cpi_ratio_table(periods, [2.0, 4.0, 5.0], base_period="2015 Q3")
+
+
+# Annual rates (%) chain into a quarterly index; the ratio table only accepts positive index levels
+def test_index_from_rates_and_rates_are_rejected():
+    periods = [period_index(2015, q) for q in (1, 2, 3, 4)] + [period_index(2016, 1)]
+    index = cpi_index_from_rates(periods, [2.0, 4.0, 4.0, 4.0, 4.0])
+    np.testing.assert_allclose(index.to_numpy(), 100 * 1.04 ** (np.arange(5) / 4))
+
+    # A year of 4% inflation: £104 then is £100 in first-quarter money
+    table = cpi_ratio_table(index.index, index.to_numpy())
+    np.testing.assert_allclose(deflate(table, [periods[4]], [104.0]), [100.0])
+
+    with pytest.raises(ValueError):
+        cpi_index_from_rates(periods[:2] + periods[3:], [2.0, 4.0, 4.0, 4.0])  # a missing quarter
+    for cpi in ([3.6, 0.0, 1.0], [3.6, -0.1, 1.0]):
+        with pytest.raises(ValueError):
+            cpi_ratio_table(periods[:3], cpi)
+
+
+# The committed clean data: 2015 Q2's £179,667 is £163,620 in 2011 Q1 prices (9.8% CPIH inflation in between)
+def test_real_house_price_is_pinned(tmp_path):
+    df = build_real_house_prices(output_path=str(tmp_path / "real.csv")).set_index("Year_Quarter")
+    assert df.loc["2011 Q1", "Real_House_Price"] == df.loc["2011 Q1", "UK_Average_House_Price"]
+    assert df.loc["2015 Q2", "UK_Average_House_Price"] == 179_667
+    np.testing.assert_allclose(df.loc["2015 Q2", "CPI_Index"], 109.807155, rtol=1e-7)
+    np.testing.assert_allclose(df.loc["2015 Q2", "Real_House_Price"], 163_620.485, rtol=1e-7)
+
+
+# Many series at once match deflating each column separately
+def test_deflate_frame_matches_single_series():
+    df = pd.DataFrame({"t": [8060, 8061, 8062], "A": [100.0, 110.0, 120.0], "B": [5.0, 6.0, 7.0]})
+    table = cpi_ratio_table(df["t"], [1.0, 1.1, 1.2])
+    out = deflate_frame(df, ["A", "B"], table)
+    np.testing.assert_allclose(out["Real_A"], deflate(table, df["t"], df["A"]))
+    np.testing.assert_allclose(out["Real_B"], [5.0, 6.0 / 1.1, 7.0 / 1.2])
+
+
+# Transaction days map to the right quarter and the streamed yearly stats match pandas on deflated prices
+def test_real_price_volatility_matches_pandas(tmp_path, price_paid_csv):
+    df = price_paid_csv(tmp_path / "pp.csv")
+    t = df["Date of Transfer"].dt.year * 4 + df["Date of Transfer"].dt.quarter - 1
+    days = df["Date of Transfer"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    assert (days_to_periods(days) == t.to_numpy()).all()
+
+    quarters = np.arange(t.min(), t.max() + 1)
+    rates = 1.0 + 0.05 * (quarters - quarters[0])
+    pd.DataFrame(
+        {"Year": quarters // 4, "Quarter": quarters % 4 + 1, "CPI_Quarterly_Avg": rates}
+    ).to_csv(tmp_path / "cpi.csv", index=False)
+
+    cpi = cpi_index_from_rates(quarters, rates)
+    table = cpi_ratio_table(quarters, cpi.to_numpy(), base_period=int(quarters[10]))
+    real = pd.Series(deflate_transactions(table, df["Price"], days))
+    expected = real.groupby(df["Date of Transfer"].dt.year).agg(["mean", "std", "count"])
+
+    store = build_store(str(tmp_path / "pp.csv"), str(tmp_path / "store"))
+    for kwargs in ({"input_path": str(tmp_path / "pp.csv")}, {"store_path": store}):
+        out = real_price_volatility(
+            output_path=str(tmp_path / "real.csv"), cpi_path=str(tmp_path / "cpi.csv"),
+            base_period=int(quarters[10]), chunksize=700, **kwargs,
+        ).set_index("Year")
+        np.testing.assert_allclose(out["Price_Mean"], expected["mean"])
+        np.testing.assert_allclose(out["Price_STD"], expected["std"])
+        assert (out["Transaction_Count"] == expected["count"]).all()
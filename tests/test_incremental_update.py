@@ -0,0 +1,138 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import src.incremental_update as incremental_update
+from src.incremental_update import MONTHLY_COLUMNS, apply_update, init_state, parse_transaction_ids
+
+
+# Full history file in the Kaggle layout (header row, GUID transaction IDs)
+def write_history(path, n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 2_000, n), unit="D")
+    df = pd.DataFrame(
+        {
+            "Transaction unique identifier": [
+                "{" + str(uuid.UUID(int=int(rng.integers(0, 2**62)) << 64 | i)).upper() + "}"
+                for i in range(n)
+            ],
+            "Price": rng.integers(5_000, 900_000, n),
+            "Date of Transfer": dates.strftime("%Y-%m-%d 00:00"),
+            "Record Status - monthly file only": "A",
+        }
+    )
+    df.to_csv(path, index=False)
+    return df
+
+
+# Monthly update file in the Land Registry layout (no header, 16 columns)
+def write_monthly(path, rows):
+    monthly = pd.DataFrame({c: "" for c in MONTHLY_COLUMNS}, index=range(len(rows)))
+    for column in ["Transaction unique identifier", "Price", "Date of Transfer", "Record Status"]:
+        monthly[column] = rows[column].to_numpy()
+    monthly.to_csv(path, index=False, header=False)
+
+
+# GUIDs should round-trip to distinct 128-bit keys regardless of case/braces
+def test_parse_transaction_ids():
+    keys = parse_transaction_ids(["{81B82214-7FBC-4129-9F6B-4956B4A663AD}", "81b82214-7fbc-4129-9f6b-4956b4a663ad"])
+    assert keys[0] == keys[1]
+    assert int(keys["hi"][0]) == 0x81B822147FBC4129
+    assert int(keys["lo"][0]) == 0x9F6B4956B4A663AD
+
+
+# Applying add/change/delete records should match a full recompute
+def test_update_matches_full_recompute(tmp_path):
+    history = write_history(tmp_path / "history.csv")
+    state, output = str(tmp_path / "state"), str(tmp_path / "volatility.csv")
+    init_state(str(tmp_path / "history.csv"), state, output, chunksize=700)
+
+    changed = history.iloc[:15].assign(Price=123_456, **{"Date of Transfer": "2015-06-01 00:00"})
+    added = pd.DataFrame(
+        {
+            "Transaction unique identifier": ["{" + str(uuid.UUID(int=i + 1)).upper() + "}" for i in range(25)],
+            "Price": np.arange(25) * 1_000 + 50_000,
+            "Date of Transfer": "2016-03-03 00:00",
+        }
+    )
+    update = pd.concat(
+        [
+            changed.assign(**{"Record Status": "C"}),
+            history.iloc[15:30].assign(**{"Record Status": "D"}),
+            added.assign(**{"Record Status": "A"}),
+        ]
+    )
+    write_monthly(tmp_path / "monthly.csv", update)
+    out = apply_update(str(tmp_path / "monthly.csv"), state, output).set_index("Year")
+
+    expected = pd.concat([changed, history.iloc[30:], added])
+    years = pd.to_datetime(expected["Date of Transfer"]).dt.year
+    exact = expected["Price"].groupby(years).agg(["std", "count"])
+
+    assert (out["Transaction_Count"] == exact["count"]).all()
+    np.testing.assert_allclose(out["Price_STD"], exact["std"], rtol=1e-9)
+    assert pd.read_csv(output)["Transaction_Count"].sum() == len(expected)
+
+    # Re-applying the same file is idempotent
+    again = apply_update(str(tmp_path / "monthly.csv"), state, output).set_index("Year")
+    np.testing.assert_allclose(again["Price_STD"], out["Price_STD"], rtol=1e-9)
+    assert (again["Transaction_Count"] == out["Transaction_Count"]).all()
+
+
+# Yearly counts/STD of the rows still present, as a full recompute would give them
+def exact_yearly(rows):
+    years = pd.to_datetime(rows["Date of Transfer"]).dt.year
+    return rows["Price"].groupby(years).agg(["std", "count"])
+
+
+# Updates go to small delta segments (base untouched) and compaction folds them in without changing the result
+def test_updates_append_segments_until_compaction(tmp_path, monkeypatch):
+    history = write_history(tmp_path / "history.csv", n=2_000)
+    state, output = str(tmp_path / "state"), str(tmp_path / "volatility.csv")
+    init_state(str(tmp_path / "history.csv"), state, output)
+    base_mtime = os.stat(os.path.join(state, "keys.npy")).st_mtime_ns
+    monkeypatch.setattr(incremental_update, "MAX_SEGMENTS", 3)
+
+    current = history.set_index("Transaction unique identifier")[["Price", "Date of Transfer"]]
+    for i in range(5):
+        changed = history.iloc[i * 20 : i * 20 + 10].assign(Price=200_000 + i)
+        deleted = history.iloc[i * 20 + 10 : i * 20 + 20]
+        update = pd.concat([changed.assign(**{"Record Status": "C"}), deleted.assign(**{"Record Status": "D"})])
+        write_monthly(tmp_path / f"monthly_{i}.csv", update)
+        out = apply_update(str(tmp_path / f"monthly_{i}.csv"), state, output).set_index("Year")
+
+        current.loc[changed["Transaction unique identifier"], "Price"] = 200_000 + i
+        current = current.drop(deleted["Transaction unique identifier"])
+        exact = exact_yearly(current)
+        assert (out["Transaction_Count"] == exact["count"]).all()
+        np.testing.assert_allclose(out["Price_STD"], exact["std"], rtol=1e-9)
+
+        segments = [name for name in os.listdir(state) if name.startswith("delta_")]
+        if i < 3:
+            assert len(segments) == i + 1
+            assert os.stat(os.path.join(state, "keys.npy")).st_mtime_ns == base_mtime
+        elif i == 3:
+            assert segments == []  # fourth segment triggered a compaction
+    assert len(np.load(os.path.join(state, "keys.npy"))) == len(history) - 40
+
+    # Deleting a compacted-away transaction again is ignored
+    write_monthly(tmp_path / "again.csv", history.iloc[10:20].assign(**{"Record Status": "D"}))
+    again = apply_update(str(tmp_path / "again.csv"), state, output).set_index("Year")
+    assert (again["Transaction_Count"] == exact_yearly(current)["count"]).all()
+
+
+# An update file without records (empty, or a header only) leaves the state as it was
+def test_empty_update_is_a_no_op(tmp_path):
+    history = write_history(tmp_path / "history.csv", n=500)
+    state, output = str(tmp_path / "state"), str(tmp_path / "volatility.csv")
+    before = init_state(str(tmp_path / "history.csv"), state, output)
+    files = sorted(os.listdir(state))
+
+    (tmp_path / "empty.csv").write_text("")
+    history.iloc[:0].to_csv(tmp_path / "header_only.csv", index=False)
+    for name in ["empty.csv", "header_only.csv"]:
+        out = apply_update(str(tmp_path / name), state, output)
+        pd.testing.assert_frame_equal(out, before)
+        assert sorted(os.listdir(state)) == files
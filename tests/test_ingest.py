@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregate_price_paid_volatility import aggregate_yearly_volatility
+from src.columnar_store import build_store, open_store
+from src.dataset_source import write_synthetic_price_paid
+from src.incremental_update import init_state
+from src.ingest import (
+    JOB_COLUMNS,
+    _read_legacy,
+    auto_chunksize,
+    compare_readers,
+    parse_transfer_dates,
+    read_price_paid,
+)
+from src.volatility_cube import build_cube
+
+
+# Typed chunks carry only the job's columns with compact dtypes and the same values as the legacy reader
+def test_typed_reader_matches_legacy(tmp_path):
+    path = str(tmp_path / "pp.csv")
+    write_synthetic_price_paid(path, 3_000, seed=1)
+
+    chunks = list(read_price_paid(path, JOB_COLUMNS["cube"], chunksize=700))
+    assert len(chunks) == 5
+    typed = pd.concat(chunks, ignore_index=True)
+    assert list(typed.columns) == JOB_COLUMNS["cube"]
+    assert typed["Price"].dtype == np.int32
+    assert isinstance(typed["County"].dtype, pd.CategoricalDtype)
+
+    legacy = pd.concat(_read_legacy(path), ignore_index=True)
+    assert (typed["Price"].to_numpy() == legacy["Price"].to_numpy()).all()
+    assert (typed["Date of Transfer"] == legacy["Date of Transfer"]).all()
+    assert (typed["County"].astype(str) == legacy["County"]).all()
+
+
+# Rows with a blank or malformed price or an unparseable date are dropped instead of stopping the read
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_bad_rows_are_dropped(tmp_path, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / "pp.csv"
+    path.write_text(
+        "Price,Date of Transfer\n"
+        "100000,2015-01-02 00:00\n"
+        ",2015-03-04 00:00\n"
+        "abc,2015-05-06 00:00\n"
+        "200000,not a date\n"
+        "300000,2016-07-08 00:00\n"
+    )
+    typed = pd.concat(read_price_paid(str(path), JOB_COLUMNS["volatility"], chunksize=2, engine=engine))
+    assert typed["Price"].tolist() == [100000, 300000]
+    assert typed["Price"].dtype == np.int32
+
+    for mode in ["exact", "streaming", "parallel"]:
+        out = aggregate_yearly_volatility(
+            str(path), str(tmp_path / f"{mode}.csv"), mode=mode, chunksize=2, workers=1, engine=engine
+        )
+        assert out["Year"].tolist() == [2015, 2016]
+        assert out["Transaction_Count"].tolist() == [1, 1]
+
+
+# Every chunked pass (volatility, cube, store, incremental state) reads through the typed reader and drops the same rows
+def test_every_job_drops_the_same_bad_rows(tmp_path):
+    path = tmp_path / "pp.csv"
+    write_synthetic_price_paid(str(path), 2_000, seed=2)
+    df = pd.read_csv(path, dtype=str)
+    df.loc[[3, 500], "Price"] = ["", "abc"]
+    df.loc[[7, 1_500], "Date of Transfer"] = ["not a date", ""]
+    df.to_csv(path, index=False)
+    expected = 2_000 - 4
+
+    volatility = aggregate_yearly_volatility(str(path), str(tmp_path / "v" / "out.csv"), chunksize=300)
+    assert volatility["Transaction_Count"].sum() == expected
+    assert build_cube(str(path), str(tmp_path / "cube.npz"), chunksize=300)["count"].sum() == expected
+    assert open_store(build_store(str(path), str(tmp_path / "store"), chunksize=300))["meta"]["n_rows"] == expected
+    state = init_state(str(path), str(tmp_path / "state"), str(tmp_path / "i" / "out.csv"), chunksize=300)
+    pd.testing.assert_frame_equal(state[volatility.columns], volatility, check_dtype=False, check_exact=False, rtol=1e-9)
+
+
+# The fixed format is used where it fits, other dates fall back to ISO 8601 and junk becomes NaT
+def test_parse_transfer_dates():
+    values = pd.Series(
+        ["2015-01-02 00:00", "2015-01-02 00:00", "2016-03-04", None, "not a date"], index=[5, 6, 7, 8, 9]
+    )
+    parsed = parse_transfer_dates(values)
+    assert list(parsed.index) == [5, 6, 7, 8, 9]
+    assert parsed.iloc[:3].tolist() == [pd.Timestamp("2015-01-02")] * 2 + [pd.Timestamp("2016-03-04")]
+    assert parsed.iloc[3:].isna().all()
+
+
+# Chunk size grows with the memory budget and shrinks with the number of columns
+def test_auto_chunksize(tmp_path, monkeypatch):
+    path = str(tmp_path / "pp.csv")
+    write_synthetic_price_paid(path, 2_000, seed=0)
+
+    small = auto_chunksize(path, JOB_COLUMNS["volatility"], 64)
+    large = auto_chunksize(path, JOB_COLUMNS["volatility"], 256)
+    assert 3.9 < large / small < 4.1
+    assert auto_chunksize(path, None, 256) < large
+    monkeypatch.setenv("PRICE_PAID_MEMORY_MB", "64")
+    assert auto_chunksize(path, JOB_COLUMNS["volatility"]) == small
+
+
+# The comparison reports every available reader against the legacy one
+def test_compare_readers(tmp_path):
+    path = str(tmp_path / "pp.csv")
+    write_synthetic_price_paid(path, 2_000, seed=0)
+    report = compare_readers(path, engines=("c",))
+    assert report["Reader"].tolist() == ["legacy", "typed (c)"]
+    assert (report["Rows"] == 2_000).all() and report["Speedup"].iloc[0] == 1.0
+
+
+# The optional pyarrow engine yields the same typed columns
+def test_pyarrow_engine(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "pp.csv")
+    write_synthetic_price_paid(path, 2_000, seed=0)
+    c = pd.concat(read_price_paid(path, JOB_COLUMNS["volatility"]), ignore_index=True)
+    arrow = pd.concat(read_price_paid(path, JOB_COLUMNS["volatility"], engine="pyarrow"), ignore_index=True)
+    assert (arrow["Price"].to_numpy() == c["Price"].to_numpy()).all()
+    assert (arrow["Date of Transfer"].to_numpy("datetime64[ns]") == c["Date of Transfer"].to_numpy()).all()
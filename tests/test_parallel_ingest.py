@@ -0,0 +1,78 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+import src.aggregate_price_paid_volatility as aggregate
+from src.dataset_source import PRICE_PAID_COLUMNS
+from src.parallel_ingest import reduce_csv_parallel, split_byte_ranges
+from src.price_histogram import load_histogram
+from src.streaming_moments import chunk_moments, finalize_moments, merge_moments
+
+
+# Top-level so it can be pickled into worker processes
+def reduce_chunk(chunk):
+    years = pd.to_datetime(chunk["Date of Transfer"]).dt.year
+    return chunk_moments(years, chunk["Price"])
+
+
+# Every data row should land in exactly one byte range
+def test_byte_ranges_cover_every_row_once(tmp_path, price_paid_csv):
+    path = tmp_path / "pp.csv"
+    df = price_paid_csv(path, 20_000)
+
+    columns, ranges = split_byte_ranges(path, range_bytes=50_000)
+    assert columns == PRICE_PAID_COLUMNS
+    assert len(ranges) > 1
+
+    with open(path, "rb") as f:
+        blobs = []
+        for start, end in ranges:
+            f.seek(start)
+            blob = f.read(end - start)
+            assert blob.endswith(b"\n")
+            blobs.append(blob)
+    assert sum(blob.count(b"\n") for blob in blobs) == len(df)
+
+
+# Results should not depend on the number of workers and should match a full read
+def test_parallel_matches_serial(tmp_path, price_paid_csv):
+    path = tmp_path / "pp.csv"
+    df = price_paid_csv(path, 20_000)
+
+    kwargs = dict(chunksize=3_000, range_bytes=50_000)
+    serial = reduce_csv_parallel(path, reduce_chunk, merge_moments, workers=1, **kwargs)
+    parallel = reduce_csv_parallel(path, reduce_chunk, merge_moments, workers=3, **kwargs)
+    pd.testing.assert_frame_equal(finalize_moments(serial), finalize_moments(parallel), check_exact=True)
+
+    exact = df["Price"].groupby(pd.to_datetime(df["Date of Transfer"]).dt.year).agg(["std", "count"])
+    out = finalize_moments(parallel).set_index("Year")
+    assert (out["Transaction_Count"] == exact["count"]).all()
+    np.testing.assert_allclose(out["Price_STD"], exact["std"], rtol=1e-9)
+
+
+# The full --mode parallel path (typed parsing, sketches, histogram) should match --mode streaming,
+# with byte ranges small enough that their nominal boundaries fall in the middle of rows
+def test_parallel_mode_matches_streaming(tmp_path, monkeypatch, price_paid_csv):
+    path = tmp_path / "pp.csv"
+    price_paid_csv(path, 20_000)
+    range_bytes = 50_001
+
+    data = path.read_bytes()
+    _, ranges = split_byte_ranges(path, range_bytes)
+    assert len(ranges) > 3
+    assert any(data[start + range_bytes - 1 : start + range_bytes] != b"\n" for start, _ in ranges[:-1])
+
+    small_ranges = functools.partial(reduce_csv_parallel, range_bytes=range_bytes)
+    monkeypatch.setattr(aggregate, "reduce_csv_parallel", small_ranges)
+    streaming = aggregate.aggregate_yearly_volatility(
+        str(path), str(tmp_path / "streaming" / "out.csv"), mode="streaming", chunksize=3_000
+    )
+    parallel = aggregate.aggregate_yearly_volatility(
+        str(path), str(tmp_path / "parallel" / "out.csv"), mode="parallel", chunksize=3_000, workers=2
+    )
+    pd.testing.assert_frame_equal(parallel, streaming, check_exact=False, rtol=1e-9)
+
+    histograms = [load_histogram(tmp_path / mode / "monthly_price_histogram.npz") for mode in ("streaming", "parallel")]
+    assert histograms[0]["first_month"] == histograms[1]["first_month"]
+    np.testing.assert_array_equal(histograms[0]["counts"], histograms[1]["counts"])
@@ -0,0 +1,91 @@
+from src.pipeline import code_paths, resolved_input, run_pipeline, stage
+
+
+# First run builds everything, a second run is a no-op
+def test_second_run_skips_everything(tmp_path, stages):
+    state = str(tmp_path / "state.json")
+
+    first = run_pipeline(stages, workers=2, state_path=state)
+    assert set(first.values()) == {"ran"}
+
+    second = run_pipeline(stages, workers=2, state_path=state)
+    assert set(second.values()) == {"skipped"}
+
+
+# Changing one raw file rebuilds only its downstream stages
+def test_changed_input_rebuilds_only_downstream(tmp_path, stages):
+    state = str(tmp_path / "state.json")
+    run_pipeline(stages, workers=2, state_path=state)
+
+    bank_rate = tmp_path / "raw" / "bank_rate.csv"
+    bank_rate.write_text(bank_rate.read_text().rstrip("\n") + "\n2030-01-01,9.0\n")
+
+    result = run_pipeline(stages, workers=2, state_path=state)
+    assert result == {
+        "clean_bank_rate": "ran",
+        "bank_rate_yearly": "ran",
+        "clean_cpi_quarterly": "skipped",
+    }
+
+
+# A deleted output is rebuilt even though its inputs did not change
+def test_missing_output_is_rebuilt(tmp_path, stages):
+    state = str(tmp_path / "state.json")
+    run_pipeline(stages, workers=1, state_path=state)
+
+    (tmp_path / "processed" / "bank_rate_yearly_avg.csv").unlink()
+    result = run_pipeline(stages, workers=1, state_path=state)
+    assert result["bank_rate_yearly"] == "ran"
+    assert result["clean_bank_rate"] == "skipped"
+
+
+# A stage module that imports a helper, and a data file found through resolved_input()
+def make_fixture_package(tmp_path, monkeypatch):
+    package = tmp_path / "pipeline_fixture"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "helper.py").write_text("SCALE = 2\n")
+    (package / "data.txt").write_text("1\n2\n")
+    (package / "build.py").write_text(
+        "import os\n"
+        "\n"
+        "\n"
+        "def source():\n"
+        "    return os.path.join(os.path.dirname(__file__), 'data.txt')\n"
+        "\n"
+        "\n"
+        "def build(input_path, output_path):\n"
+        "    from pipeline_fixture.helper import SCALE\n"
+        "\n"
+        "    with open(input_path) as f, open(output_path, 'w') as out:\n"
+        "        out.write(str(SCALE * sum(int(line) for line in f)))\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return package
+
+
+# Editing an imported helper module or the resolved input file re-runs the stage
+def test_helper_code_and_resolved_input_are_fingerprinted(tmp_path, monkeypatch):
+    package = make_fixture_package(tmp_path, monkeypatch)
+    output = tmp_path / "out.txt"
+    stages = [
+        stage(
+            "fixture",
+            "pipeline_fixture.build:build",
+            {"input_path": resolved_input("pipeline_fixture.build:source")},
+            {"output_path": str(output)},
+        )
+    ]
+    state = str(tmp_path / "state.json")
+    assert code_paths("pipeline_fixture.build:build") == [str(package / "build.py"), str(package / "helper.py")]
+
+    assert run_pipeline(stages, workers=1, state_path=state) == {"fixture": "ran"}
+    assert run_pipeline(stages, workers=1, state_path=state) == {"fixture": "skipped"}
+
+    (package / "helper.py").write_text("SCALE = 3\n")
+    assert run_pipeline(stages, workers=1, state_path=state) == {"fixture": "ran"}
+    assert output.read_text() == "9"
+
+    (package / "data.txt").write_text("1\n2\n3\n")
+    assert run_pipeline(stages, workers=1, state_path=state) == {"fixture": "ran"}
+    assert output.read_text() == "18"
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.aggregate_price_paid_volatility import aggregate_yearly_volatility
+from src.columnar_store import build_store
+from src.price_histogram import (
+    BIN_EDGES,
+    BINS_PER_DECADE,
+    N_BINS,
+    bin_index,
+    histogram_chunk,
+    histogram_summary,
+    load_histogram,
+    merge_histograms,
+    month_index,
+    plot_price_density,
+)
+
+
+# The volatility pass builds the same months x bins counts as a crosstab of the raw rows, in every mode
+def test_pass_histogram_matches_crosstab(tmp_path, price_paid_csv):
+    df = price_paid_csv(tmp_path / "pp.csv")
+    build_store(str(tmp_path / "pp.csv"), str(tmp_path / "store"))
+
+    months = month_index(pd.to_datetime(df["Date of Transfer"]))
+    expected = pd.crosstab(months, bin_index(df["Price"])).reindex(
+        index=range(months.min(), months.max() + 1), columns=range(N_BINS), fill_value=0
+    )
+
+    for mode in ["streaming", "parallel", "store"]:
+        out = tmp_path / mode / "volatility.csv"
+        aggregate_yearly_volatility(
+            str(tmp_path / "pp.csv"), str(out), mode=mode, chunksize=700, workers=2, store_path=str(tmp_path / "store")
+        )
+        histogram = load_histogram(str(tmp_path / mode / "monthly_price_histogram.npz"))
+        assert histogram["first_month"] == months.min()
+        np.testing.assert_array_equal(histogram["counts"], expected.to_numpy())
+
+
+# Quantiles stay within one bin of the exact values; Gini and entropy match direct computations
+def test_summary_statistics(tmp_path):
+    rng = np.random.default_rng(1)
+    prices = np.round(rng.lognormal(12.2, 0.6, 30_000))
+    months = np.repeat([420, 421, 424], 10_000)  # 2005-01, 2005-02 and 2005-05; two empty months between
+    halves = [histogram_chunk(months[:17_000], prices[:17_000]), histogram_chunk(months[17_000:], prices[17_000:])]
+    histogram = merge_histograms(*halves)
+    np.testing.assert_array_equal(histogram["counts"], histogram_chunk(months, prices)["counts"])
+
+    summary = histogram_summary(histogram)
+    assert list(summary["Month"]) == ["2005-01", "2005-02", "2005-05"]
+    bin_width = 10 ** (1 / BINS_PER_DECADE) - 1
+    for i, month in enumerate([420, 421, 424]):
+        x = np.sort(prices[months == month])
+        exact = np.quantile(x, [0.1, 0.5, 0.9], method="lower")
+        approx = summary.loc[i, ["Price_P10", "Price_Median", "Price_P90"]].to_numpy(dtype=float)
+        np.testing.assert_array_less(np.abs(approx / exact - 1), bin_width)
+
+        gini = (2 * np.arange(1, len(x) + 1) - len(x) - 1) @ x / (len(x) * x.sum())
+        assert abs(summary.loc[i, "Gini"] - gini) < 0.01
+
+        p = np.bincount(bin_index(x), minlength=N_BINS) / len(x)
+        np.testing.assert_allclose(summary.loc[i, "Entropy_Bits"], -(p[p > 0] * np.log2(p[p > 0])).sum())
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    plot_price_density(histogram, str(tmp_path / "heatmap.png"))
+    assert os.path.getsize(tmp_path / "heatmap.png") > 0
+    assert len(BIN_EDGES) == N_BINS + 1
@@ -1,10 +1,12 @@
-import pandas as pd
+from src.validation import check_result
 
 # Test to ensure the yearly price volatility dataset exists and is valid
-def test_volatility_dataset_exists_and_valid():
-    df = pd.read_csv("data/processed/yearly_price_volatility.csv")
+def test_volatility_dataset_exists_and_valid(validated):
+    result = validated("data/processed/yearly_price_volatility.csv")
 
-    assert {"Year", "Price_STD", "Transaction_Count"}.issubset(df.columns)
-    assert (df["Price_STD"] > 0).all()
-    assert df["Year"].is_monotonic_increasing
-    assert (df["Transaction_Count"] > 0).all()
\ No newline at end of file
+    assert check_result(result, "columns", "Year,Price_STD,Transaction_Count")["failed"] == 0
+    for column in ["Year", "Price_STD", "Transaction_Count"]:
+        assert check_result(result, "not_null", column)["failed"] == 0
+    assert check_result(result, "positive", "Price_STD")["failed"] == 0
+    assert check_result(result, "monotonic", "Year")["failed"] == 0
+    assert check_result(result, "positive", "Transaction_Count")["failed"] == 0
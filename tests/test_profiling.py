@@ -0,0 +1,81 @@
+import json
+import pstats
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.pipeline import run_pipeline
+from src.profiling import add_rows, merge_worker, profile_stage, step, timed_iter, worker_call
+
+
+def _job(n_chunks=3):
+    for chunk in timed_iter([[0] * 10] * n_chunks):
+        with step("transform"):
+            with step("inner"):
+                sum(chunk)
+    with step("write") as record:
+        add_rows(record, rows_out=4)
+
+
+# Top-level so it can be pickled into worker processes
+def _spin(n):
+    with step("spin", rows_in=n):
+        total = 0
+        for i in range(n):
+            total += i * i
+    return total
+
+
+def _pooled_job(tasks):
+    with step("fan_out"):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            return [merge_worker(output) for output in pool.map(partial(worker_call, _spin), tasks)]
+
+
+# Steps, CPU time and peak RSS recorded in pool workers are merged into the parent's stage
+def test_worker_steps_are_merged():
+    record = profile_stage("pooled", _pooled_job, {"tasks": [300_000] * 4})
+    steps = {s["name"]: s for s in record["steps"]}
+
+    assert set(steps) == {"fan_out", "fan_out/spin"}
+    assert steps["fan_out/spin"]["calls"] == 4 and steps["fan_out/spin"]["rows_in"] == 1_200_000
+    assert steps["fan_out"]["cpu_seconds"] >= steps["fan_out/spin"]["cpu_seconds"] > 0
+    assert record["cpu_seconds"] >= steps["fan_out"]["cpu_seconds"]
+    assert record["worker_peak_rss_mb"] > 0 and steps["fan_out"]["worker_peak_rss_mb"] > 0
+    assert record["rows_in"] is None
+
+
+# Repeated steps accumulate, nested steps are qualified and stage rows come from the first/last steps
+def test_profile_stage_records_steps():
+    record = profile_stage("job", _job, {"n_chunks": 3})
+    steps = {s["name"]: s for s in record["steps"]}
+
+    assert set(steps) == {"read", "transform", "transform/inner", "write"}
+    assert steps["read"]["calls"] == 4 and steps["read"]["rows_in"] == 30
+    assert steps["transform"]["calls"] == 3 and steps["transform/inner"]["calls"] == 3
+    assert record["rows_in"] == 30 and record["rows_out"] == 4
+    assert record["wall_seconds"] >= steps["read"]["wall_seconds"] and record["peak_rss_mb"] > 0
+    assert "cprofile" not in record
+
+    assert "cprofile" in profile_stage("job", _job, {}, cprofile=True)
+    assert profile_stage("again", _job, {"n_chunks": 1})["rows_in"] == 10
+
+
+# A pipeline run writes the JSON/Markdown report and the cProfile dump of its slowest stage
+def test_pipeline_report_and_profile(tmp_path, stages):
+    report = str(tmp_path / "reports" / "run")
+    run_pipeline(stages, workers=2, state_path=str(tmp_path / "state.json"), report_path=report, profile=True)
+
+    with open(report + ".json") as f:
+        data = json.load(f)
+    by_name = {s["name"]: s for s in data["stages"]}
+    assert set(by_name) == {"clean_bank_rate", "bank_rate_yearly", "clean_cpi_quarterly"}
+    assert by_name["clean_cpi_quarterly"]["rows_out"] > 0
+    assert [s["name"] for s in by_name["clean_cpi_quarterly"]["steps"]] == ["read", "parse_dates", "groupby", "write"]
+    assert data["hot_stage"] in by_name
+
+    assert pstats.Stats(data["profile"]).total_calls > 0
+    assert "| Stage |" in open(report + ".md").read()
+
+    run_pipeline(stages, state_path=str(tmp_path / "state.json"), report_path=report)
+    with open(report + ".json") as f:
+        assert set(json.load(f)["skipped"]) == set(by_name)
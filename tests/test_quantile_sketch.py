@@ -0,0 +1,62 @@
+import numpy as np
+
+from src.quantile_sketch import (
+    RELATIVE_ACCURACY,
+    merge_sketches,
+    sketch_chunk,
+    sketch_mad,
+    sketch_quantiles,
+    sketch_summary,
+    sketch_values,
+)
+
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+# Lognormal prices plus a handful of very large sales, like the real data
+def make_prices(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.lognormal(mean=12, sigma=0.7, size=n))
+    prices[rng.choice(n, 50, replace=False)] = rng.uniform(1e7, 5e8, 50)
+    return prices
+
+
+# Sketch quantiles stay within the documented relative error of exact quantiles on samples
+def test_quantiles_within_relative_error_on_sampled_subsets():
+    prices = make_prices()
+    rng = np.random.default_rng(1)
+    for size in [101, 5_000, 50_000]:
+        sample = rng.choice(prices, size, replace=False)
+        estimate = sketch_quantiles(sketch_values(sample), QUANTILES)
+        exact = np.quantile(sample, QUANTILES, method="lower")
+        np.testing.assert_allclose(estimate, exact, rtol=RELATIVE_ACCURACY)
+
+
+# MAD stays within its documented (looser) bound
+def test_mad_within_documented_bound():
+    prices = make_prices(seed=2)
+    counts = sketch_values(prices)
+    median = np.quantile(prices, 0.5, method="lower")
+    exact = np.quantile(np.abs(prices - median), 0.5, method="lower")
+    assert abs(sketch_mad(counts) - exact) <= RELATIVE_ACCURACY * (2 * median + exact)
+
+
+# Merging per-chunk sketches is identical to sketching everything at once
+def test_merged_chunks_equal_single_pass():
+    prices = make_prices(n=30_000, seed=3)
+    years = np.random.default_rng(3).integers(1995, 2000, len(prices))
+
+    merged = {}
+    for start in range(0, len(prices), 4_000):
+        merged = merge_sketches(merged, sketch_chunk(years[start:start + 4_000], prices[start:start + 4_000]))
+    single = sketch_chunk(years, prices)
+
+    assert merged.keys() == single.keys()
+    for year in single:
+        np.testing.assert_array_equal(merged[year], single[year])
+
+    summary = sketch_summary(merged)
+    assert list(summary["Year"]) == sorted(single)
+    assert (summary["Price_IQR"] > 0).all()
+    assert (summary["Price_P10"] < summary["Price_Median"]).all()
+    assert (summary["Price_Median"] < summary["Price_P90"]).all()
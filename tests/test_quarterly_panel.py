@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.deflation import deflate, load_cpi_table
+from src.quarterly_panel import get_panel, parse_quarter, period_index
+
+
+def write_quarterly(path, value_column, rows):
+    pd.DataFrame(rows, columns=["Year", "Quarter", value_column]).to_csv(path, index=False)
+
+
+def test_parse_quarter_and_period_index():
+    quarters = parse_quarter(["Q1", " q4", "3", 2])
+    assert quarters.tolist() == [1, 4, 3, 2]
+    assert period_index([2000, 2000, 2001], [1, 4, 1]).tolist() == [8000, 8003, 8004]
+
+
+# Real prices use the first quarter with both series as base; missing quarters stay in the panel
+def test_panel_joins_on_period(tmp_path):
+    house, cpi, bank = tmp_path / "house.csv", tmp_path / "cpi.csv", tmp_path / "bank.csv"
+    write_quarterly(house, "UK_Average_House_Price", [(2000, "Q1", 100), (2000, "Q2", 110), (2000, "Q3", 121)])
+    # Annual inflation rates (%): the index grows by 1.21 ** (1 / 4) = 1.1 ** 0.5 into Q3
+    write_quarterly(cpi, "CPI_Quarterly_Avg", [(2000, "Q2", 3.0), (2000, "Q3", 21.0)])
+    write_quarterly(bank, "Bank_Rate_Quarterly_Avg", [(2000, "Q3", 5.0), (2000, "Q4", 4.0)])
+
+    panel = get_panel(str(house), str(cpi), str(bank))
+    assert panel.index.tolist() == [8000, 8001, 8002, 8003]
+    assert panel["Year_Quarter"].tolist() == ["2000 Q1", "2000 Q2", "2000 Q3", "2000 Q4"]
+    assert panel.loc[8001, "Real_House_Price"] == 110.0
+    np.testing.assert_allclose(panel.loc[8002, "CPI_Index"], 100 * 1.1 ** 0.5)
+    np.testing.assert_allclose(panel.loc[8002, "Real_House_Price"], 121 / 1.1 ** 0.5)
+    assert pd.isna(panel.loc[8000, "Real_House_Price"])
+
+    # Same real prices as the shared deflation API
+    table = load_cpi_table(str(cpi))
+    np.testing.assert_allclose(panel.loc[[8001, 8002], "Real_House_Price"], deflate(table, [8001, 8002], [110, 121]))
+
+
+def test_cache_is_rebuilt_when_source_changes(tmp_path):
+    house, cpi = tmp_path / "house.csv", tmp_path / "cpi.csv"
+    write_quarterly(house, "UK_Average_House_Price", [(2000, "Q1", 100)])
+    write_quarterly(cpi, "CPI_Quarterly_Avg", [(2000, "Q1", 100.0)])
+
+    first = get_panel(str(house), str(cpi), bank_path=None)
+    first.loc[8000, "UK_Average_House_Price"] = -1
+    assert get_panel(str(house), str(cpi), bank_path=None).loc[8000, "UK_Average_House_Price"] == 100
+
+    write_quarterly(house, "UK_Average_House_Price", [(2000, "Q1", 200)])
+    stat = os.stat(house)
+    os.utime(house, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_panel(str(house), str(cpi), bank_path=None).loc[8000, "UK_Average_House_Price"] == 200
+
+
+# Different files with equal mtimes are separate entries; one file under two spellings is one entry
+def test_cache_is_keyed_by_resolved_paths(tmp_path, monkeypatch):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    for folder, price in [("a", 100), ("b", 200)]:
+        write_quarterly(tmp_path / folder / "house.csv", "UK_Average_House_Price", [(2000, "Q1", price)])
+        os.utime(tmp_path / folder / "house.csv", ns=(0, 10**18))
+
+    assert get_panel(str(tmp_path / "a" / "house.csv"), None, None).loc[8000, "UK_Average_House_Price"] == 100
+    assert get_panel(str(tmp_path / "b" / "house.csv"), None, None).loc[8000, "UK_Average_House_Price"] == 200
+    monkeypatch.chdir(tmp_path / "b")
+    assert get_panel("house.csv", None, None).loc[8000, "UK_Average_House_Price"] == 200
@@ -0,0 +1,98 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.query_service import load_tables, load_test, make_server, query
+from src.volatility_cube import build_cube, load_cube, rollup
+
+
+def rows(body):
+    return pd.DataFrame(json.loads(body)["rows"])
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return load_tables()
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory, price_paid_csv):
+    tmp = tmp_path_factory.mktemp("cube")
+    price_paid_csv(tmp / "pp.csv")
+    build_cube(str(tmp / "pp.csv"), str(tmp / "cube.npz"), chunksize=1_000)
+    httpd = make_server(port=0, cube_path=str(tmp / "cube.npz"))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    httpd.cube = load_cube(str(tmp / "cube.npz"))
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url):
+    try:
+        with urlopen(url, timeout=10) as response:
+            return response.status, response.read()
+    except HTTPError as error:
+        return error.code, error.read()
+
+
+# Range and filter queries on the indexed tables match the same selection in pandas
+def test_queries_match_pandas(tables):
+    df = pd.read_csv("data/clean/Average_UK_houseprices_and_salary.csv")
+    out = rows(query(tables, None, "/affordability", [("from", "2005"), ("to", "2010")]))
+    expected = df[df["Year"].between(2005, 2010)]
+    assert list(out["Year"]) == list(expected["Year"])
+    ratio = expected["Real_House_Price"] / expected["Real_Median_Salary"]
+    np.testing.assert_allclose(out["Affordability_Ratio"], ratio)
+
+    quarters = rows(query(tables, None, "/rates", [("from", "2019Q2"), ("to", "2021")]))
+    assert quarters["Year_Quarter"].iloc[0] == "2019 Q2"
+    assert quarters["Year_Quarter"].iloc[-1] == "2021 Q4"
+    assert (np.diff(quarters["t"]) > 0).all()
+
+    scenarios = pd.read_csv("data/processed/affordability_scenarios.csv")
+    params = [("Gender", "female,MALE"), ("Age_Group", "30 to 39"), ("from", "2015")]
+    out = rows(query(tables, None, "/affordability-scenarios", params))
+    expected = scenarios[(scenarios["Age_Group"] == "30 to 39") & (scenarios["Year"] >= 2015)]
+    assert len(out) == len(expected) > 0
+    np.testing.assert_allclose(np.sort(out["Share_Affordable"]), np.sort(expected["Share_Affordable"]))
+
+
+# Cube filters answer "volatility 2005-2010 for flats in Greater London"; repeats come from the cache; bad queries fail cleanly
+def test_server_cube_queries_and_cache(server):
+    target = "/volatility?from=2005&to=2010&property_type=flats&county=" + quote("Greater London")
+    status, body = get(server.url + target)
+    assert status == 200
+    filters = {"property_type": "F", "county": "GREATER LONDON", "year": range(2005, 2011)}
+    expected = rollup(server.cube, ["year"], filters)
+    out = rows(body)
+    assert list(out["year"]) == list(expected["year"])
+    np.testing.assert_allclose(out["Price_STD"], expected["Price_STD"], rtol=1e-12)
+
+    before = json.loads(get(server.url + "/stats")[1])
+    reordered = target.replace("from=2005&to=2010", "to=2010&from=2005")
+    assert get(server.url + reordered)[1] == body
+    after = json.loads(get(server.url + "/stats")[1])
+    assert (after["hits"], after["misses"]) == (before["hits"] + 1, before["misses"])
+
+    assert get(server.url + "/volatility?from=20x5")[0] == 400
+    assert get(server.url + "/affordability?colour=red")[0] == 400
+    assert get(server.url + "/nope")[0] == 404
+    assert json.loads(get(server.url + "/")[1])["cube"] is True
+
+
+# The load test replays every sample query over keep-alive connections and reports throughput
+def test_load_test_reports_throughput(server):
+    result = load_test(server.url, n_requests=400, concurrency=2)
+    assert result["statuses"] == {200: 400}
+    assert result["connections"] == 2
+    assert result["requests_per_second"] > 0
+    assert result["p50_ms"] <= result["p99_ms"]
+    assert result["cache"]["hits"] >= 400 - 7
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.pipeline import run_pipeline
+from src.refresh import refresh
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+# Stand-in for the data publishers: ETags, conditional GETs, ranges, and a connection that breaks on request
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start, status = 0, 200
+        if self.headers.get("Range") and self.headers.get("If-Range") == etag:
+            start, status = int(self.headers["Range"][len("bytes="):-1]), 206
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body) - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+
+        cut = self.server.cut.pop(self.path, None)
+        self.wfile.write(body[start:cut] if cut else body[start:])
+        if cut:
+            self.close_connection = True
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    httpd.requests, httpd.files, httpd.cut = [], {}, {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def write_config(tmp_path, sources):
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps(sources))
+    return str(path)
+
+
+# Only the changed source is downloaded into place and only its downstream stages re-run; a second refresh is all 304s
+def test_refresh_is_conditional_and_triggers_affected_stages(tmp_path, server, stages):
+    pipeline_state = str(tmp_path / "pipeline.json")
+    run_pipeline(stages, workers=1, state_path=pipeline_state)
+
+    raw = tmp_path / "raw"
+    bank_rate = raw.joinpath("bank_rate.csv").read_bytes().rstrip(b"\n") + b"\n2030-01-01,9.0\n"
+    server.files = {"/bank_rate.csv": bank_rate, "/cpi.csv": raw.joinpath("CPI_quarterly.csv").read_bytes()}
+    config = write_config(tmp_path, {
+        "bank_rate": {"url": server.url + "/bank_rate.csv", "path": str(raw / "bank_rate.csv")},
+        "cpi": {"url": server.url + "/cpi.csv", "path": str(raw / "CPI_quarterly.csv")},
+    })
+    kwargs = dict(sources_path=config, state_path=str(tmp_path / "refresh.json"), stages=stages,
+                  pipeline_state_path=pipeline_state, limit=1)
+
+    first = refresh(**kwargs)
+    assert {name: r["status"] for name, r in first["sources"].items()} == {"bank_rate": "updated", "cpi": "unchanged"}
+    assert raw.joinpath("bank_rate.csv").read_bytes() == bank_rate
+    assert first["stages"] == {"clean_bank_rate": "ran", "bank_rate_yearly": "ran"}
+    assert first["connections"] == 1  # both downloads reused one pooled connection
+
+    second = refresh(**kwargs)
+    assert {r["status"] for r in second["sources"].values()} == {"unchanged"}
+    assert second["stages"] == {}
+    assert all("If-None-Match" in headers for _, headers in server.requests[-2:])
+
+
+# A download cut off mid-transfer resumes from the partial file with a Range request
+def test_interrupted_download_resumes_with_range(tmp_path, server):
+    body = bytes(range(256)) * 1000
+    server.files = {"/pp.csv": body}
+    server.cut = {"/pp.csv": 100_000}
+    target = tmp_path / "raw" / "pp.csv"
+    config = write_config(tmp_path, {"pp": {"url": server.url + "/pp.csv", "path": str(target)}})
+    kwargs = dict(sources_path=config, state_path=str(tmp_path / "refresh.json"), run_stages=False)
+
+    first = refresh(["pp"], **kwargs)
+    assert first["sources"]["pp"]["status"] == "failed"
+    assert not target.exists()
+    assert (tmp_path / "raw" / "pp.csv.part").stat().st_size == 100_000
+
+    second = refresh(["pp"], **kwargs)
+    assert second["sources"]["pp"] == {"status": "updated", "bytes": len(body) - 100_000, "resumed_from": 100_000}
+    assert server.requests[-1][1]["Range"] == "bytes=100000-"
+    assert target.read_bytes() == body
+    assert not (tmp_path / "raw" / "pp.csv.part").exists()
+
+
+# A pinned checksum that does not match leaves the current file alone
+def test_checksum_mismatch_keeps_current_file(tmp_path, server):
+    target = tmp_path / "cpi.csv"
+    target.write_bytes(b"old\n")
+    server.files = {"/cpi.csv": b"new\n"}
+    config = write_config(tmp_path, {"cpi": {"url": server.url + "/cpi.csv", "path": str(target), "sha256": "0" * 64}})
+
+    result = refresh(["cpi"], sources_path=config, state_path=str(tmp_path / "refresh.json"), run_stages=False)
+    assert result["sources"]["cpi"]["status"] == "failed"
+    assert "checksum mismatch" in result["sources"]["cpi"]["error"]
+    assert target.read_bytes() == b"old\n"
@@ -0,0 +1,64 @@
+import os
+
+from src.pipeline import STAGES, run_pipeline, stage
+from src.render import CHARTS, render_all
+from src.utils import show_figure
+
+
+# Every chart redirected to tmp_path; generated inputs that are not committed are built into data_dir first,
+# with price_paid_path standing in for the external price paid file
+def tmp_charts(tmp_path, data_dir, price_paid_path):
+    producers = {path: st for st in STAGES for path in st["outputs"].values()}
+    built, charts = {}, []
+    for st in CHARTS:
+        inputs = dict(st["inputs"])
+        for key, path in inputs.items():
+            if not os.path.exists(path) and path in producers:
+                built[path] = str(data_dir / os.path.basename(path))
+                inputs[key] = built[path]
+        out_path = str(tmp_path / os.path.basename(st["outputs"]["out_path"]))
+        charts.append(stage(st["name"], st["target"], inputs, {"out_path": out_path}, default=st["default"]))
+
+    upstream = {producers[path]["name"]: producers[path] for path in built}.values()
+    run_pipeline(
+        [stage(st["name"], st["target"],
+               {key: price_paid_path if isinstance(path, dict) else path for key, path in st["inputs"].items()},
+               {key: str(data_dir / os.path.basename(path)) for key, path in st["outputs"].items()})
+         for st in upstream],
+        state_path=str(data_dir / "pipeline_state.json"),
+    )
+    return charts
+
+
+def test_render_all_writes_every_chart_then_skips(tmp_path, tmp_path_factory, price_paid_csv, monkeypatch):
+    data_dir = tmp_path_factory.mktemp("data")
+    price_paid_csv(data_dir / "pp.csv")
+    charts = tmp_charts(tmp_path, data_dir, str(data_dir / "pp.csv"))
+    names = [st["name"] for st in charts]
+    state = str(tmp_path / "render_state.json")
+    monkeypatch.setenv("MPLBACKEND", "TkAgg")
+
+    first = render_all(charts, names=names, workers=2, state_path=state)
+    assert set(first.values()) == {"ran"}
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [os.path.basename(st["outputs"]["out_path"]) for st in charts] + ["render_state.json"]
+    )
+    assert os.environ["MPLBACKEND"] == "TkAgg"
+
+    second = render_all(charts, names=names, workers=2, state_path=state)
+    assert set(second.values()) == {"skipped"}
+
+    monkeypatch.delenv("MPLBACKEND")
+    assert "price_density_heatmap" not in render_all(charts, state_path=state)
+    assert "MPLBACKEND" not in os.environ
+
+
+def test_show_figure_closes_on_agg():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    show_figure(fig)
+    assert plt.get_fignums() == []
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import resample as resample_module
+from src.aggregate_bank_rate_yearly import aggregate_bank_rate_yearly
+from src.clean_bank_rate_quarterly import clean_bank_rate_quarterly
+from src.resample import load_house_price, resample
+
+
+# Irregular daily observations: every aggregate matches a pandas groupby on the raw values
+def test_resample_matches_groupby():
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2009-06-01") + pd.to_timedelta(rng.integers(0, 1500, 400), unit="D")
+    values = rng.normal(3, 1, 400)
+
+    out = resample(dates, values, start_year=2010)
+    df = pd.DataFrame({"date": dates, "value": values}).sort_values("date", kind="stable")
+    df = df[df["date"].dt.year >= 2010]
+
+    for name, key in [
+        ("monthly", [df["date"].dt.year, df["date"].dt.month]),
+        ("quarterly", [df["date"].dt.year, df["date"].dt.quarter]),
+        ("yearly", [df["date"].dt.year]),
+    ]:
+        expected = df.groupby(key)["value"].agg(["mean", "last", "min", "max", "count"])
+        got = out[name]
+        assert len(got) == len(expected)
+        assert np.allclose(got["Mean"], expected["mean"])
+        assert np.allclose(got["End"], expected["last"])
+        assert np.allclose(got["Min"], expected["min"]) and np.allclose(got["Max"], expected["max"])
+        assert (got["Count"].to_numpy() == expected["count"].to_numpy()).all()
+    assert out["yearly"]["Year"].min() == 2010
+
+
+# A yearly mean weights every observation equally, not every quarter
+def test_yearly_mean_is_not_average_of_quarters():
+    dates = pd.to_datetime(["2020-01-01", "2020-02-01", "2020-03-01", "2020-04-01"])
+    out = resample(dates, [1.0, 1.0, 1.0, 5.0], start_year=None)
+    assert out["yearly"]["Mean"].iloc[0] == 2.0
+    assert out["quarterly"]["Mean"].tolist() == [1.0, 5.0]
+    assert out["quarterly"]["Quarter"].tolist() == [1, 2]
+
+
+def test_house_price_months_with_dashes(tmp_path):
+    path = tmp_path / "house.csv"
+    path.write_text('Time period,United Kingdom\nJul 2025,"270,000 "\nAug-2025,"272,000 "\n')
+    dates, values = load_house_price(path)
+    assert dates.notna().all()
+    assert values.tolist() == [270000, 272000]
+
+
+# The quarterly and yearly Bank Rate stages share one read of the raw file until it changes
+def test_bank_rate_stages_read_the_raw_file_once(tmp_path, monkeypatch):
+    path = tmp_path / "bank_rate.csv"
+    path.write_text("Date,Bank Rate\n2020-01-01,1.0\n2020-02-01,1.0\n2020-03-01,1.0\n2020-04-01,5.0\n")
+    reads = []
+    load = resample_module.load_bank_rate
+    monkeypatch.setattr(resample_module, "load_bank_rate", lambda p: reads.append(p) or load(p))
+
+    quarterly = clean_bank_rate_quarterly(str(path), str(tmp_path / "q.csv"), start_year=None)
+    yearly = aggregate_bank_rate_yearly(str(path), str(tmp_path / "y.csv"), start_year=None)
+    assert len(reads) == 1
+    assert quarterly["Bank_Rate_Quarterly_Avg"].tolist() == [1.0, 5.0]
+    assert yearly["Bank_Rate_Yearly_Avg"].tolist() == [2.0]
+
+    path.write_text(path.read_text() + "2020-05-01,5.0\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    yearly = aggregate_bank_rate_yearly(str(path), str(tmp_path / "y.csv"), start_year=None)
+    assert yearly["Bank_Rate_Yearly_Avg"].tolist() == [2.6]
+    assert len(reads) == 2
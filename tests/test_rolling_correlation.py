@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.rolling_correlation import lagged_correlations, rolling_correlations
+
+
+# Reference: one np.corrcoef call per (lag, window, end)
+def brute_force(x, y, windows, lags):
+    out = {}
+    for lag in lags:
+        for w in windows:
+            for end in range(w - 1, len(y)):
+                xi = np.arange(end + 1 - w, end + 1) - lag
+                if xi.min() < 0 or xi.max() >= len(x):
+                    continue
+                a, b = x[xi], y[end + 1 - w : end + 1]
+                if np.isfinite(a).all() and np.isfinite(b).all():
+                    out[(lag, w, end)] = np.corrcoef(a, b)[0, 1]
+    return out
+
+
+def test_rolling_matches_brute_force_with_gaps():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.normal(size=80)) + 1_000
+    y = 0.5 * np.roll(x, 3) + rng.normal(size=80)
+    y[[10, 41]] = np.nan
+
+    table = rolling_correlations(x, y, windows=range(5, 12), lags=range(-4, 5))
+    expected = brute_force(x, y, range(5, 12), range(-4, 5))
+
+    got = {(r.Lag, r.Window, r.End): r.Correlation for r in table.itertuples()}
+    assert got.keys() == expected.keys()
+    assert max(abs(got[k] - expected[k]) for k in expected) < 1e-9
+
+
+def test_lagged_correlation_peaks_at_true_lag():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=500)
+    y = np.concatenate([np.zeros(4), x[:-4]]) + 0.1 * rng.normal(size=500)
+
+    lagged = lagged_correlations(x, y, lags=range(-6, 7))
+    assert lagged.loc[lagged["Correlation"].idxmax(), "Lag"] == 4
+    row = lagged[lagged["Lag"] == 4].iloc[0]
+    assert row["N"] == 496
+    assert abs(row["Correlation"] - np.corrcoef(x[:-4], y[4:])[0, 1]) < 1e-9
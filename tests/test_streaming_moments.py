@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from src.streaming_moments import chunk_moments, empty_moments, finalize_moments, merge_moments
+
+
+# Synthetic prices with a large mean relative to spread (worst case for naive variance)
+def make_prices(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1995, 2018, size=n)
+    prices = np.round(rng.lognormal(mean=12, sigma=0.6, size=n)) + 1e7
+    return years, prices
+
+
+# Streaming moments merged over chunks should match pandas on the full data
+def test_merged_chunks_match_exact_std_and_count():
+    years, prices = make_prices()
+
+    moments = empty_moments()
+    for start in range(0, len(prices), 7_919):
+        stop = start + 7_919
+        moments = merge_moments(moments, chunk_moments(years[start:stop], prices[start:stop]))
+    out = finalize_moments(moments).set_index("Year")
+
+    exact = pd.Series(prices).groupby(years).agg(["std", "count", "min", "max"])
+
+    assert list(out.index) == list(exact.index)
+    assert (out["Transaction_Count"] == exact["count"]).all()
+    np.testing.assert_allclose(out["Price_STD"], exact["std"], rtol=1e-9)
+    np.testing.assert_allclose(out["Price_Min"], exact["min"])
+    np.testing.assert_allclose(out["Price_Max"], exact["max"])
+
+
+# Merge order should not matter beyond float rounding
+def test_merge_is_order_independent():
+    years, prices = make_prices(n=10_000, seed=1)
+    a = chunk_moments(years[:3_000], prices[:3_000])
+    b = chunk_moments(years[3_000:], prices[3_000:])
+
+    ab = finalize_moments(merge_moments(a, b))
+    ba = finalize_moments(merge_moments(b, a))
+    pd.testing.assert_frame_equal(ab, ba, rtol=1e-12)
+
+
+# A single transaction in a year has undefined sample std
+def test_single_transaction_year_has_nan_std():
+    out = finalize_moments(chunk_moments([2000, 2001, 2001], [100.0, 200.0, 400.0]))
+    assert np.isnan(out.loc[out["Year"] == 2000, "Price_STD"]).all()
+    assert out.loc[out["Year"] == 2001, "Transaction_Count"].item() == 2
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from src import validation
+from src.pipeline import run_pipeline
+from src.validation import ValidationError, check_result, evaluate, load_cache, save_cache, validate
+
+RULES = {
+    "columns": {"Year": "int", "Price": "number", "Salary": "number"},
+    "min_rows": 2,
+    "not_null": ["Price"],
+    "monotonic": ["Year"],
+    "positive": ["Salary"],
+    "ranges": {"Price": {"ge": 0, "lt": 100}},
+    "ratios": {"Price/Salary": {"gt": 1}},
+}
+
+
+# Every rule reports its own failing rows from one pass over the frame
+def test_evaluate_reports_each_failing_rule():
+    df = pd.DataFrame({"Year": [2001, 2000.5, 2002], "Price": [50, None, 150], "Salary": [10, 5, -1]})
+    checks = evaluate(df, RULES)
+    result = {"path": "frame", "checks": checks}
+
+    assert check_result(result, "columns", "Year,Price,Salary")["failed"] == 0
+    assert check_result(result, "integer", "Year")["rows"] == [1]
+    assert check_result(result, "monotonic", "Year")["rows"] == [1]
+    assert check_result(result, "not_null", "Price")["rows"] == [1]
+    assert check_result(result, "range", "Price")["rows"] == [2]
+    assert check_result(result, "positive", "Salary")["rows"] == [2]
+    assert check_result(result, "ratio", "Price/Salary")["rows"] == [2]
+
+    missing = {"path": "frame", "checks": evaluate(df.drop(columns="Salary"), RULES)}
+    assert check_result(missing, "columns", "Year,Price,Salary")["missing"] == ["Salary"]
+    with pytest.raises(KeyError):
+        check_result(result, "unique", "Year")
+
+
+# A file is read once while unchanged, in this process and from the cache file, and re-read after a change
+def test_validate_caches_by_file_hash(tmp_path, monkeypatch):
+    path = tmp_path / "clean" / "bank_rate_quarterly.csv"
+    path.parent.mkdir()
+    path.write_text("Year,Quarter,Bank_Rate_Quarterly_Avg\n2011,Q1,0.5\n2011,Q2,0.5\n")
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(validation.pd, "read_csv", lambda *a, **k: reads.append(a) or read_csv(*a, **k))
+
+    cache = load_cache(str(tmp_path / "cache.json"))
+    assert validate(str(path), cache=cache)["passed"]
+    assert validate(str(path), cache=cache)["passed"]
+    assert len(reads) == 1
+
+    save_cache(cache, str(tmp_path / "cache.json"))
+    assert validate(str(path), cache=load_cache(str(tmp_path / "cache.json")))["passed"]
+    assert len(reads) == 1
+
+    path.write_text("Year,Quarter,Bank_Rate_Quarterly_Avg\n2011,Q1,0.5\n2011,Q5,25\n")
+    result = validate(str(path), cache=cache)
+    assert len(reads) == 2
+    assert not result["passed"]
+    assert check_result(result, "range", "Bank_Rate_Quarterly_Avg")["rows"] == [1]
+    assert check_result(result, "allowed", "Quarter")["rows"] == [1]
+
+
+# The pipeline gate stops on an invalid output and does not record the stage as up to date
+def test_pipeline_gate_rejects_invalid_output(tmp_path, stages):
+    stages = stages[:1]
+    state = str(tmp_path / "state.json")
+    bank_rate = tmp_path / "raw" / "bank_rate.csv"
+    bank_rate.write_text(bank_rate.read_text().rstrip("\n") + "\n2030-01-01,25.0\n")
+
+    with pytest.raises(ValidationError, match="Bank_Rate_Quarterly_Avg"):
+        run_pipeline(stages, workers=1, state_path=state)
+    assert run_pipeline(stages, workers=1, state_path=state, validate=False) == {"clean_bank_rate": "ran"}
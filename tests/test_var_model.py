@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.api import VAR
+
+from src import var_model
+from src.deflation import deflate, load_cpi_table
+from src.quarterly_panel import load_quarterly_series
+from src.var_model import _ols_var, bootstrap_responses, fit_model, forecast_table, ma_coefficients, shock_response
+
+VARIABLES = ["Real_Growth", "Bank_Rate_Quarterly_Avg"]
+
+
+# A stable VAR(1) sample in the layout load_var_data() returns
+def make_data(n=80, seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.array([[0.5, -0.3], [0.1, 0.8]])
+    y = np.zeros((n, 2))
+    for t in range(1, n):
+        y[t] = A @ y[t - 1] + rng.normal(0, [1.0, 0.3])
+    return pd.DataFrame(
+        {"Real_Growth": y[:, 0], "Bank_Rate_Quarterly_Avg": y[:, 1] + 2},
+        index=pd.Index(np.arange(n) + 2005 * 4, name="t"),
+    )
+
+
+# The batched OLS, MA coefficients and shock responses agree with statsmodels
+def test_matches_statsmodels():
+    y = make_data()[VARIABLES].to_numpy()
+    res = VAR(y).fit(2, trend="c")
+
+    coefs, sigma_u = _ols_var(y[None], 2)
+    assert np.allclose(coefs[0], res.coefs) and np.allclose(sigma_u[0], res.sigma_u)
+    assert np.allclose(ma_coefficients(res.coefs, 8), res.ma_rep(8))
+
+    orth = res.irf(8).orth_irfs[:, :, 1]
+    chol = np.linalg.cholesky(res.sigma_u)
+    assert np.allclose(shock_response(res.coefs, res.sigma_u, 8, 1), orth / chol[1, 1])
+
+
+# Forecast means and standard errors agree with statsmodels; the level forecast compounds growth
+def test_forecast_matches_statsmodels():
+    df = make_data()
+    model = fit_model(df, VARIABLES, cache_dir=None)
+    res = VAR(model["y"]).fit(int(model["lag_order"]), trend="c")
+    table = forecast_table(model, last_price=100.0, steps=4, confidence=0.9)
+
+    growth = table[table["Variable"] == "Real_Growth"]
+    mean = res.forecast(model["y"][-res.k_ar:], 4)
+    assert np.allclose(growth["Forecast"], mean[:, 0])
+    se = np.sqrt(res.mse(4)[:, 0, 0])
+    assert np.allclose(growth["Upper"] - growth["Forecast"], 1.6448536 * se)
+
+    level = table[table["Variable"] == "Real_House_Price"]["Forecast"].to_numpy()
+    assert np.allclose(level, 100 * np.exp(np.cumsum(mean[:, 0]) / 100))
+    assert table["Year_Quarter"].iloc[0] == "2025 Q1"
+
+
+# Bootstrap draws do not depend on the worker count, and fits/draws are reused until the data changes
+def test_bootstrap_is_worker_independent_and_cached(tmp_path, monkeypatch):
+    df = make_data()
+    model = fit_model(df, VARIABLES, cache_dir=str(tmp_path))
+    assert not model["cached"]
+    serial, hit = bootstrap_responses(model, 8, 300, workers=1, batch_size=100, cache_dir=None)
+    pooled, _ = bootstrap_responses(model, 8, 300, workers=2, batch_size=100, cache_dir=str(tmp_path))
+    assert not hit and np.array_equal(serial, pooled)
+    assert np.allclose(serial[:, 0, 0], 0) and np.allclose(serial[:, 0, 1], 1)
+
+    monkeypatch.setattr(var_model, "fit_var", lambda *a: pytest.fail("model re-fitted"))
+    monkeypatch.setattr(var_model, "resample_batches", lambda *a: pytest.fail("bootstrap re-run"))
+    again = fit_model(df, VARIABLES, cache_dir=str(tmp_path))
+    draws, hit = bootstrap_responses(again, 8, 300, workers=2, batch_size=100, cache_dir=str(tmp_path))
+    assert again["cached"] and hit and np.array_equal(draws, pooled)
+
+    changed = df.copy()
+    changed.iloc[-1, 0] += 1
+    with pytest.raises(pytest.fail.Exception, match="re-fitted"):
+        fit_model(changed, VARIABLES, cache_dir=str(tmp_path))
+
+
+# Growth is read from the clean files through the shared deflator (not the processed CSV)
+def test_load_var_data_uses_cpi_index_real_prices():
+    df = var_model.load_var_data()
+    house = load_quarterly_series("data/clean/uk_house_price_quarterly.csv", "UK_Average_House_Price")
+    real = pd.Series(deflate(load_cpi_table(), house.index, house.to_numpy()), index=house.index)
+    np.testing.assert_allclose(df["Real_Growth"], (100 * np.log(real).diff()).reindex(df.index))
+    assert df["Real_Growth"].abs().max() < 10
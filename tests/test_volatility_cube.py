@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from src.columnar_store import build_store
+from src.volatility_cube import build_cube, build_cube_from_store, load_cube, rollup
+
+
+# Roll-ups of the cube should match a direct groupby on the raw rows
+def test_rollups_match_groupby(tmp_path, price_paid_csv):
+    df = price_paid_csv(tmp_path / "pp.csv")
+    build_cube(str(tmp_path / "pp.csv"), str(tmp_path / "cube.npz"), chunksize=1_000)
+    cube = load_cube(str(tmp_path / "cube.npz"))
+
+    out = rollup(cube, ["county", "year"])
+    exact = df.groupby(["County", "Year"])["Price"].agg(["count", "std", "mean"]).reset_index()
+    assert list(out["county"]) == list(exact["County"])
+    assert list(out["year"]) == list(exact["Year"])
+    assert (out["Transaction_Count"].to_numpy() == exact["count"].to_numpy()).all()
+    np.testing.assert_allclose(out["Price_STD"], exact["std"], rtol=1e-9)
+    np.testing.assert_allclose(out["Price_Mean"], exact["mean"], rtol=1e-12)
+
+    # "volatility 2005-2010 for flats in Greater London"
+    flats = rollup(cube, ["year"], {"property_type": "F", "county": "GREATER LONDON", "year": range(2005, 2011)})
+    subset = df[(df["Property Type"] == "F") & (df["County"] == "GREATER LONDON") & df["Year"].between(2005, 2010)]
+    np.testing.assert_allclose(flats["Price_STD"], subset.groupby("Year")["Price"].std(), rtol=1e-9)
+
+    overall = rollup(cube, [])
+    assert overall["Transaction_Count"].item() == len(df)
+    np.testing.assert_allclose(overall["Price_STD"].item(), df["Price"].std(), rtol=1e-9)
+
+
+# Building from the columnar store gives the same cube as building from the CSV
+def test_cube_from_store_matches_csv(tmp_path, price_paid_csv):
+    price_paid_csv(tmp_path / "pp.csv")
+    build_store(str(tmp_path / "pp.csv"), str(tmp_path / "store"))
+    from_csv = build_cube(str(tmp_path / "pp.csv"), str(tmp_path / "a.npz"))
+    from_store = build_cube_from_store(str(tmp_path / "store"), str(tmp_path / "b.npz"), block_rows=1_500)
+
+    a = rollup(from_csv, ["year", "property_type", "duration"])
+    b = rollup(from_store, ["year", "property_type", "duration"])
+    pd.testing.assert_frame_equal(a, b, check_dtype=False, rtol=1e-9)